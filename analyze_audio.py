@@ -1,64 +1,49 @@
-import pygame
+"""Show the real container and encoding of audio assets.
+
+    python analyze_audio.py                  # assets/music + assets/sounds
+    python analyze_audio.py assets/sounds/game_over.wav
+
+The container is detected from the file header, not the extension (an MP3
+named .wav is reported as such); WAV files also show rate, channels and
+sample format. `convert_audio.py` fixes what this reports.
+"""
+import argparse
 import os
-import shutil
 
-def try_pygame_conversion():
-    """Essaie de charger et reconvertir avec pygame"""
-    
-    input_file = r"C:\Users\lalle\OneDrive\Desktop\Code python\AI in Prod\geometry_dash_custom\assets\music\level1_music.wav"
-    
-    print("🔍 Analyse du fichier...")
-    
-    # Vérifier la taille du fichier
-    file_size = os.path.getsize(input_file)
-    print(f"📊 Taille du fichier: {file_size} bytes")
-    
-    # Lire les premiers bytes pour voir le format
-    with open(input_file, 'rb') as f:
-        header = f.read(12)
-        print(f"📋 En-tête: {header}")
-        
-        # Vérifier si c'est vraiment un WAV
-        if header[:4] != b'RIFF':
-            print("❌ Ce n'est pas un fichier WAV valide (pas d'en-tête RIFF)")
-            
-            # Peut-être que c'est un MP3 renommé ?
-            if header[:3] == b'ID3' or header[:2] == b'\xff\xfb':
-                print("💡 Ce semble être un fichier MP3 renommé en .wav")
-                
-                # Copier vers .mp3 et essayer
-                mp3_file = input_file.replace('.wav', '_real.mp3')
-                shutil.copy2(input_file, mp3_file)
-                print(f"📋 Copié vers: {mp3_file}")
-                
-                # Tester le MP3
-                pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
-                pygame.mixer.init()
-                
-                try:
-                    pygame.mixer.music.load(mp3_file)
-                    print("✅ Le fichier fonctionne comme MP3!")
-                    
-                    # Créer un nouveau nom pour le jeu
-                    final_file = r"C:\Users\lalle\OneDrive\Desktop\Code python\AI in Prod\geometry_dash_custom\assets\music\level1_music_final.mp3"
-                    shutil.copy2(mp3_file, final_file)
-                    print(f"✅ Fichier prêt: level1_music_final.mp3")
-                    return "music/level1_music_final.mp3"
-                    
-                except Exception as e:
-                    print(f"❌ Même en MP3, ça ne marche pas: {e}")
-            else:
-                print("❓ Format de fichier inconnu")
-        else:
-            print("✅ En-tête RIFF trouvé, mais il y a un autre problème")
-    
-    return None
+from convert_audio import AUDIO_DIRS, find_audio
+from game.audio_convert import NATIVE_CONTAINERS, NUMPY_AVAILABLE, WavReader, sniff_container
+
+
+def describe(path):
+    container = sniff_container(path)
+    ext = os.path.splitext(path)[1].lower()
+    size = os.path.getsize(path)
+    if container is None:
+        return f"❓ {path}: format inconnu ({size} octets)"
+    if container == "wav":
+        if not NUMPY_AVAILABLE:
+            return f"✅ {path}: WAV ({size} octets)"
+        try:
+            with WavReader(path) as r:
+                return (f"✅ {path}: WAV {r.rate} Hz, {r.channels} canal(aux), {r.bits} bits {r.kind}, "
+                        f"{r.frames / r.rate:.2f} s")
+        except ValueError as e:
+            return f"❌ {path}: {e}"
+    if container in NATIVE_CONTAINERS and ext not in NATIVE_CONTAINERS[container]:
+        return f"⚠️ {path}: contenu {container.upper()} avec l'extension {ext} (python convert_audio.py)"
+    if container == "rf64":
+        return f"❌ {path}: RF64 non supporté"
+    return f"✅ {path}: {container.upper()} ({size} octets)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the real format of audio assets")
+    parser.add_argument('paths', nargs='*', default=AUDIO_DIRS,
+                        help="audio files or directories (default: assets/music assets/sounds)")
+    args = parser.parse_args()
+    for path in find_audio(args.paths):
+        print(describe(path))
+
 
-if __name__ == "__main__":
-    result = try_pygame_conversion()
-    if result:
-        print(f"\n🎉 Fichier prêt à utiliser: {result}")
-        print("Maintenant je vais mettre à jour la configuration du jeu...")
-    else:
-        print("\n😔 Impossible de convertir le fichier.")
-        print("💡 Conseil: Télécharge un nouveau fichier audio ou utilise un convertisseur en ligne.")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
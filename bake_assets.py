@@ -0,0 +1,43 @@
+"""Pré-calcule les images du jeu (atlas d'obstacles, fonds redimensionnés, opacité).
+
+    python bake_assets.py                  # assets/ pour une fenêtre de 450 px de haut
+    python bake_assets.py --height 720 --force
+
+Écrit `assets/.baked/` (voir `game/asset_bake.py`); seules les sorties dont
+une source a changé (hash SHA-256) sont refaites. Le jeu utilise le
+résultat tant qu'aucune source n'a été modifiée depuis, sinon il recharge
+les images d'origine.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pygame
+
+from game.asset_bake import BAKE_DIRNAME, SPRITE_HEIGHT, bake
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake the obstacle atlas, pre-scaled backgrounds and opacity flags")
+    parser.add_argument('folder', nargs='?', default=ASSETS_DIR, help="assets folder (default: assets/)")
+    parser.add_argument('--height', type=int, default=450, help="window height the backgrounds are scaled to")
+    parser.add_argument('--sprite-height', type=int, default=SPRITE_HEIGHT, help="max obstacle sprite height")
+    parser.add_argument('--force', action='store_true', help="rebuild everything")
+    args = parser.parse_args()
+
+    pygame.init()
+    start = time.perf_counter()
+    stats = bake(args.folder, args.height, args.sprite_height, args.force)
+    elapsed = (time.perf_counter() - start) * 1000
+    for error in stats["errors"]:
+        print(f"❌ {error}")
+    print(f"✅ {os.path.join(args.folder, BAKE_DIRNAME)}: {stats['sources']} source(s), {stats['hashed']} hashée(s), "
+          f"{stats['built']} sortie(s) refaite(s), {stats['reused']} à jour ({elapsed:.0f} ms)")
+    sys.exit(1 if stats["errors"] else 0)
+
+
+if __name__ == '__main__':
+    main()
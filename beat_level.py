@@ -0,0 +1,121 @@
+"""Aligne un niveau sur les temps de sa musique (analyse hors ligne).
+
+    python beat_level.py data/levels/level1.json              # tempo + écarts à la grille
+    python beat_level.py data/levels/level1.json --snap --write
+    python beat_level.py level.json --generate --every 2 --out level_beats.json
+
+La piste du champ `music` est analysée par blocs (`game/beat_analysis.py`:
+flux spectral, tempo, suivi des temps); le résultat est mis en cache par
+hash du fichier audio (`assets/.beat_cache/`), une deuxième passe est donc
+immédiate. `--snap` cale obstacles, spawns et QTE sur la grille,
+`--generate` ajoute des spawns (ou des obstacles fixes avec `--static`) sur
+les temps forts libres. Relancer `check_levels.py` après modification.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')  # décodage MP3/OGG via pygame.mixer, sans carte son
+
+from game.beat_analysis import analyze
+from game.beat_sync import beat_grid, generate_events, grid_offsets, music_breaks, snap_level, SPIKE
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+CACHE_DIR = os.path.join(ASSETS_DIR, '.beat_cache')
+
+
+def format_level(data: dict) -> str:
+    """JSON like the hand-written levels: one obstacle / timeline entry per line."""
+    lines = ["{"]
+    items = list(data.items())
+    for n, (key, value) in enumerate(items):
+        comma = "," if n < len(items) - 1 else ""
+        if isinstance(value, list) and value and all(isinstance(e, dict) for e in value):
+            lines.append(f"  {json.dumps(key)}: [")
+            lines.extend("    { " + json.dumps(e, ensure_ascii=False)[1:-1] + " }" + ("," if i < len(value) - 1 else "")
+                         for i, e in enumerate(value))
+            lines.append("  ]" + comma)
+        else:
+            lines.append(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}{comma}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def print_offsets(data, grid):
+    offsets = grid_offsets(data, grid)
+    for name, values in offsets.items():
+        if values:
+            ms = [abs(v) * 1000 for v in values]
+            print(f"   {name}: {len(ms)}, écart à la grille médian {statistics.median(ms):.0f} ms, max {max(ms):.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align a level with the beats of its music")
+    parser.add_argument('level', help="level JSON file")
+    parser.add_argument('--music', help="audio file (default: the level's `music`, under assets/)")
+    parser.add_argument('--subdivide', type=int, default=1, help="grid points per beat (2 = eighth notes)")
+    parser.add_argument('--snap', action='store_true', help="move obstacles, spawns and QTEs onto the grid")
+    parser.add_argument('--generate', action='store_true', help="add spawns on strong free beats")
+    parser.add_argument('--every', type=int, default=2, help="--generate: one entry every N beats")
+    parser.add_argument('--start', type=float, default=2.0, help="--generate: first beat time (s)")
+    parser.add_argument('--min-strength', type=float, default=0.0, help="--generate: minimum beat strength (0..1)")
+    parser.add_argument('--static', action='store_true', help="--generate: static obstacles instead of spawns")
+    parser.add_argument('--type', default=SPIKE['type'], help="--generate: obstacle type")
+    parser.add_argument('--write', action='store_true', help="overwrite the level file")
+    parser.add_argument('--out', help="write the modified level to this file")
+    parser.add_argument('--no-cache', action='store_true', help="ignore the analysis cache")
+    args = parser.parse_args()
+
+    with open(args.level, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    music = args.music or (data.get('music') and os.path.join(ASSETS_DIR, data['music']))
+    if not music or not os.path.exists(music):
+        print(f"❌ {args.level}: musique introuvable ({music or 'pas de champ music'})")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    analysis = analyze(music, cache_dir=None if args.no_cache else CACHE_DIR)
+    source = "cache" if analysis["cached"] else "analyse"
+    print(f"🎵 {music}: {analysis['tempo']:.1f} BPM, {len(analysis['beats'])} temps, "
+          f"{len(analysis['onsets'])} attaques, {analysis['duration']:.1f} s "
+          f"({source}, {(time.perf_counter() - start) * 1000:.0f} ms)")
+    grid = beat_grid(analysis['beats'], args.subdivide)
+    if not grid:
+        print("❌ aucun temps détecté")
+        sys.exit(1)
+    breaks = music_breaks(data)
+    if breaks:
+        print(f"⚠️ cue musique (play/pause/stop) à t={breaks[0]:.1f}s: la suite du niveau n'est plus calée sur la musique")
+    print("Avant:")
+    print_offsets(data, grid)
+
+    changed = False
+    if args.snap:
+        stats = snap_level(data, grid)
+        print(f"🎯 {stats['obstacles']} obstacle(s) ({stats['chains']} séquence(s) déplacées d'un bloc) "
+              f"et {stats['events']} événement(s) calés")
+        changed = True
+    if args.generate:
+        template = dict(SPIKE, type=args.type)
+        added = generate_events(data, analysis, every=args.every, start=args.start,
+                                min_strength=args.min_strength, template=template, static=args.static)
+        kind = "obstacle(s)" if args.static else "spawn(s)"
+        print(f"➕ {added} {kind} ajouté(s)")
+        changed = True
+    if changed:
+        print("Après:")
+        print_offsets(data, grid)
+        out = args.out or (args.level if args.write else None)
+        if out:
+            with open(out, 'w', encoding='utf-8') as f:
+                f.write(format_level(data))
+            print(f"✅ écrit: {out} (vérifier avec python check_levels.py {out})")
+        else:
+            print("(aperçu seulement: --write ou --out pour enregistrer)")
+
+
+if __name__ == '__main__':
+    main()
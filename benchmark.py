@@ -0,0 +1,270 @@
+"""Benchmarks de chargement, simulation et rendu sur des niveaux synthétiques.
+
+    python benchmark.py                              # 100 .. 1M obstacles
+    python benchmark.py --sizes 1000,100000 --json bench.json
+    python benchmark.py --compare bench.json         # échoue si régression > 20 %
+
+Chaque taille tourne dans un process neuf (pics mémoire indépendants), avec
+SDL_VIDEODRIVER/SDL_AUDIODRIVER=dummy. Mesures par taille:
+- chargement `Level.load_from_file` depuis le JSON, depuis le .gdl compilé et
+  en streaming (ms, médiane de --repeat essais)
+- coût d'un pas de simulation (`Simulation.step`, µs) et d'un frame de rendu
+  (`Game.draw_frame` + flip, ms): moyenne, p50, p95, p99; le pas est aussi
+  mesuré avec le store NumPy (`use_arrays=True`, `sim_arrays_*`) si NumPy
+  est installé
+- pic mémoire Python (tracemalloc) du chargement + création de la partie, et
+  RSS max du process
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from game.profiler import percentile
+from game.synthetic import DEFAULT_MIX, generate_level, parse_mix, write_level
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 1000000]
+DEFAULT_FRAMES = 600  # frames rendus à 60 FPS (TICK_RATE / 60 pas de simulation chacun)
+JUMP_EVERY = 30  # frames
+# métriques comparées par --compare (plus petit = mieux); médianes plutôt que
+# moyennes/p99, trop sensibles au GC et au bruit de la machine
+COMPARED = ["load_json_ms", "load_gdl_ms", "load_stream_ms", "sim_p50_us", "sim_arrays_p50_us", "render_p50_ms",
+            "peak_mb"]
+# écarts absolus en dessous desquels une différence est du bruit (par unité)
+NOISE_FLOOR = {"ms": 1.0, "us": 2.0, "mb": 0.5}
+
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def _summary(times, prefix, unit_scale):
+    ordered = sorted(t * unit_scale for t in times)
+    return {
+        prefix: statistics.fmean(ordered),
+        prefix.replace('frame', 'p50'): percentile(ordered, 50),
+        prefix.replace('frame', 'p95'): percentile(ordered, 95),
+        prefix.replace('frame', 'p99'): percentile(ordered, 99),
+    }
+
+
+def _invincible(sim):
+    # on mesure le coût d'un frame, pas la durée de survie
+    if sim.game_over and not sim.win:
+        sim.game_over = False
+
+
+def _inputs(frame):
+    from game.simulation import FrameInput, NO_INPUT
+    return FrameInput(jump=True) if frame % JUMP_EVERY == 0 else NO_INPUT
+
+
+def _ticks_per_frame():
+    from game.simulation import TICK_RATE
+    return max(1, TICK_RATE // 60)
+
+
+def _step_times(sim, frames):
+    from game.simulation import FIXED_DT
+    times = []
+    for tick in range(frames * _ticks_per_frame()):
+        inputs = _inputs(tick // _ticks_per_frame())
+        start = time.perf_counter()
+        sim.step(inputs, FIXED_DT)
+        times.append(time.perf_counter() - start)
+        _invincible(sim)
+    return times
+
+
+def bench_size(n, mix, spawns, frames, repeat, workdir):
+    """Run every measurement for one level size (called in a fresh process)."""
+    from game import level_binary
+    from game.level import Level
+    from game.obstacle_store import NUMPY_AVAILABLE
+    from game.simulation import Simulation
+
+    path = os.path.join(workdir, f"synthetic_{n}.json")
+    start = time.perf_counter()
+    write_level(path, generate_level(n, mix, spawns))
+    result = {"obstacles": n, "spawns": spawns, "generate_ms": (time.perf_counter() - start) * 1000,
+              "json_bytes": os.path.getsize(path)}
+
+    result["load_json_ms"] = _median_ms(lambda: Level.load_from_file(path, stream=False), repeat)
+    start = time.perf_counter()
+    gdl = level_binary.compile_level(path)
+    result["compile_ms"] = (time.perf_counter() - start) * 1000
+    result["gdl_bytes"] = os.path.getsize(gdl)
+    result["load_gdl_ms"] = _median_ms(lambda: Level.load_from_file(gdl, stream=False), repeat)
+    result["load_stream_ms"] = _median_ms(lambda: Level.load_from_file(gdl, stream=True), repeat)
+
+    # pic mémoire: chargement (format choisi par le jeu) + état de partie
+    tracemalloc.start()
+    level = Level.load_from_file(path)
+    sim = Simulation(level, seed=0)
+    result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    result["streamed"] = sim.streaming
+    if sim.streaming:
+        sim.index.close()
+    del sim, level
+
+    level = Level.load_from_file(path)
+    sim = Simulation(level, seed=0)
+    result.update(_summary(_step_times(sim, frames), "sim_frame_us", 1e6))
+    if sim.streaming:
+        sim.index.close()
+    del sim, level
+
+    # même partie avec le store NumPy (opt-in), niveau compilé chargé en entier
+    if NUMPY_AVAILABLE:
+        level = Level.load_from_file(gdl, stream=False)
+        sim = Simulation(level, seed=0, use_arrays=True)
+        result.update(_summary(_step_times(sim, frames), "sim_arrays_frame_us", 1e6))
+        del sim, level
+
+    result.update(bench_render(path, frames))
+    try:
+        import resource
+        # ru_maxrss: Ko sous Linux, octets sous macOS
+        scale = 1 if sys.platform == 'darwin' else 1024
+        result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+    except ImportError:
+        pass
+    return result
+
+
+def bench_render(path, frames):
+    import pygame
+    from game.engine import Game
+    from game.simulation import FIXED_DT
+
+    game = Game()
+    game.load_level(path)
+    game.sim = game.new_simulation(seed=0)
+    times = []
+    for frame in range(frames):
+        pygame.event.pump()
+        for _ in range(_ticks_per_frame()):
+            game.sim.step(_inputs(frame), FIXED_DT)
+            _invincible(game.sim)
+        game.view_scroll_x = game.sim.scroll_x
+        game.view_player_y = game.sim.player.rect.y
+        start = time.perf_counter()
+        game.draw_frame()
+        pygame.display.flip()
+        times.append(time.perf_counter() - start)
+    if game.sim.streaming:
+        game.sim.index.close()
+    pygame.quit()
+    return _summary(times, "render_frame_ms", 1000)
+
+
+def _run_one(args):
+    return bench_size(*args)
+
+
+def environment():
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S')}
+    try:
+        import pygame
+        info["pygame"] = pygame.version.ver
+    except ImportError:
+        pass
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    try:
+        info["commit"] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                        text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        pass
+    return info
+
+
+def print_result(r):
+    mode = "stream" if r["streamed"] else "mémoire"
+    print(f"{r['obstacles']:>8} obs | load json {r['load_json_ms']:9.1f} ms  gdl {r['load_gdl_ms']:8.1f} ms"
+          f"  stream {r['load_stream_ms']:6.1f} ms | sim {r['sim_frame_us']:7.1f} µs (p99 {r['sim_p99_us']:7.1f})"
+          + (f" numpy {r['sim_arrays_frame_us']:7.1f} µs" if 'sim_arrays_frame_us' in r else "") +
+          f" | rendu {r['render_frame_ms']:6.2f} ms (p99 {r['render_p99_ms']:6.2f})"
+          f" | pic {r['peak_mb']:7.1f} Mo ({mode})")
+
+
+def compare(results, baseline_path, threshold):
+    """Print metrics slower than the baseline by more than `threshold`; return their count."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r["obstacles"]: r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        base = baseline.get(r["obstacles"])
+        if base is None:
+            continue
+        for key in COMPARED:
+            old, new = base.get(key), r.get(key)
+            if not old or new is None:
+                continue
+            ratio = new / old - 1
+            if ratio > threshold and new - old > NOISE_FLOOR[key.rsplit('_', 1)[1]]:
+                regressions += 1
+                print(f"⚠️ {r['obstacles']} obs: {key} {old:.2f} -> {new:.2f} (+{ratio:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load/simulation/render benchmarks on synthetic levels")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated obstacle counts")
+    parser.add_argument('--mix', default=None,
+                        help="obstacle type weights, e.g. platform=0.4,spike=0.3,normal=0.3")
+    parser.add_argument('--spawns', type=float, default=0.01, help="timeline spawns per obstacle")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="frames simulated/rendered per size")
+    parser.add_argument('--repeat', type=int, default=3, help="load runs per format (median)")
+    parser.add_argument('--json', metavar='FILE', help="write the results as JSON")
+    parser.add_argument('--compare', metavar='FILE', help="baseline JSON from a previous run")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='gd_bench_') as workdir:
+        for n in sizes:
+            # un process par taille: pic RSS et caches propres à chaque mesure
+            with ctx.Pool(1) as pool:
+                r = pool.apply(_run_one, ((n, mix, int(n * args.spawns), args.frames, args.repeat, workdir),))
+            print_result(r)
+            results.append(r)
+            for name in os.listdir(workdir):
+                os.remove(os.path.join(workdir, name))
+
+    report = {"environment": environment(), "mix": mix, "frames": args.frames, "results": results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        failed = compare(results, args.compare, args.threshold)
+        print(f"{failed} régression(s) au-delà de {args.threshold:.0%}")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Mesure la latence du mixer et choisit la configuration audio de la machine.
+
+    python calibrate_audio.py                   # mesure et enregistre
+    python calibrate_audio.py --dry-run         # mesure seulement
+    python calibrate_audio.py --buffers 512 1024 --seconds 3
+
+Chaque taille de buffer joue du silence pendant `--seconds` secondes; on
+compare la position de lecture du mixer à l'horloge murale (dérive, gigue,
+délai de démarrage). La configuration stable la moins latente est écrite
+dans `data/audio_calibration.json`, que le jeu (`game/audio_clock.py`)
+utilise au démarrage avec sa latence. À relancer après un changement de
+carte son ou de pilote.
+"""
+import argparse
+import sys
+
+import pygame
+
+from game.audio_clock import CALIBRATION_BUFFERS, CALIBRATION_PATH, CALIBRATION_SECONDS, calibrate, save_calibration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure mixer latency per buffer size and pick the best config")
+    parser.add_argument('--buffers', type=int, nargs='+', default=list(CALIBRATION_BUFFERS),
+                        help="buffer sizes to try (samples)")
+    parser.add_argument('--frequency', type=int, default=44100)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=CALIBRATION_SECONDS, help="measure time per buffer size")
+    parser.add_argument('--dry-run', action='store_true', help="do not save the result")
+    args = parser.parse_args()
+
+    pygame.init()
+    best, results = calibrate(sorted(args.buffers), args.frequency, args.channels, args.seconds)
+    for r in results:
+        buffer = r["config"]["buffer"]
+        if "error" in r:
+            print(f"❌ buffer {buffer}: {r['error']}")
+            continue
+        mark = "✅" if r["stable"] else "⚠️"
+        print(f"{mark} buffer {buffer} ({r['buffer_ms']:.1f} ms): latence ~{r['latency_ms']:.1f} ms, "
+              f"démarrage {r['start_ms']:.1f} ms, dérive {r['rate_error'] * 100:+.2f} %, "
+              f"gigue {r['jitter_ms']:.2f} ms (max {r['max_error_ms']:.1f} ms)")
+    pygame.quit()
+    if best is None:
+        print("❌ aucune configuration stable: le jeu garde ses configurations par défaut")
+        sys.exit(1)
+    print(f"🎯 choisi: {best['config']} (latence ~{best['latency_ms']:.1f} ms)")
+    if not args.dry_run:
+        save_calibration(best, results)
+        print(f"✅ écrit: {CALIBRATION_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Vérifie que les niveaux sont faisables (bot de recherche de sauts).
+
+    python check_levels.py                    # tout data/levels, un process par niveau
+    python check_levels.py data/levels/level1.json --json report.json
+
+Pour chaque niveau: faisable ou non, les fenêtres de timing les plus serrées
+et, en cas d'échec, l'endroit où toutes les tentatives meurent.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.level import Level
+from game.solver import solve, DEFAULT_BEAM
+
+
+def find_levels(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, '*.json')))
+        else:
+            yield path
+
+
+def check(path, beam=DEFAULT_BEAM):
+    start = time.perf_counter()
+    try:
+        result = solve(Level.load_from_file(path, stream=False), beam=beam).to_dict()
+    except Exception as e:
+        result = {"solvable": False, "error": str(e)}
+    result["path"] = path
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def print_report(r):
+    if r.get("error"):
+        print(f"❌ {r['path']}: erreur {r['error']}")
+        return
+    if r["solvable"]:
+        print(f"✅ {r['path']}: faisable ({r['jumps']} sauts, {r['seconds']:.1f} s de recherche)")
+        for w in r["tightest"]:
+            print(f"     t={w['time']:6.2f}s x={w['x']:6d}: fenêtre {w['frames']} frame(s) (~{w['ms']:.0f} ms)")
+    else:
+        note = "" if r["exhaustive"] else " (recherche tronquée, augmenter --beam)"
+        print(f"❌ {r['path']}: impossible{note}, échec à t={r['fail_time']:.2f}s x={r['fail_x']}")
+        for o in r["fail_obstacles"]:
+            print(f"     obstacle x={o[0]} y={o[1]} w={o[2]} h={o[3]} ({o[4]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that levels can be completed")
+    parser.add_argument('paths', nargs='*', default=[os.path.join('data', 'levels')])
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="parallel processes")
+    parser.add_argument('--beam', type=int, default=DEFAULT_BEAM, help="max distinct states per frame")
+    parser.add_argument('--json', metavar='FILE', help="write the full report as JSON")
+    args = parser.parse_args()
+
+    paths = list(find_levels(args.paths))
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(paths) or 1))) as pool:
+        for r in pool.map(check, paths, [args.beam] * len(paths)):
+            print_report(r)
+            results.append(r)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    failed = sum(1 for r in results if not r["solvable"])
+    print(f"{len(results) - failed}/{len(results)} niveaux faisables")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
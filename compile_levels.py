@@ -0,0 +1,54 @@
+"""Compile JSON levels to the binary .gdl format.
+
+    python compile_levels.py                 # tout data/levels
+    python compile_levels.py data/levels/level1.json --force
+
+Only levels whose JSON changed since the last build are recompiled;
+`Level.load_from_file` then picks up the .gdl file automatically.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from game import level_binary
+
+
+def find_levels(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, '*.json')))
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile JSON levels to .gdl")
+    parser.add_argument('paths', nargs='*', default=[os.path.join('data', 'levels')],
+                        help="level files or directories (default: data/levels)")
+    parser.add_argument('--force', action='store_true', help="recompile even if up to date")
+    args = parser.parse_args()
+
+    built = skipped = failed = 0
+    for path in find_levels(args.paths):
+        if not args.force and level_binary.is_fresh(path):
+            skipped += 1
+            continue
+        start = time.perf_counter()
+        try:
+            out = level_binary.compile_level(path)
+        except ValueError as e:
+            print(f"❌ {e}")
+            failed += 1
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"✅ {path} -> {out} ({os.path.getsize(out)} octets, {elapsed:.1f} ms)")
+        built += 1
+    print(f"{built} compilé(s), {skipped} à jour" + (f", {failed} en erreur" if failed else ""))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
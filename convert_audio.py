@@ -1,100 +1,144 @@
-import pygame
-import numpy as np
-import wave
+"""Convert every audio asset to a mixer-ready format.
+
+    python convert_audio.py                  # assets/music + assets/sounds
+    python convert_audio.py assets/music/level1_music.wav --force
+    python convert_audio.py --rate 22050 --jobs 4
+
+WAV files (any PCM/float encoding, any rate) are streamed in fixed-size
+blocks, resampled with a polyphase filter and written as 16-bit stereo PCM
+to `<name>_converted.wav`. Files whose header does not match their
+extension (an MP3 named .wav) are copied under the right extension; MP3,
+OGG, FLAC and AIFF files are loaded by the mixer as they are.
+
+A SHA-256 of each source is stored in `assets/.audio_cache.json`: unchanged
+files (same content, same settings, output still present) are skipped.
+Files are processed in parallel, one process per core by default.
+"""
+import argparse
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from game.audio_convert import NUMPY_AVAILABLE, TARGET_RATE, convert_asset
+from game.hashing import file_digest
+
+AUDIO_DIRS = [os.path.join('assets', 'music'), os.path.join('assets', 'sounds')]
+AUDIO_EXTENSIONS = ('.wav', '.wave', '.mp3', '.ogg', '.oga', '.flac', '.aiff', '.aif')
+CACHE_PATH = os.path.join('assets', '.audio_cache.json')
+CACHE_VERSION = 1
+
+
+def find_audio(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    stem, ext = os.path.splitext(name)
+                    # les sorties de ce script ne sont pas des sources
+                    if ext.lower() in AUDIO_EXTENSIONS and not stem.endswith('_converted'):
+                        yield os.path.join(root, name)
+        else:
+            yield path
 
-def convert_wav_to_pygame_compatible():
-    """Convertit level1_music.wav vers un format compatible pygame"""
-    
-    input_file = r"C:\Users\lalle\OneDrive\Desktop\Code python\AI in Prod\geometry_dash_custom\assets\music\level1_music.wav"
-    output_file = r"C:\Users\lalle\OneDrive\Desktop\Code python\AI in Prod\geometry_dash_custom\assets\music\level1_music_converted.wav"
-    
+
+def load_cache(path):
     try:
-        print("🔄 Conversion en cours...")
-        
-        # Lire le fichier WAV original
-        with wave.open(input_file, 'rb') as wav_in:
-            # Obtenir les paramètres
-            frames = wav_in.readframes(-1)
-            sample_rate = wav_in.getframerate()
-            channels = wav_in.getnchannels()
-            sample_width = wav_in.getsampwidth()
-            
-            print(f"📊 Fichier original:")
-            print(f"   - Sample rate: {sample_rate} Hz")
-            print(f"   - Channels: {channels}")
-            print(f"   - Sample width: {sample_width} bytes")
-            
-            # Convertir en numpy array
-            if sample_width == 1:
-                dtype = np.uint8
-            elif sample_width == 2:
-                dtype = np.int16
-            elif sample_width == 4:
-                dtype = np.int32
-            else:
-                dtype = np.int16
-                
-            audio_data = np.frombuffer(frames, dtype=dtype)
-            
-            # Si mono, convertir en stéréo
-            if channels == 1:
-                audio_data = np.repeat(audio_data, 2)
-                channels = 2
-                print("🔄 Conversion mono → stéréo")
-            
-            # Reshape pour avoir la bonne forme (samples, channels)
-            if channels == 2:
-                audio_data = audio_data.reshape(-1, 2)
-            
-            # Normaliser et convertir en 16-bit si nécessaire
-            if dtype != np.int16:
-                # Normaliser vers -1 à 1, puis vers int16
-                audio_data = audio_data.astype(np.float32)
-                audio_data = audio_data / np.max(np.abs(audio_data))
-                audio_data = (audio_data * 32767).astype(np.int16)
-                print("🔄 Conversion vers 16-bit PCM")
-        
-        # Écrire le nouveau fichier WAV
-        with wave.open(output_file, 'wb') as wav_out:
-            wav_out.setnchannels(2)  # Stéréo
-            wav_out.setsampwidth(2)  # 16-bit
-            wav_out.setframerate(44100 if sample_rate > 22050 else 22050)  # Freq compatible
-            
-            # Si on change la fréquence, on doit rééchantillonner
-            if sample_rate != wav_out.getframerate():
-                print(f"🔄 Rééchantillonnage: {sample_rate} Hz → {wav_out.getframerate()} Hz")
-                # Rééchantillonnage simple (peut perdre un peu de qualité)
-                ratio = wav_out.getframerate() / sample_rate
-                new_length = int(len(audio_data) * ratio)
-                indices = np.linspace(0, len(audio_data) - 1, new_length).astype(int)
-                audio_data = audio_data[indices]
-            
-            wav_out.writeframes(audio_data.tobytes())
-        
-        print(f"✅ Conversion réussie!")
-        print(f"📁 Fichier converti: level1_music_converted.wav")
-        
-        # Tester le fichier converti
-        print("\n🧪 Test du fichier converti...")
-        pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
-        pygame.mixer.init()
-        
-        try:
-            pygame.mixer.music.load(output_file)
-            print("✅ Fichier converti compatible avec pygame!")
-            return True
-        except Exception as e:
-            print(f"❌ Fichier converti toujours incompatible: {e}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Erreur lors de la conversion: {e}")
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('files', {}) if data.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(path, files):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def is_fresh(path, entry, rate):
+    """True if the cached result of `path` is still valid.
+
+    The content is only hashed when mtime/size changed; a file touched but
+    identical gets its new mtime/size recorded in `entry`.
+    """
+    if not entry or entry.get('rate') != rate or entry.get('action') == 'error':
         return False
+    if entry.get('output') and not os.path.exists(entry['output']):
+        return False
+    st = os.stat(path)
+    if entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+        return True
+    if entry.get('sha256') != file_digest(path):
+        return False
+    entry['mtime_ns'], entry['size'] = st.st_mtime_ns, st.st_size
+    return True
+
 
-if __name__ == "__main__":
-    success = convert_wav_to_pygame_compatible()
-    if success:
-        print("\n🎉 Tu peux maintenant utiliser level1_music_converted.wav dans ton jeu!")
+def _job(path, rate):
+    start = time.perf_counter()
+    info = convert_asset(path, rate)
+    info["ms"] = (time.perf_counter() - start) * 1000
+    return info
+
+
+def report(info):
+    name = info["source"]
+    action = info["action"]
+    if action == "converted":
+        print(f"✅ {name} -> {info['output']} ({info['source_rate']} Hz {info['source_channels']} ch "
+              f"{info['source_bits']} bits {info['source_encoding']} -> {info['output_frames']} frames, "
+              f"{info['ms']:.0f} ms)")
+    elif action == "copied":
+        print(f"📋 {name}: contenu {info['container'].upper()} -> {info['output']}")
+    elif action == "native":
+        print(f"🎵 {name}: {info['container'].upper()} lu directement par le mixer")
     else:
-        print("\n😔 La conversion a échoué. Essaie un convertisseur en ligne.")
\ No newline at end of file
+        print(f"❌ {name}: {info['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert audio assets to mixer-ready 16-bit PCM")
+    parser.add_argument('paths', nargs='*', default=AUDIO_DIRS,
+                        help="audio files or directories (default: assets/music assets/sounds)")
+    parser.add_argument('--rate', type=int, default=TARGET_RATE, help="output sample rate in Hz")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="parallel worker processes")
+    parser.add_argument('--force', action='store_true', help="reconvert even if unchanged")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ numpy est requis pour la conversion (pip install -r requirements-tools.txt)")
+        raise SystemExit(1)
+
+    cache = load_cache(CACHE_PATH)
+    todo, skipped = [], 0
+    for path in find_audio(args.paths):
+        key = os.path.relpath(path).replace(os.sep, '/')
+        if not args.force and is_fresh(path, cache.get(key), args.rate):
+            skipped += 1
+            continue
+        todo.append((key, path))
+
+    failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(todo)))) as pool:
+            futures = {pool.submit(_job, path, args.rate): (key, path) for key, path in todo}
+            for future in as_completed(futures):
+                key, path = futures[future]
+                info = future.result()
+                report(info)
+                if info["action"] == "error":
+                    failed += 1
+                st = os.stat(path)
+                cache[key] = {"sha256": info["sha256"], "rate": args.rate, "action": info["action"],
+                              "output": info.get("output"), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    save_cache(CACHE_PATH, cache)
+    print(f"{len(todo) - failed} traité(s), {skipped} inchangé(s), {failed} erreur(s)")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
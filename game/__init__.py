@@ -1,3 +1,3 @@
 """Game package for Geometry Dash Custom prototype."""
 
-__all__ = ["engine", "player", "level"]
+__all__ = ["engine", "player", "level", "simulation", "broadphase", "obstacle_store", "surface_cache", "fonts", "dirty", "assets", "level_binary", "manifest", "scheduler", "streaming", "replay", "solver", "profiler", "synthetic", "collision", "audio_convert", "beat_analysis", "beat_sync", "audio_clock", "anim_cache", "asset_bake", "hashing"]
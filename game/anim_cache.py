@@ -0,0 +1,147 @@
+"""On-disk cache of decoded animations (GIF -> raw RGBA spritesheet).
+
+Decoding a GIF through PIL costs a `convert('RGBA')` per frame on every
+run. `load_sheet` does it once: frames are resized to the size they are
+drawn at (so the engine blits them as is), streamed to
+`<cache>/<sha256>_<w>x<h>.rgba`
+(frames stacked vertically, raw RGBA) and described by a JSON index with
+the per-frame durations read from the GIF. The key is the content hash of
+the source plus the display size, so an edited GIF or a new size gets a new
+entry, and reading an entry back needs neither PIL nor a decode.
+
+`Animation` maps the spritesheet and converts frames on first access,
+keeping only the last `KEEP_FRAMES` surfaces: a long animation costs its
+file in the page cache, not every frame in RAM.
+"""
+import json
+import mmap
+import os
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import pygame
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .hashing import file_digest
+
+CACHE_VERSION = 2  # v2: frames à la taille d'affichage exacte (plus seulement plafonnées)
+CACHE_DIRNAME = '.anim_cache'  # à côté de l'asset source
+DEFAULT_DURATION = 100  # ms, comme les navigateurs pour un délai absent ou <= 10 ms
+KEEP_FRAMES = 16
+
+
+class SpriteSheet:
+    """Read-only view of a cached spritesheet: frame i is bytes [i*frame_bytes, (i+1)*frame_bytes)."""
+
+    def __init__(self, path: str, size: Tuple[int, int], durations: List[int]):
+        self.path = path
+        self.size = size
+        self.durations = durations
+        self.frame_bytes = size[0] * size[1] * 4
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < self.frame_bytes * len(durations):
+            self._map.close()
+            raise ValueError(f"truncated spritesheet: {os.path.basename(path)}")
+
+    def __len__(self):
+        return len(self.durations)
+
+    def frame(self, i: int) -> bytes:
+        start = i * self.frame_bytes
+        return self._map[start:start + self.frame_bytes]
+
+
+def frame_duration(info: dict) -> int:
+    duration = info.get('duration')
+    return int(duration) if duration and duration > 10 else DEFAULT_DURATION
+
+
+def build_sheet(source: str, sheet_path: str, size=None) -> Tuple[Tuple[int, int], List[int]]:
+    """Decode every frame of `source` into `sheet_path`, one at a time, resized to `size` (None: as is).
+
+    Returns (frame size, durations).
+    """
+    durations = []
+    tmp = sheet_path + ".tmp"
+    with Image.open(source) as image, open(tmp, 'wb') as out:
+        try:
+            while True:
+                frame = image.convert('RGBA')
+                if size is None:
+                    size = frame.size
+                if frame.size != size:
+                    frame = frame.resize(size, Image.BOX)  # moyenne par zone: rapide et propre en réduction
+                out.write(frame.tobytes())
+                durations.append(frame_duration(image.info))
+                image.seek(image.tell() + 1)
+        except EOFError:
+            pass  # Fin du GIF
+    os.replace(tmp, sheet_path)
+    return size, durations
+
+
+def load_sheet(source: str, size=None, cache_dir: Optional[str] = None) -> SpriteSheet:
+    """Cached spritesheet of `source` with frames of `size` (w, h), built if needed."""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(source), CACHE_DIRNAME)
+    digest = file_digest(source)
+    label = f"{size[0]}x{size[1]}" if size else "full"
+    base = os.path.join(cache_dir, f"{digest}_{label}")
+    try:
+        with open(base + ".json", 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("version") == CACHE_VERSION:
+            return SpriteSheet(base + ".rgba", tuple(index["size"]), index["durations"])
+    except (OSError, ValueError, KeyError):
+        pass
+    if not PIL_AVAILABLE:
+        raise ImportError("PIL/Pillow is required to decode GIF animations")
+    os.makedirs(cache_dir, exist_ok=True)
+    size, durations = build_sheet(source, base + ".rgba", tuple(size) if size else None)
+    # l'index est écrit en dernier: il valide l'entrée
+    tmp = base + ".json.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "source": os.path.basename(source), "size": list(size),
+                   "durations": durations}, f)
+    os.replace(tmp, base + ".json")
+    return SpriteSheet(base + ".rgba", size, durations)
+
+
+class Animation:
+    """Sequence of frames with per-frame `durations` (ms), converted on first access.
+
+    Backed either by a `SpriteSheet` (lazy, at most `keep` surfaces alive)
+    or by a list of ready surfaces.
+    """
+
+    def __init__(self, sheet: Optional[SpriteSheet] = None, surfaces=None, durations=None,
+                 keep: int = KEEP_FRAMES):
+        self.sheet = sheet
+        self.keep = keep
+        self._surfaces = list(surfaces) if surfaces is not None else None
+        self._recent = OrderedDict()
+        if sheet is not None:
+            self.durations = list(sheet.durations)
+        else:
+            self.durations = list(durations) if durations else [DEFAULT_DURATION] * len(self._surfaces)
+
+    def __len__(self):
+        return len(self.durations)
+
+    def __getitem__(self, i: int) -> pygame.Surface:
+        if self._surfaces is not None:
+            return self._surfaces[i]
+        surface = self._recent.get(i)
+        if surface is not None:
+            self._recent.move_to_end(i)
+            return surface
+        surface = pygame.image.frombuffer(self.sheet.frame(i), self.sheet.size, 'RGBA').convert_alpha()
+        self._recent[i] = surface
+        if len(self._recent) > self.keep:
+            self._recent.popitem(last=False)
+        return surface
@@ -0,0 +1,257 @@
+"""Offline image bake: obstacle atlas, pre-scaled backgrounds, opacity flags.
+
+`bake` (run by `bake_assets.py`) writes to `assets/.baked/`:
+- `obstacles.png`: every `obstacle<N>.png` (any N, in numeric order),
+  reduced to `SPRITE_HEIGHT` (they are drawn at obstacle size, under
+  ~110 px) and packed in rows; the manifest lists each sprite's rect
+- `background<N>_<h>.png`: every `background<N>.png` scaled to the window
+  height, as the engine used to do at load time
+- `manifest.json`: the index above plus, per source, its SHA-256, size,
+  mtime and whether it is fully opaque (loaded with `convert()` instead of
+  `convert_alpha()`, which blits faster)
+
+Rebuilds are incremental: a source is re-hashed only when its size or
+mtime changed, and an output is rebuilt only when the hash of one of its
+sources (or the target size) changed.
+
+`BakedAssets.load` is the runtime side: one manifest read plus one
+directory listing to check that no source changed since the bake (else
+None and the engine loads the sources as before).
+"""
+import json
+import os
+import re
+from hashlib import sha256
+from typing import Dict, List, Optional
+
+import pygame
+
+from .hashing import file_digest
+
+BAKE_DIRNAME = '.baked'
+MANIFEST_NAME = 'manifest.json'
+BAKE_VERSION = 1
+SPRITE_HEIGHT = 128  # px: hauteur max des sprites d'obstacles dans l'atlas
+ATLAS_WIDTH = 2048
+ATLAS_NAME = 'obstacles.png'
+# images chargées telles quelles, dont on ne garde que le drapeau d'opacité
+PLAIN_IMAGES = ('player.png', os.path.join('ui', 'game_over.png'))
+
+
+def numbered(folder: str, prefix: str, ext: str = '.png') -> List[str]:
+    """Names `<prefix><N><ext>` found in `folder`, sorted by N."""
+    pattern = re.compile(re.escape(prefix) + r'(\d+)' + re.escape(ext) + '$')
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return []
+    found = [(int(m.group(1)), name) for name in names for m in [pattern.match(name)] if m]
+    return [name for _, name in sorted(found)]
+
+
+def is_opaque(surface: pygame.Surface) -> bool:
+    """True if every pixel is fully opaque (no per-pixel alpha needed)."""
+    if not surface.get_flags() & pygame.SRCALPHA and surface.get_colorkey() is None:
+        return True
+    w, h = surface.get_size()
+    return pygame.mask.from_surface(surface, 254).count() == w * h
+
+
+def _rgba(surface: pygame.Surface) -> pygame.Surface:
+    """32-bit copy usable by smoothscale (palette / 16-bit images), without a display."""
+    if surface.get_bitsize() in (24, 32):
+        return surface
+    out = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+    out.blit(surface, (0, 0))
+    return out
+
+
+def _scaled(surface: pygame.Surface, height: int, upscale: bool = True) -> pygame.Surface:
+    w, h = surface.get_size()
+    if h == height or (h < height and not upscale):
+        return surface
+    return pygame.transform.smoothscale(_rgba(surface), (max(1, int((w / h) * height)), height))
+
+
+def pack_rows(sizes, width: int = ATLAS_WIDTH):
+    """Shelf packing: (x, y) per size in input order, and the atlas size."""
+    positions = []
+    x = y = row_h = 0
+    used_w = 0
+    for w, h in sizes:
+        if x and x + w > width:
+            x, y, row_h = 0, y + row_h, 0
+        positions.append((x, y))
+        x += w
+        row_h = max(row_h, h)
+        used_w = max(used_w, x)
+    return positions, (max(1, used_w), max(1, y + row_h))
+
+
+def _key(*parts) -> str:
+    return sha256(json.dumps(parts).encode()).hexdigest()
+
+
+def _read_manifest(out_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get('version') == BAKE_VERSION else None
+
+
+def bake(folder: str, height: int = 450, sprite_height: int = SPRITE_HEIGHT, force: bool = False) -> Dict:
+    """Bake the images of `folder` for a window `height`; returns counts of rebuilt / reused outputs."""
+    out_dir = os.path.join(folder, BAKE_DIRNAME)
+    old = None if force else _read_manifest(out_dir)
+    old = old or {}
+    old_sources = old.get('sources', {})
+    stats = {"hashed": 0, "built": 0, "reused": 0, "errors": []}
+
+    obstacles = numbered(folder, 'obstacle')
+    backgrounds = numbered(folder, 'background')
+    plain = [name for name in PLAIN_IMAGES if os.path.exists(os.path.join(folder, name))]
+    sources = {}
+    images = {}  # surfaces chargées pendant ce bake
+
+    def load(name):
+        if name not in images:
+            images[name] = pygame.image.load(os.path.join(folder, name))
+        return images[name]
+
+    for name in obstacles + backgrounds + plain:
+        path = os.path.join(folder, name)
+        st = os.stat(path)
+        prev = old_sources.get(name)
+        if prev and prev['size'] == st.st_size and prev['mtime_ns'] == st.st_mtime_ns:
+            sources[name] = prev
+            continue
+        digest = file_digest(path)
+        stats["hashed"] += 1
+        if prev and prev['sha256'] == digest:
+            sources[name] = dict(prev, size=st.st_size, mtime_ns=st.st_mtime_ns)  # touché, pas modifié
+            continue
+        try:
+            opaque = is_opaque(load(name))
+        except pygame.error as e:
+            stats["errors"].append(f"{name}: {e}")
+            continue
+        sources[name] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "opaque": opaque}
+    obstacles = [n for n in obstacles if n in sources]
+    backgrounds = [n for n in backgrounds if n in sources]
+    os.makedirs(out_dir, exist_ok=True)
+
+    # atlas des obstacles
+    atlas = old.get('atlas')
+    key = _key([(n, sources[n]['sha256']) for n in obstacles], sprite_height)
+    if not obstacles:
+        atlas = None
+    elif atlas is None or atlas.get('key') != key or not os.path.exists(os.path.join(out_dir, ATLAS_NAME)):
+        sprites = [_scaled(load(n), sprite_height, upscale=False) for n in obstacles]
+        positions, size = pack_rows([s.get_size() for s in sprites])
+        opaque = all(sources[n]['opaque'] for n in obstacles)
+        sheet = pygame.Surface(size, 0 if opaque else pygame.SRCALPHA, 24 if opaque else 32)
+        for sprite, pos in zip(sprites, positions):
+            # copie exacte (un blit normal mélangerait l'alpha avec le fond transparent)
+            sheet.blit(sprite, pos, special_flags=0 if opaque else pygame.BLEND_RGBA_MAX)
+        pygame.image.save(sheet, os.path.join(out_dir, ATLAS_NAME))
+        atlas = {"file": ATLAS_NAME, "key": key, "opaque": opaque,
+                 "sprites": [{"name": n, "rect": [x, y, *s.get_size()]}
+                             for n, s, (x, y) in zip(obstacles, sprites, positions)]}
+        stats["built"] += 1
+    else:
+        stats["reused"] += 1
+
+    # fonds pré-redimensionnés
+    old_bgs = {b['source']: b for b in old.get('backgrounds', [])}
+    baked_bgs = []
+    for name in backgrounds:
+        key = _key(sources[name]['sha256'], height)
+        out = f"{os.path.splitext(name)[0]}_{height}.png"
+        prev = old_bgs.get(name)
+        if prev and prev['key'] == key and os.path.exists(os.path.join(out_dir, out)):
+            baked_bgs.append(prev)
+            stats["reused"] += 1
+            continue
+        scaled = _scaled(load(name), height)
+        pygame.image.save(scaled, os.path.join(out_dir, out))
+        baked_bgs.append({"source": name, "file": out, "key": key, "size": list(scaled.get_size()),
+                          "opaque": sources[name]['opaque']})
+        stats["built"] += 1
+
+    manifest = {"version": BAKE_VERSION, "height": height, "sprite_height": sprite_height,
+                "sources": sources, "atlas": atlas, "backgrounds": baked_bgs}
+    tmp = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST_NAME))
+
+    # sorties qui ne correspondent plus à aucune source
+    keep = {MANIFEST_NAME} | {b['file'] for b in baked_bgs} | ({atlas['file']} if atlas else set())
+    for name in os.listdir(out_dir):
+        if name not in keep and name.endswith('.png'):
+            os.remove(os.path.join(out_dir, name))
+    stats["sources"] = len(sources)
+    return stats
+
+
+class BakedAssets:
+    """Runtime view of `assets/.baked/manifest.json`."""
+
+    def __init__(self, folder: str, data: Dict):
+        self.folder = folder
+        self.dir = os.path.join(folder, BAKE_DIRNAME)
+        self.data = data
+        self.height = data['height']
+
+    @classmethod
+    def load(cls, folder: str) -> Optional['BakedAssets']:
+        """Manifest of `folder`, or None if missing or any source changed since the bake."""
+        data = _read_manifest(os.path.join(folder, BAKE_DIRNAME))
+        if data is None:
+            return None
+        sources = data['sources']
+        stamps = {}
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    stamps[entry.name] = (st.st_size, st.st_mtime_ns)
+        # obstacles / fonds ajoutés ou supprimés depuis le bake
+        current = set(numbered(folder, 'obstacle') + numbered(folder, 'background'))
+        baked = {n for n in sources if n.startswith(('obstacle', 'background'))}
+        if current != baked:
+            return None
+        for name, info in sources.items():
+            if os.sep in name:
+                try:
+                    st = os.stat(os.path.join(folder, name))
+                except OSError:
+                    return None
+                stamp = (st.st_size, st.st_mtime_ns)
+            else:
+                stamp = stamps.get(name)
+            if stamp != (info['size'], info['mtime_ns']):
+                return None
+        return cls(folder, data)
+
+    def alpha(self, name: str) -> bool:
+        """Whether `name` needs per-pixel alpha (True when unknown)."""
+        info = self.data['sources'].get(name)
+        return not info['opaque'] if info else True
+
+    @property
+    def atlas(self):
+        """(atlas path, needs alpha, list of sprite rects) or None."""
+        atlas = self.data.get('atlas')
+        if not atlas:
+            return None
+        rects = tuple(tuple(s['rect']) for s in atlas['sprites'])
+        return os.path.join(self.dir, atlas['file']), not atlas['opaque'], rects
+
+    def backgrounds(self, height: int):
+        """[(path, needs alpha)] of the backgrounds baked for `height`, or None for another height."""
+        if height != self.height:
+            return None
+        return [(os.path.join(self.dir, b['file']), not b['opaque']) for b in self.data['backgrounds']]
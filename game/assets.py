@@ -0,0 +1,218 @@
+"""Process-wide asset manager.
+
+Images, scaled backgrounds, animations and sounds are loaded once per
+process and shared by every `Game` (restarts, level changes, menu). Entries
+are keyed by path and validated against the file's mtime/size, so editing
+an asset on disk reloads it on next use. GIF animations are also cached
+across runs as decoded spritesheets (`game/anim_cache.py`).
+
+Assets are requested through an `AssetLoader`. Loading is split in two
+steps: `decode` (file I/O, PNG/GIF decode, scaling) is thread-safe and runs
+on a worker pool, while `finalize` (`convert_alpha`, `Sound` creation) stays
+on the display thread (`AssetLoader.pump`, or `wait_all` to block).
+"""
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from .anim_cache import Animation, PIL_AVAILABLE, load_sheet
+from .asset_bake import is_opaque
+
+
+class AssetManager:
+    """Cache of loaded assets keyed by (kind, path, params), checked against mtime."""
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def stamp(path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    # --- decode (worker thread) / finalize (display thread) per kind ---
+
+    @staticmethod
+    def decode(kind: str, path: str, params):
+        if kind in ('image', 'scaled_h', 'atlas'):
+            img = pygame.image.load(path)  # surface non convertie
+            if kind == 'scaled_h':
+                w, h = img.get_size()
+                img = pygame.transform.scale(img, (int((w / h) * params), params))
+                return img, is_opaque(img)  # test d'opacité ici, hors du thread d'affichage
+            return img
+        if kind == 'animation':
+            if path.lower().endswith('.gif'):
+                try:
+                    return ('sheet', load_sheet(path, params))  # params: taille d'affichage
+                except ImportError:
+                    pass  # ni cache ni PIL: première frame seulement
+            img = pygame.image.load(path)
+            return ('image', pygame.transform.scale(img, params) if params else img)
+        if kind == 'sound':
+            with open(path, 'rb') as f:
+                return f.read()
+        raise ValueError(f"unknown asset kind: {kind}")
+
+    @staticmethod
+    def finalize(kind: str, raw, params):
+        if kind == 'image':
+            return raw.convert_alpha() if params else raw.convert()
+        if kind == 'scaled_h':
+            img, opaque = raw
+            return img.convert() if opaque else img.convert_alpha()
+        if kind == 'atlas':
+            alpha, rects = params
+            sheet = raw.convert_alpha() if alpha else raw.convert()
+            return [sheet.subsurface(rect) for rect in rects]
+        if kind == 'animation':
+            if raw[0] == 'sheet':
+                return Animation(raw[1])
+            return Animation(surfaces=[raw[1].convert_alpha()])
+        if kind == 'sound':
+            return pygame.mixer.Sound(file=io.BytesIO(raw))
+        raise ValueError(f"unknown asset kind: {kind}")
+
+    # --- cache ---
+
+    def lookup(self, kind: str, path: str, params, stamp):
+        """(True, value) if a fresh entry exists, else (False, None)."""
+        entry = self._entries.get((kind, path, params))
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return True, entry[1]
+        return False, None
+
+    def store(self, kind: str, path: str, params, stamp, value):
+        # failures (None) are cached too, until the file changes
+        self._entries[(kind, path, params)] = (stamp, value)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# gestionnaire partagé par tout le processus
+assets = AssetManager()
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 2) + 2),
+                                       thread_name_prefix="asset-decode")
+    return _executor
+
+
+class AssetJob:
+    """One asset requested through an AssetLoader."""
+
+    __slots__ = ("kind", "path", "params", "critical", "stamp", "future", "value", "done")
+
+    def __init__(self, kind, path, params, critical):
+        self.kind = kind
+        self.path = path
+        self.params = params
+        self.critical = critical
+        self.stamp = None
+        self.future = None
+        self.value = None
+        self.done = False
+
+
+class AssetLoader:
+    """Decodes requested assets on the worker pool; `pump()` finalizes them.
+
+    `pump()` must be called from the display thread (it does the
+    `convert_alpha` calls). Decorative jobs are only submitted once every
+    critical job is ready, so they never compete with the assets gameplay
+    is waiting for; they stream in while the level is already running.
+    """
+
+    def __init__(self, manager: AssetManager = assets):
+        self.manager = manager
+        self.jobs = []
+        self._deferred = []
+
+    def request(self, kind: str, path: str, params=None, critical: bool = False) -> AssetJob:
+        path = os.path.abspath(path)
+        if kind == 'sound':
+            params = pygame.mixer.get_init()
+        job = AssetJob(kind, path, params, critical)
+        self.jobs.append(job)
+        job.stamp = self.manager.stamp(path)
+        if job.stamp is None or (kind == 'sound' and params is None):
+            job.done = True
+            return job
+        found, value = self.manager.lookup(kind, path, params, job.stamp)
+        if found:
+            job.value, job.done = value, True
+        else:
+            self.manager.misses += 1
+            if critical:
+                self._submit(job)
+            else:
+                self._deferred.append(job)
+        return job
+
+    def _submit(self, job: AssetJob):
+        job.future = _get_executor().submit(self.manager.decode, job.kind, job.path, job.params)
+
+    def _submit_deferred(self):
+        if self._deferred and self.critical_ready:
+            for job in self._deferred:
+                self._submit(job)
+            self._deferred = []
+
+    def pump(self, budget: float = 0.004) -> int:
+        """Finalize decoded jobs for up to `budget` seconds; return how many."""
+        self._submit_deferred()
+        deadline = time.perf_counter() + budget
+        finished = 0
+        for job in sorted((j for j in self.jobs if not j.done), key=lambda j: not j.critical):
+            if job.future is None or not job.future.done():
+                continue
+            try:
+                job.value = self.manager.finalize(job.kind, job.future.result(), job.params)
+            except Exception as e:
+                print(f"Erreur chargement {os.path.basename(job.path)}: {e}")
+                job.value = None
+            self.manager.store(job.kind, job.path, job.params, job.stamp, job.value)
+            job.done = True
+            finished += 1
+            if time.perf_counter() >= deadline:
+                break
+        return finished
+
+    def wait_all(self):
+        """Block until every job is finalized (synchronous loading)."""
+        while not self.all_ready:
+            self._submit_deferred()
+            for job in self.jobs:
+                if not job.done and job.future is not None:
+                    job.future.exception()  # attend la fin du décodage
+            self.pump(budget=float('inf'))
+
+    @property
+    def progress(self):
+        return sum(1 for j in self.jobs if j.done), len(self.jobs)
+
+    @property
+    def critical_ready(self) -> bool:
+        return all(j.done for j in self.jobs if j.critical)
+
+    @property
+    def all_ready(self) -> bool:
+        return all(j.done for j in self.jobs)
@@ -0,0 +1,241 @@
+"""Game clock slaved to the music, mixer setup and latency calibration.
+
+`MusicClock.advance(wall_dt)` returns the game time step of a frame: the
+wall-clock time, nudged towards the music playback position
+(`pygame.mixer.music.get_pos()` minus the output latency) so timeline
+events stay on the music over a whole level. Small errors are absorbed
+progressively (time constant `DRIFT_TAU`, speed changed by at most
+`MAX_SLEW`); errors above `RESYNC` (hitch, seek) jump at once. Without
+music (no mixer, paused or stopped by a level cue) the clock runs on the
+wall clock; `rebase()` re-anchors it after a discontinuity (resume, cue).
+QTEs only lower the music volume, so the clock stays on the music
+through them.
+
+`init_mixer` opens the mixer with the configuration chosen by
+`calibrate` (saved in `CALIBRATION_PATH`) or the first fallback of
+`MIXER_CONFIGS` that works. `calibrate` plays silence with each buffer
+size and measures how the reported playback position follows the wall
+clock: rate error, jitter and start delay. The estimated latency (start
+delay + one buffer) covers the mixer and driver queues; what the OS adds
+after the driver is not observable without a loopback.
+"""
+import json
+import os
+import tempfile
+import time
+import wave
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+DRIFT_TAU = 0.5  # s: constante de temps de la correction de dérive
+MAX_SLEW = 0.05  # vitesse du jeu modifiée d'au plus 5 % pendant une correction
+RESYNC = 0.15  # s: au-delà, recalage immédiat
+
+# configurations essayées dans l'ordre sans calibration
+MIXER_CONFIGS = [
+    {'frequency': 44100, 'size': -16, 'channels': 2, 'buffer': 512},
+    {'frequency': 22050, 'size': -16, 'channels': 2, 'buffer': 1024},
+    {'frequency': 44100, 'size': -16, 'channels': 1, 'buffer': 2048},
+    {'frequency': 22050, 'size': -16, 'channels': 1, 'buffer': 4096},
+]
+CALIBRATION_BUFFERS = (256, 512, 1024, 2048, 4096)
+CALIBRATION_SECONDS = 1.5  # mesure par taille de buffer
+CALIBRATION_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data', 'audio_calibration.json'))
+CALIBRATION_VERSION = 1
+MAX_RATE_ERROR = 0.01  # position qui avance à 1 % près de l'horloge murale
+MAX_JITTER_MS = 3.0
+
+_current_config = None  # configuration ouverte par ce module
+
+
+class MusicClock:
+    """Frame time source following the music playback position."""
+
+    def __init__(self, latency: float = 0.0, tau: float = DRIFT_TAU, max_slew: float = MAX_SLEW,
+                 resync: float = RESYNC):
+        self.latency = latency
+        self.tau = tau
+        self.max_slew = max_slew
+        self.resync = resync
+        self.time = 0.0  # temps de jeu
+        self.offset = None  # temps de jeu - position audible; None = pas ancré
+        self.error = 0.0  # dernier écart (musique - jeu), s
+        self.resyncs = 0
+
+    def music_position(self) -> Optional[float]:
+        """Audible position of the music in seconds, or None when it is not playing."""
+        if pygame.mixer.get_init() is None or not pygame.mixer.music.get_busy():
+            return None
+        pos = pygame.mixer.music.get_pos()
+        if pos < 0:
+            return None
+        return pos / 1000.0 - self.latency
+
+    def start(self):
+        """New run: game time 0 is when the start of the music is heard."""
+        self.time = 0.0
+        self.error = 0.0
+        self.offset = 0.0 if self.music_position() is not None else None
+
+    def rebase(self):
+        """Keep the current game time across a jump of the music position (unpause, cue)."""
+        pos = self.music_position()
+        self.offset = None if pos is None else self.time - pos
+
+    def advance(self, wall_dt: float, max_step: float = 0.25) -> float:
+        """Game time elapsed during a frame that took `wall_dt` seconds (at most `max_step`).
+
+        A bigger jump ahead of the music is caught up over the next frames.
+        """
+        dt = wall_dt
+        pos = self.music_position()
+        if pos is None:
+            # musique en pause ou arrêtée: on ré-ancre à la reprise
+            self.offset = None
+        elif self.offset is None:
+            self.offset = self.time + wall_dt - pos
+        else:
+            error = pos + self.offset - (self.time + wall_dt)
+            self.error = error
+            if abs(error) > self.resync:
+                dt = min(max(0.0, wall_dt + error), max_step)  # le jeu ne recule pas: il attend la musique
+                self.resyncs += 1
+            else:
+                limit = self.max_slew * wall_dt
+                dt = wall_dt + max(-limit, min(limit, error * wall_dt / self.tau))
+        self.time += dt
+        return dt
+
+
+def _open(config: Dict) -> None:
+    global _current_config
+    if pygame.mixer.get_init() is not None:
+        if config == _current_config:
+            return
+        pygame.mixer.quit()  # pygame.init() ouvre le mixer avec ses valeurs par défaut
+    pygame.mixer.pre_init(**config)
+    pygame.mixer.init()
+    _current_config = dict(config)
+
+
+def load_calibration(path: str = CALIBRATION_PATH) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get('version') == CALIBRATION_VERSION and data.get('config') else None
+
+
+def buffer_latency(config: Dict) -> float:
+    return config['buffer'] / config['frequency']
+
+
+def init_mixer(path: str = CALIBRATION_PATH) -> Tuple[Optional[Dict], float]:
+    """Open the mixer; returns (config, output latency in s), or (None, 0) without audio."""
+    calibration = load_calibration(path)
+    configs = list(MIXER_CONFIGS)
+    if calibration:
+        configs.insert(0, calibration['config'])
+    for config in configs:
+        try:
+            _open(config)
+        except pygame.error as e:
+            print(f"⚠️ Échec config audio {config}: {e}")
+            continue
+        if calibration and config == calibration['config']:
+            latency = calibration['latency_ms'] / 1000.0
+            print(f"✅ Audio initialisé (calibré): {config}, latence {calibration['latency_ms']:.0f} ms")
+        else:
+            latency = buffer_latency(config)
+            print(f"✅ Audio initialisé: {config}")
+        return config, latency
+    return None, 0.0
+
+
+def _silence_file(seconds: float, rate: int = 44100) -> str:
+    fd, path = tempfile.mkstemp(suffix='.wav', prefix='gd_calib_')
+    os.close(fd)
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(int(seconds * rate) * 4))
+    return path
+
+
+def _fit(samples: List[Tuple[float, float]]) -> Tuple[float, float, float]:
+    """Least-squares line pos = a*t + b; returns (a, rms residual, max |residual|)."""
+    n = len(samples)
+    mt = sum(t for t, _ in samples) / n
+    mp = sum(p for _, p in samples) / n
+    var = sum((t - mt) ** 2 for t, _ in samples)
+    a = sum((t - mt) * (p - mp) for t, p in samples) / var if var > 0 else 0.0
+    b = mp - a * mt
+    residuals = [p - (a * t + b) for t, p in samples]
+    rms = (sum(r * r for r in residuals) / n) ** 0.5
+    return a, rms, max(abs(r) for r in residuals)
+
+
+def measure(config: Dict, music_path: str, seconds: float = CALIBRATION_SECONDS) -> Dict:
+    """Play `music_path` with `config` and measure how the playback position tracks the wall clock."""
+    result = {"config": config, "buffer_ms": buffer_latency(config) * 1000}
+    try:
+        _open(config)
+        pygame.mixer.music.load(music_path)
+    except pygame.error as e:
+        result.update(stable=False, error=str(e))
+        return result
+    samples = []
+    first = None
+    start = time.perf_counter()
+    pygame.mixer.music.play()
+    while True:
+        now = time.perf_counter() - start
+        if now >= seconds:
+            break
+        pos = pygame.mixer.music.get_pos()
+        if pos > 0:
+            if first is None:
+                first = now
+            samples.append((now, pos / 1000.0))
+        time.sleep(0.0005)
+    pygame.mixer.music.stop()
+    if first is None or len(samples) < 10:
+        result.update(stable=False, error="playback position does not advance")
+        return result
+    rate, jitter, worst = _fit(samples)
+    result.update(
+        start_ms=first * 1000,
+        rate_error=rate - 1.0,
+        jitter_ms=jitter * 1000,
+        max_error_ms=worst * 1000,
+        latency_ms=first * 1000 + result["buffer_ms"],
+    )
+    result["stable"] = (abs(result["rate_error"]) <= MAX_RATE_ERROR and result["jitter_ms"] <= MAX_JITTER_MS
+                        and result["max_error_ms"] <= result["buffer_ms"] + MAX_JITTER_MS)
+    return result
+
+
+def calibrate(buffers=CALIBRATION_BUFFERS, frequency: int = 44100, channels: int = 2,
+              seconds: float = CALIBRATION_SECONDS) -> Tuple[Optional[Dict], List[Dict]]:
+    """Measure every buffer size; returns (lowest-latency stable result or None, all results)."""
+    path = _silence_file(seconds + 1.0, frequency)
+    try:
+        results = [measure({'frequency': frequency, 'size': -16, 'channels': channels, 'buffer': b}, path, seconds)
+                   for b in buffers]
+    finally:
+        if pygame.mixer.get_init() is not None:
+            pygame.mixer.music.unload()
+        os.remove(path)
+    stable = [r for r in results if r["stable"]]
+    return (min(stable, key=lambda r: r["latency_ms"]) if stable else None), results
+
+
+def save_calibration(best: Dict, results: List[Dict], path: str = CALIBRATION_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"version": CALIBRATION_VERSION, "config": best["config"], "latency_ms": best["latency_ms"],
+                   "time": time.strftime('%Y-%m-%dT%H:%M:%S'), "results": results}, f, indent=2)
+    os.replace(tmp, path)
@@ -0,0 +1,323 @@
+"""Audio conversion to mixer-ready WAV (16-bit PCM stereo) in bounded memory.
+
+- `sniff_container` identifies the real container from the first bytes
+  (a file named .wav may be an MP3)
+- `WavReader` reads a RIFF/WAVE file block by block: PCM 8/16/24/32-bit,
+  IEEE float 32/64 and WAVE_FORMAT_EXTENSIBLE, as float32 frames
+- `PolyphaseResampler` resamples by a rational factor L/M with a Kaiser
+  windowed-sinc filter, one vectorized block at a time
+- `convert_file` chains them and writes int16 (TPDF dither when the source
+  has more precision), through a temporary file replaced atomically
+- `convert_asset` is the per-file job of `convert_audio.py`: WAV sources are
+  converted to `<name>_converted.wav`, files whose extension lies about
+  their container are copied to `<name>_converted.<real extension>`
+
+Only the current block, the filter and its history are in memory, whatever
+the file length. MP3/OGG/FLAC/AIFF are decoded natively by the mixer and
+are not converted. NumPy is required (optional dependency of the game).
+"""
+import os
+import shutil
+import struct
+import wave
+from math import gcd
+from typing import Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .hashing import file_digest
+
+TARGET_RATE = 44100  # fréquence du mixer (Game l'initialise d'abord à 44100 Hz)
+TARGET_CHANNELS = 2
+CHUNK_FRAMES = 16384  # frames lues par bloc (~10 Mo de pic en 48 kHz stéréo)
+TAPS_PER_PHASE = 32  # longueur du filtre par phase (qualité / coût)
+KAISER_BETA = 8.6  # ~ -80 dB en bande coupée
+
+# conteneurs que le mixer de pygame décode lui-même
+# (extensions acceptées, la première sert aux copies)
+NATIVE_CONTAINERS = {"mp3": (".mp3",), "ogg": (".ogg", ".oga"), "flac": (".flac",), "aiff": (".aiff", ".aif")}
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def sniff_container(path: str) -> Optional[str]:
+    """'wav', 'rf64', 'mp3', 'ogg', 'flac', 'aiff' or None, from the file header."""
+    with open(path, 'rb') as f:
+        head = f.read(12)
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return "wav"
+    if head[:4] == b'RF64':
+        return "rf64"
+    if head[:3] == b'ID3' or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if head[:4] == b'OggS':
+        return "ogg"
+    if head[:4] == b'fLaC':
+        return "flac"
+    if head[:4] == b'FORM' and head[8:12] in (b'AIFF', b'AIFC'):
+        return "aiff"
+    return None
+
+
+class WavReader:
+    """Block reader for RIFF/WAVE files, yielding float32 arrays (frames, channels)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, 'rb')
+        try:
+            self._parse()
+        except Exception:
+            self._f.close()
+            raise
+
+    def _parse(self):
+        f = self._f
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"{self.path}: not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{self.path}: no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(size)
+                if size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{self.path}: data chunk before fmt chunk")
+                self.data_offset = f.tell()
+                self.data_size = size
+                break
+            else:
+                f.seek(size + size % 2, os.SEEK_CUR)  # chunks alignés sur 2 octets
+        tag, self.channels, self.rate, _, self.block_align, self.bits = struct.unpack_from("<HHIIHH", fmt)
+        if tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            tag = struct.unpack_from("<H", fmt, 24)[0]  # 2 premiers octets du GUID de sous-format
+        if tag == WAVE_FORMAT_PCM and self.bits in (8, 16, 24, 32):
+            self.kind = "int"
+        elif tag == WAVE_FORMAT_IEEE_FLOAT and self.bits in (32, 64):
+            self.kind = "float"
+        else:
+            raise ValueError(f"{self.path}: unsupported WAV encoding (format {tag}, {self.bits} bits)")
+        if not self.channels or self.block_align != self.channels * self.bits // 8:
+            raise ValueError(f"{self.path}: inconsistent WAV header")
+        # taille déclarée 0 ou trop grande (fichiers en cours d'écriture, streaming)
+        available = os.path.getsize(self.path) - self.data_offset
+        if self.data_size == 0 or self.data_size > available:
+            self.data_size = available
+        self.frames = self.data_size // self.block_align
+        self._remaining = self.frames
+
+    def read(self, frames: int = CHUNK_FRAMES):
+        """Next block as float32 in [-1, 1], shape (n, channels); empty at the end."""
+        n = min(frames, self._remaining)
+        data = self._f.read(n * self.block_align)
+        n = len(data) // self.block_align
+        self._remaining -= n
+        data = data[:n * self.block_align]
+        bits = self.bits
+        if self.kind == "float":
+            samples = np.frombuffer(data, dtype="<f4" if bits == 32 else "<f8").astype(np.float32)
+        elif bits == 8:
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif bits == 16:
+            samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        elif bits == 24:
+            b = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            value = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            value = np.where(value >= 1 << 23, value - (1 << 24), value)
+            samples = value.astype(np.float32) / float(1 << 23)
+        else:
+            samples = (np.frombuffer(data, dtype="<i4").astype(np.float64) / 2.0 ** 31).astype(np.float32)
+        return samples.reshape(n, self.channels)
+
+    def blocks(self, frames: int = CHUNK_FRAMES):
+        while True:
+            block = self.read(frames)
+            if not len(block):
+                return
+            yield block
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def kaiser_lowpass(length: int, cutoff: float, beta: float = KAISER_BETA):
+    """Windowed-sinc FIR, `cutoff` as a fraction of the sample rate (0 .. 0.5)."""
+    n = np.arange(length) - (length - 1) / 2.0
+    return 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta)
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler (up by L, low-pass, down by M).
+
+    Output sample n is the filter applied around upsampled position
+    n*M + delay: only the K = `taps` coefficients of phase (n*M + delay) % L
+    touch non-zero input samples, so each block is one gather + one
+    multiply-sum over (outputs, K) arrays. Input history is kept between
+    blocks; `flush()` pads the end with zeros.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, channels: int, taps: int = TAPS_PER_PHASE):
+        g = gcd(src_rate, dst_rate)
+        self.up = L = dst_rate // g
+        self.down = src_rate // g
+        self.channels = channels
+        self.taps = K = taps
+        N = L * K
+        # coupure à 95 % du Nyquist le plus bas, gain L pour compenser les zéros insérés;
+        # longueur impaire N + 1 (centre sur un échantillon entier), dernier coefficient ~0 retiré
+        h = kaiser_lowpass(N + 1, 0.95 * 0.5 / max(L, self.down))[:N] * L
+        # phases[p, k] = h[p + k*L]
+        self.phases = h.reshape(K, L).T.astype(np.float32).copy()
+        self.delay = N // 2
+        self._history = np.zeros((K, channels), dtype=np.float32)  # entrée avant _start
+        self._start = -K  # index (dans l'entrée) du premier échantillon de _history
+        self._next = 0  # prochain index de sortie
+        self._consumed = 0  # échantillons d'entrée reçus
+        self._flushed = False
+
+    def _produce(self, buf, first, last_input):
+        """Outputs whose input window ends at or before `last_input`."""
+        L, M, K = self.up, self.down, self.taps
+        # m_max(n) = (n*M + delay) // L <= last_input
+        stop = ((last_input + 1) * L - self.delay + M - 1) // M
+        if self._flushed:
+            stop = min(stop, -(-self._consumed * L // M))
+        n = np.arange(self._next, max(stop, self._next), dtype=np.int64)
+        if not n.size:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        t = n * M + self.delay
+        phase = t % L
+        m = (t // L)[:, None] - np.arange(K)[None, :] - first  # (outputs, K) index dans buf
+        coeffs = self.phases[phase]  # (outputs, K)
+        out = np.einsum('nk,nkc->nc', coeffs, buf[m])
+        self._next = int(n[-1]) + 1
+        return out
+
+    def process(self, block):
+        """Resample one input block (frames, channels); returns the outputs ready so far."""
+        buf = np.concatenate((self._history, block.astype(np.float32, copy=False)))
+        first = self._start
+        self._consumed += len(block)
+        out = self._produce(buf, first, self._consumed - 1)
+        keep = self.taps
+        self._history = buf[-keep:]
+        self._start = first + len(buf) - keep
+        return out
+
+    def flush(self):
+        """Remaining outputs, the end of the input padded with zeros."""
+        self._flushed = True
+        pad = np.zeros((self.taps + self.delay // self.up + 1, self.channels), dtype=np.float32)
+        buf = np.concatenate((self._history, pad))
+        return self._produce(buf, self._start, self._start + len(buf) - 1)
+
+
+def _to_int16(block, rng=None):
+    if rng is not None:
+        # TPDF dither (±1 LSB) avant quantification
+        block = block * 32767.0 + (rng.random(block.shape, dtype=np.float32) -
+                                   rng.random(block.shape, dtype=np.float32))
+    else:
+        block = block * 32767.0
+    return np.clip(np.rint(block), -32768, 32767).astype("<i2")
+
+
+def _to_stereo(block):
+    if block.shape[1] == 1:
+        return np.repeat(block, 2, axis=1)
+    if block.shape[1] > 2:
+        return block[:, :2]  # ordre WAV: avant gauche, avant droit, ...
+    return block
+
+
+def convert_file(src: str, dst: str, rate: int = TARGET_RATE, chunk_frames: int = CHUNK_FRAMES) -> dict:
+    """Convert a WAV file to 16-bit stereo PCM at `rate`; returns source/output info."""
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for audio conversion (pip install -r requirements-tools.txt)")
+    tmp = dst + ".tmp"
+    with WavReader(src) as reader:
+        info = {"source_rate": reader.rate, "source_channels": reader.channels,
+                "source_bits": reader.bits, "source_encoding": reader.kind, "frames": reader.frames}
+        resampler = PolyphaseResampler(reader.rate, rate, 2) if reader.rate != rate else None
+        exact = resampler is None and reader.kind == "int" and reader.bits <= 16
+        rng = None if exact else np.random.default_rng(0)
+        written = 0
+        try:
+            with wave.open(tmp, 'wb') as out:
+                out.setnchannels(TARGET_CHANNELS)
+                out.setsampwidth(2)
+                out.setframerate(rate)
+                for block in reader.blocks(chunk_frames):
+                    block = _to_stereo(block)
+                    if resampler is not None:
+                        block = resampler.process(block)
+                    out.writeframes(_to_int16(block, rng).tobytes())
+                    written += len(block)
+                if resampler is not None:
+                    block = resampler.flush()
+                    out.writeframes(_to_int16(block, rng).tobytes())
+                    written += len(block)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, dst)
+    info["output_frames"] = written
+    return info
+
+
+def converted_path(path: str, ext: str = ".wav") -> str:
+    stem = os.path.splitext(path)[0]
+    return f"{stem}_converted{ext}"
+
+
+def convert_asset(path: str, rate: int = TARGET_RATE, chunk_frames: int = CHUNK_FRAMES) -> dict:
+    """Make one audio asset loadable by the mixer; returns what was done.
+
+    `action` is 'converted' (WAV re-encoded), 'copied' (native container
+    under the wrong extension), 'native' (nothing to do) or 'error'.
+    """
+    info = {"source": path, "sha256": file_digest(path)}
+    try:
+        container = sniff_container(path)
+        info["container"] = container
+        if container == "wav":
+            out = converted_path(path)
+            info.update(convert_file(path, out, rate, chunk_frames))
+            info.update(action="converted", output=out)
+        elif container in NATIVE_CONTAINERS:
+            extensions = NATIVE_CONTAINERS[container]
+            if os.path.splitext(path)[1].lower() in extensions:
+                info.update(action="native", output=None)
+            else:
+                # ex. MP3 renommé en .wav: le mixer se fie à l'extension
+                out = converted_path(path, extensions[0])
+                tmp = out + ".tmp"
+                with open(path, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+                    shutil.copyfileobj(fsrc, fdst, 1 << 20)
+                os.replace(tmp, out)
+                info.update(action="copied", output=out)
+        else:
+            raise ValueError(f"unknown or unsupported audio container ({container or 'unrecognized header'})")
+    except (OSError, ValueError, ImportError) as e:
+        info.update(action="error", error=str(e))
+    return info
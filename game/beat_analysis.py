@@ -0,0 +1,275 @@
+"""Offline beat / onset analysis of level music.
+
+`analyze` decodes the track block by block (`WavReader`), mixes it to mono
+and feeds an `OnsetEnvelope`: short-time FFT frames (Hann window of
+`FFT_HOPS` hops, one every `HOP_SECONDS`), log-compressed magnitudes and
+their half-wave rectified difference summed over bins (spectral flux).
+Only the envelope (one float per hop, ~172 per second) is kept, so memory
+does not grow with the sample count.
+
+From the envelope:
+- `estimate_tempo`: autocorrelation over 60..200 BPM, weighted towards
+  120 BPM to avoid octave errors
+- `track_beats`: dynamic-programming beat tracker (onset strength vs
+  deviation from the tempo period), which follows small tempo drifts
+- `pick_onsets`: local maxima above a moving average
+
+Results are cached as JSON in `CACHE_DIR/<sha256>.json`, keyed by the
+audio content and the analysis parameters (`game/beat_sync.py` turns them
+into level positions). Non-WAV tracks are decoded whole through `pygame.mixer` (the analysis
+itself stays chunked). NumPy is required.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .audio_convert import CHUNK_FRAMES, WavReader, sniff_container
+from .hashing import file_digest
+
+ANALYSIS_VERSION = 1
+HOP_SECONDS = 256 / 44100  # ~5.8 ms entre deux frames, quelle que soit la fréquence
+FFT_HOPS = 4  # fenêtre de 4 hops (~23 ms)
+MIN_BPM = 60.0
+MAX_BPM = 200.0
+PRIOR_BPM = 120.0  # tempo le plus probable (prior log-normal)
+BAND_EDGES = (150, 300, 600, 1200, 2400, 4800, 9600)  # Hz, bandes d'octave du flux
+PRIOR_OCTAVES = 0.5  # écart-type du prior: départage 64/128 BPM sur un motif grosse caisse/caisse claire
+TIGHTNESS = 100.0  # pénalité d'écart à la période dans le suivi de temps
+CACHE_DIR = os.path.join('assets', '.beat_cache')
+
+
+class OnsetEnvelope:
+    """Streaming spectral-flux onset envelope.
+
+    The flux is kept per octave band (`BAND_EDGES`) and each band is
+    normalized by its own spread in `finish()`, so a kick drum's few low
+    bins weigh as much as a snare's broadband noise.
+    """
+
+    def __init__(self, rate: int, hop_seconds: float = HOP_SECONDS, fft_hops: int = FFT_HOPS):
+        self.rate = rate
+        self.hop = hop = max(1, round(rate * hop_seconds))
+        self.n_fft = n_fft = hop * fft_hops
+        self.window = np.hanning(n_fft).astype(np.float32)
+        edges = [0] + [int(f * n_fft / rate) for f in BAND_EDGES if f * n_fft / rate < n_fft // 2]
+        self._band_starts = np.unique(edges)  # premiers bins de chaque bande
+        # premier frame centré sur t=0 (demi-fenêtre de silence devant)
+        self._tail = np.zeros(n_fft // 2, dtype=np.float32)
+        self._prev = None  # spectre log du dernier frame
+        self._chunks: List = []
+        self.samples = 0
+
+    def feed(self, mono):
+        """Add samples (1-D float array); complete frames are analysed right away."""
+        self.samples += len(mono)
+        self._analyse(np.concatenate((self._tail, mono.astype(np.float32, copy=False))))
+
+    def _analyse(self, buf):
+        count = (len(buf) - self.n_fft) // self.hop + 1
+        if count <= 0:
+            self._tail = buf
+            return
+        frames = np.lib.stride_tricks.sliding_window_view(buf, self.n_fft)[::self.hop][:count]
+        spec = np.log1p(100.0 * np.abs(np.fft.rfft(frames * self.window, axis=1)))
+        prev = spec[:1] if self._prev is None else self._prev
+        flux = np.maximum(np.diff(spec, axis=0, prepend=prev), 0.0)
+        self._prev = spec[-1:]
+        self._chunks.append(np.add.reduceat(flux, self._band_starts, axis=1).astype(np.float32))
+        self._tail = buf[count * self.hop:]
+
+    def finish(self):
+        """Envelope as one array (the last partial window is padded with silence)."""
+        if len(self._tail) < self.n_fft:
+            self._analyse(np.concatenate((self._tail, np.zeros(self.n_fft - len(self._tail), dtype=np.float32))))
+        if not self._chunks:
+            return np.zeros(0, dtype=np.float32)
+        bands = np.concatenate(self._chunks)[:self.samples // self.hop + 1]
+        spread = bands.std(axis=0)
+        return (bands / np.where(spread > 0, spread, 1.0)).sum(axis=1)
+
+    @property
+    def frame_rate(self) -> float:
+        return self.rate / self.hop
+
+    def frame_time(self, frame) -> float:
+        """Time of envelope frame(s) in seconds.
+
+        The flux peaks on the first frame whose window catches the attack,
+        about one hop early: frames are dated at the middle of their hop.
+        """
+        return (frame + 0.5) * self.hop / self.rate
+
+
+def _normalized(env):
+    env = env - env.mean() if len(env) else env
+    std = env.std() if len(env) else 0.0
+    return env / std if std > 0 else env
+
+
+def estimate_tempo(env, frame_rate: float, min_bpm: float = MIN_BPM, max_bpm: float = MAX_BPM) -> float:
+    """Tempo in BPM from the autocorrelation of the onset envelope."""
+    x = _normalized(env)
+    n = len(x)
+    if n < 4:
+        return PRIOR_BPM
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(x, size)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n]
+    lo = max(1, int(frame_rate * 60.0 / max_bpm))
+    hi = min(n - 2, int(np.ceil(frame_rate * 60.0 / min_bpm)))
+    if hi <= lo:
+        return PRIOR_BPM
+    lags = np.arange(lo, hi + 1)
+    bpm = 60.0 * frame_rate / lags
+    weight = np.exp(-0.5 * (np.log2(bpm / PRIOR_BPM) / PRIOR_OCTAVES) ** 2)
+    best = lo + int(np.argmax(acf[lo:hi + 1] * weight))
+    # interpolation parabolique autour du pic
+    a, b, c = acf[best - 1], acf[best], acf[best + 1]
+    denom = a - 2 * b + c
+    lag = best + (0.5 * (a - c) / denom if denom < 0 else 0.0)
+    return 60.0 * frame_rate / lag
+
+
+def track_beats(env, frame_rate: float, bpm: float, tightness: float = TIGHTNESS):
+    """Beat frame indices: best path of onset strength with period ~ 60/bpm."""
+    x = _normalized(env)
+    n = len(x)
+    period = 60.0 * frame_rate / bpm
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    # lissage par une gaussienne d'une demi-période (détections locales)
+    half = max(1, int(period / 2))
+    k = np.exp(-0.5 * (np.arange(-half, half + 1) / (period / 8)) ** 2)
+    local = np.convolve(x, k / k.sum(), mode='same')
+    lo, hi = max(1, int(period / 2)), int(2 * period) + 1
+    offsets = np.arange(lo, hi)
+    penalty = -tightness * np.log(offsets / period) ** 2
+    score = local.copy()
+    back = np.full(n, -1, dtype=np.int64)
+    for i in range(lo, n):
+        prev = i - offsets
+        valid = prev >= 0
+        cand = score[prev[valid]] + penalty[valid]
+        j = int(np.argmax(cand))
+        if cand[j] > 0:
+            score[i] += cand[j]
+            back[i] = prev[valid][j]
+    # dernier temps: meilleur score dans la dernière période
+    last = n - int(period) + int(np.argmax(score[-int(period):])) if n > period else int(np.argmax(score))
+    beats = [last]
+    while back[beats[-1]] >= 0:
+        beats.append(int(back[beats[-1]]))
+    beats = np.array(beats[::-1], dtype=np.int64)
+    # le lissage tire les pics vers la rampe d'attaque: recalage sur le maximum brut voisin
+    reach = max(1, int(period / 16))
+    padded = np.pad(x, reach, constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * reach + 1)[beats]
+    return beats + np.argmax(windows, axis=1) - reach
+
+
+def pick_onsets(env, wait: int = 8, average: int = 40, delta: float = 1.0):
+    """Frames that are local maxima (±`wait`) above the mean of the previous `average` frames + delta.
+
+    Defaults are ~50 ms and ~250 ms at the default hop; `delta` is in
+    standard deviations of the envelope.
+    """
+    x = _normalized(env)
+    n = len(x)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    padded = np.pad(x, (wait, wait), constant_values=-np.inf)
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * wait + 1).max(axis=1)
+    cumsum = np.concatenate(([0.0], np.cumsum(x)))
+    start = np.maximum(np.arange(n) - average, 0)
+    mean = (cumsum[np.arange(n) + 1] - cumsum[start]) / (np.arange(n) + 1 - start)
+    return np.flatnonzero((x >= local_max) & (x >= mean + delta))
+
+
+def mono_blocks(path: str, chunk_frames: int = CHUNK_FRAMES):
+    """(rate, iterator of mono float32 blocks) for a WAV file, or a track the mixer can decode."""
+    if sniff_container(path) == "wav":
+        reader = WavReader(path)
+
+        def blocks():
+            with reader:
+                for block in reader.blocks(chunk_frames):
+                    yield block.mean(axis=1)
+        return reader.rate, blocks()
+
+    import pygame
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    rate, size, _ = pygame.mixer.get_init()
+    samples = pygame.sndarray.array(pygame.mixer.Sound(path))  # piste entière décodée
+    scale = float(1 << (abs(size) - 1))
+    if samples.ndim == 1:
+        samples = samples[:, None]
+
+    def blocks():
+        for i in range(0, len(samples), chunk_frames):
+            yield samples[i:i + chunk_frames].mean(axis=1, dtype=np.float32) / scale
+    return rate, blocks()
+
+
+def _params():
+    return {"version": ANALYSIS_VERSION, "hop_seconds": HOP_SECONDS, "fft_hops": FFT_HOPS,
+            "min_bpm": MIN_BPM, "max_bpm": MAX_BPM, "prior_bpm": PRIOR_BPM,
+            "band_edges": list(BAND_EDGES), "prior_octaves": PRIOR_OCTAVES, "tightness": TIGHTNESS}
+
+
+def analyze(path: str, cache_dir: Optional[str] = CACHE_DIR, chunk_frames: int = CHUNK_FRAMES) -> Dict:
+    """Tempo, beat and onset times of a track (cached per content hash).
+
+    Returns {sha256, duration, tempo, beats, beat_strength, onsets,
+    onset_strength, cached}; strengths are normalized to 0..1.
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for beat analysis (pip install -r requirements-tools.txt)")
+    digest = file_digest(path)
+    cache_path = os.path.join(cache_dir, f"{digest}.json") if cache_dir else None
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            if result.get("params") == _params():
+                result["cached"] = True
+                return result
+        except (OSError, ValueError):
+            pass
+
+    rate, blocks = mono_blocks(path, chunk_frames)
+    envelope = OnsetEnvelope(rate)
+    for block in blocks:
+        envelope.feed(block)
+    env = envelope.finish()
+    fr = envelope.frame_rate
+    tempo = estimate_tempo(env, fr)
+    beats = track_beats(env, fr, tempo)
+    onsets = pick_onsets(env)
+    peak = float(env.max()) if len(env) and env.max() > 0 else 1.0
+    result = {
+        "params": _params(),
+        "sha256": digest,
+        "duration": envelope.samples / rate,
+        "tempo": round(float(tempo), 3),
+        "beats": [round(envelope.frame_time(f), 4) for f in beats.tolist()],
+        "beat_strength": [round(float(env[f]) / peak, 3) for f in beats.tolist()],
+        "onsets": [round(envelope.frame_time(f), 4) for f in onsets.tolist()],
+        "onset_strength": [round(float(env[f]) / peak, 3) for f in onsets.tolist()],
+    }
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp, cache_path)
+    result["cached"] = False
+    return result
+
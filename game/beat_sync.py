@@ -0,0 +1,243 @@
+"""Align level content with the beat grid of its music.
+
+Works on the level JSON dict. The player stands at screen x `PLAYER_X`
+while the world scrolls, so an obstacle at world x reaches the player
+when the scrolled distance equals `x - PLAYER_X`; a timeline spawn
+appears `width + SPAWN_OFFSET` ahead of the camera and reaches the player
+`width + SPAWN_OFFSET - PLAYER_X` later. `ScrollMap` turns music time into
+scrolled distance from `scroll_speed` and the timeline's `speed` events
+(at their `level.effective_speed`, as the simulation scrolls).
+
+Music time is taken to equal level time for the whole run: both start
+with the run, and the game clock follows the music position
+(`game/audio_clock.py`). QTEs only lower the music volume and do not pause
+it. Timeline `music` cues that pause, seek or replace the track break this
+assumption: content after such a cue is not aligned with the music.
+
+- `snap_level` moves obstacles (by groups of touching/overlapping ones, so
+  multi-piece structures stay intact) and timeline events onto the grid
+- `generate_events` adds spawns (or static obstacles) on strong beats
+  where the level leaves room
+"""
+from bisect import bisect_left, bisect_right
+from typing import Dict, List
+
+from .level import effective_speed
+from .scheduler import EVENT_MUSIC, EVENT_QTE, EVENT_SPAWN, EVENT_SPEED, event_kind
+from .simulation import PLAYER_X, SPAWN_OFFSET
+
+GROUP_GAP = 40  # px: obstacles plus proches que la largeur du joueur forment un bloc
+MIN_EVENT_GAP = 0.6  # s entre deux arrivées générées (~ durée d'un saut)
+SPIKE = {"w": 40, "h": 40, "type": "spike"}
+
+
+def beat_grid(beats: List[float], subdivide: int = 1) -> List[float]:
+    """Beat times with `subdivide` - 1 evenly spaced points between consecutive beats."""
+    if subdivide <= 1 or len(beats) < 2:
+        return list(beats)
+    grid = []
+    for a, b in zip(beats, beats[1:]):
+        grid.extend(a + (b - a) * i / subdivide for i in range(subdivide))
+    grid.append(beats[-1])
+    return grid
+
+
+def nearest(grid: List[float], t: float) -> float:
+    i = bisect_left(grid, t)
+    if i == 0:
+        return grid[0]
+    if i == len(grid):
+        return grid[-1]
+    return grid[i] if grid[i] - t < t - grid[i - 1] else grid[i - 1]
+
+
+class ScrollMap:
+    """Music time <-> scrolled world distance, following the level's speed events."""
+
+    def __init__(self, scroll_speed: float, timeline=()):
+        self.times = [0.0]
+        self.speeds = [effective_speed(scroll_speed)]
+        self.starts = [0.0]  # distance au début de chaque segment
+        speed = float(scroll_speed)
+        for ev in sorted((e for e in timeline if event_kind(e) == EVENT_SPEED), key=lambda e: e.get('time', 0)):
+            t = max(float(ev.get('time', 0)), self.times[-1])
+            speed = float(ev['scroll_speed']) if 'scroll_speed' in ev else speed * ev.get('factor', 1.0)
+            self.starts.append(self.distance(t))
+            self.times.append(t)
+            self.speeds.append(effective_speed(speed))
+
+    @classmethod
+    def for_level(cls, data: dict) -> 'ScrollMap':
+        return cls(data.get('scroll_speed', 200), data.get('spawn_timeline', []))
+
+    def distance(self, t: float) -> float:
+        i = max(0, bisect_right(self.times, t) - 1)
+        return self.starts[i] + (t - self.times[i]) * self.speeds[i]
+
+    def time_at(self, d: float) -> float:
+        i = max(0, bisect_right(self.starts, d) - 1)
+        while i > 0 and self.speeds[i] <= 0:
+            i -= 1  # segment arrêté: on reprend au dernier qui avance
+        return self.times[i] + (d - self.starts[i]) / self.speeds[i] if self.speeds[i] > 0 else self.times[i]
+
+
+def music_breaks(data: dict) -> List[float]:
+    """Times of timeline `music` cues after which music time no longer equals level time."""
+    return sorted(float(e.get('time', 0)) for e in data.get('spawn_timeline', [])
+                  if event_kind(e) == EVENT_MUSIC and e.get('action', 'play') in ('play', 'pause', 'stop'))
+
+
+def spawn_lead(data: dict) -> float:
+    """Distance scrolled between a timeline spawn and its arrival at the player."""
+    return data.get('width', 800) + SPAWN_OFFSET - PLAYER_X
+
+
+def obstacle_arrival(scroll: ScrollMap, x: float) -> float:
+    return scroll.time_at(x - PLAYER_X)
+
+
+def spawn_arrival(data: dict, scroll: ScrollMap, t: float) -> float:
+    return scroll.time_at(scroll.distance(t) + spawn_lead(data))
+
+
+def spawn_time_for(data: dict, scroll: ScrollMap, arrival: float) -> float:
+    """Spawn time making the obstacle reach the player at `arrival` (negative if impossible)."""
+    d = scroll.distance(arrival) - spawn_lead(data)
+    return scroll.time_at(d) if d >= 0 else -1.0
+
+
+def obstacle_groups(obstacles: List[dict], gap: float = GROUP_GAP) -> List[List[int]]:
+    """Indices of obstacles grouped by x overlap (closer than `gap`), in x order."""
+    groups = []
+    right = None
+    for i in sorted(range(len(obstacles)), key=lambda i: obstacles[i]['x']):
+        o = obstacles[i]
+        if right is not None and o['x'] <= right + gap:
+            groups[-1].append(i)
+            right = max(right, o['x'] + o['w'])
+        else:
+            groups.append([i])
+            right = o['x'] + o['w']
+    return groups
+
+
+def grid_offsets(data: dict, grid: List[float]) -> Dict[str, List[float]]:
+    """Distance (s) of each obstacle group and timeline spawn arrival to the nearest grid time."""
+    scroll = ScrollMap.for_level(data)
+    obstacles = data.get('obstacles', [])
+    groups = [min(obstacles[i]['x'] for i in g) for g in obstacle_groups(obstacles)]
+    spawns = [spawn_arrival(data, scroll, e.get('time', 0)) for e in data.get('spawn_timeline', [])
+              if event_kind(e) == EVENT_SPAWN]
+    return {
+        "obstacles": [obstacle_arrival(scroll, x) - nearest(grid, obstacle_arrival(scroll, x)) for x in groups],
+        "spawns": [t - nearest(grid, t) for t in spawns],
+    }
+
+
+def snap_level(data: dict, grid: List[float], gap: float = GROUP_GAP,
+               min_gap: float = MIN_EVENT_GAP, candidates: int = 64) -> Dict[str, int]:
+    """Move obstacle groups, spawns and QTEs of `data` onto `grid`; returns counts.
+
+    Groups separated by less than `min_gap` seconds (less than a jump) form
+    a chain that moves as one block, so tight patterns keep their exact
+    spacing and stay passable. Each chain gets the shift, among those that
+    put one of its groups (up to `candidates`) on the grid, with the
+    smallest total offset of its groups.
+    """
+    stats = {"obstacles": 0, "events": 0, "chains": 0}
+    if not grid:
+        return stats
+    scroll = ScrollMap.for_level(data)
+    obstacles = data.get('obstacles', [])
+    chains = []
+    prev_right = None
+    for group in obstacle_groups(obstacles, gap):
+        left = min(obstacles[i]['x'] for i in group)
+        right = max(obstacles[i]['x'] + obstacles[i]['w'] for i in group)
+        if prev_right is None or obstacle_arrival(scroll, left) - obstacle_arrival(scroll, prev_right) >= min_gap:
+            chains.append([])
+        chains[-1].append((left, group))
+        prev_right = right
+
+    def offset(x):
+        t = obstacle_arrival(scroll, x)
+        return abs(t - nearest(grid, t))
+
+    for chain in chains:
+        lefts = [left for left, _ in chain]
+        picks = lefts if len(lefts) <= candidates else lefts[::len(lefts) // candidates + 1]
+        shifts = {round(scroll.distance(nearest(grid, obstacle_arrival(scroll, x))) + PLAYER_X) - x for x in picks}
+        shift = min(sorted(shifts), key=lambda d: (sum(offset(x + d) for x in lefts), abs(d)))
+        if shift:
+            for _, group in chain:
+                for i in group:
+                    obstacles[i]['x'] += shift
+                stats["obstacles"] += len(group)
+            stats["chains"] += 1
+
+    for ev in data.get('spawn_timeline', []):
+        kind = event_kind(ev)
+        t = ev.get('time', 0)
+        if kind == EVENT_SPAWN:
+            new = spawn_time_for(data, scroll, nearest(grid, spawn_arrival(data, scroll, t)))
+        elif kind == EVENT_QTE:
+            new = nearest(grid, t)
+        else:
+            continue  # musique / vitesse: pas de position à aligner (la vitesse sert à ScrollMap)
+        new = round(new, 3)
+        if new >= 0 and new != t:
+            ev['time'] = new
+            stats["events"] += 1
+    if obstacles:
+        obstacles.sort(key=lambda o: o['x'])
+    return stats
+
+
+def generate_events(data: dict, analysis: dict, every: int = 2, start: float = 2.0,
+                    min_strength: float = 0.0, template: dict = SPIKE, static: bool = False,
+                    min_gap: float = MIN_EVENT_GAP) -> int:
+    """Add a spawn (or a static obstacle with `static`) on every `every`-th strong beat.
+
+    Beats too close (`min_gap` seconds) to an existing obstacle group or
+    spawn arrival are skipped. Returns the number of entries added.
+    """
+    scroll = ScrollMap.for_level(data)
+    obstacles = data.setdefault('obstacles', [])
+    timeline = data.setdefault('spawn_timeline', [])
+    ground = data.get('height', 450) - 40
+    # plages de temps occupées (arrivée du bord gauche -> du bord droit de chaque bloc)
+    busy = sorted([(obstacle_arrival(scroll, min(obstacles[i]['x'] for i in g)),
+                    obstacle_arrival(scroll, max(obstacles[i]['x'] + obstacles[i]['w'] for i in g)))
+                   for g in obstacle_groups(obstacles)] +
+                  [(t, t) for t in (spawn_arrival(data, scroll, e.get('time', 0)) for e in timeline
+                                    if event_kind(e) == EVENT_SPAWN)])
+    starts = [a for a, _ in busy]
+    ends = []
+    for _, b in busy:
+        ends.append(max(b, ends[-1]) if ends else b)  # fin max des plages commençant avant
+    end = data.get('duration') or analysis.get('duration', 0)
+    last = None
+    added = 0
+    for n, (t, strength) in enumerate(zip(analysis['beats'], analysis['beat_strength'])):
+        if n % every or t < start or t > end or strength < min_strength:
+            continue
+        if last is not None and t - last < min_gap:
+            continue
+        j = bisect_left(starts, t + min_gap)
+        if j and ends[j - 1] > t - min_gap:
+            continue
+        entry = dict(template)
+        entry.setdefault('y', ground - entry['h'])
+        if static:
+            entry = {"x": round(scroll.distance(t) + PLAYER_X), **entry}
+            obstacles.append(entry)
+        else:
+            spawn = spawn_time_for(data, scroll, t)
+            if spawn < 0:
+                continue
+            timeline.append({"time": round(spawn, 3), **entry})
+        last = t
+        added += 1
+    obstacles.sort(key=lambda o: o['x'])
+    timeline.sort(key=lambda e: e.get('time', 0))
+    return added
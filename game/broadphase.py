@@ -0,0 +1,60 @@
+"""X-sorted broadphase index over level obstacles."""
+from bisect import bisect_left, bisect_right, insort
+from typing import List
+
+
+class ObstacleIndex:
+    """Obstacles sorted by left edge.
+
+    `query(x0, x1)` only walks the slice of obstacles whose left edge lies in
+    `[x0 - max_w, x1]`, so the cost depends on how many obstacles are near the
+    player rather than on the level length. Results come back in insertion
+    order, which keeps collision resolution identical to a full list scan.
+    """
+
+    def __init__(self, obstacles=()):
+        entries = sorted(((o.x, i, o) for i, o in enumerate(obstacles)), key=lambda e: (e[0], e[1]))
+        self._xs = [e[0] for e in entries]
+        self._seq = [e[1] for e in entries]
+        self._items = [e[2] for e in entries]
+        self._next_seq = len(entries)
+        self.max_w = max((o.w for o in self._items), default=0)
+        self._rights = sorted(o.x + o.w for o in self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def copy(self) -> 'ObstacleIndex':
+        """Independent index over the same obstacle objects."""
+        clone = ObstacleIndex.__new__(ObstacleIndex)
+        clone._xs = list(self._xs)
+        clone._seq = list(self._seq)
+        clone._items = list(self._items)
+        clone._next_seq = self._next_seq
+        clone.max_w = self.max_w
+        clone._rights = list(self._rights)
+        return clone
+
+    def insert(self, obstacle):
+        """Add an obstacle (e.g. a timeline spawn)."""
+        x = obstacle.x
+        i = bisect_right(self._xs, x)
+        self._xs.insert(i, x)
+        self._seq.insert(i, self._next_seq)
+        self._items.insert(i, obstacle)
+        self._next_seq += 1
+        self.max_w = max(self.max_w, obstacle.w)
+        insort(self._rights, x + obstacle.w)
+
+    def query(self, x0, x1) -> List:
+        """Obstacles whose horizontal span may overlap `[x0, x1]`."""
+        lo = bisect_left(self._xs, x0 - self.max_w)
+        hi = bisect_right(self._xs, x1)
+        if hi - lo <= 1:
+            return self._items[lo:hi]
+        seq = self._seq
+        return [self._items[i] for i in sorted(range(lo, hi), key=seq.__getitem__)]
+
+    def count_passed(self, x) -> int:
+        """Number of obstacles whose right edge is left of `x`."""
+        return bisect_left(self._rights, x)
@@ -0,0 +1,67 @@
+"""Dirty-rectangle tracking for `pygame.display.update(rects)`.
+
+Each frame the renderer reports the screen regions whose content may have
+changed; the tracker adds last frame's regions (so anything drawn there
+gets cleaned up), merges overlaps and returns the list to redraw/update.
+"""
+from typing import List
+
+import pygame
+
+
+class DirtyTracker:
+    """Collects changed screen regions frame to frame."""
+
+    def __init__(self, size):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self._previous: List[pygame.Rect] = []
+        self._current: List[pygame.Rect] = []
+        self._full = True
+        self.last_rects: List[pygame.Rect] = []
+        self.last_pixels = 0
+
+    def mark(self, rect):
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            self._current.append(rect)
+
+    def mark_full(self):
+        self._full = True
+
+    def collect(self) -> List[pygame.Rect]:
+        """Regions to redraw this frame (this frame's marks + last frame's)."""
+        if self._full:
+            rects = [self.screen_rect.copy()]
+        else:
+            rects = merge_rects(self._current + self._previous)
+        self._previous = self._current
+        self._current = []
+        self._full = False
+        self.last_rects = rects
+        self.last_pixels = sum(r.width * r.height for r in rects)
+        return rects
+
+
+def merge_rects(rects) -> List[pygame.Rect]:
+    """Union overlapping rects when the union does not cover much extra area.
+
+    Two rects are merged only if their bounding box is no larger than the
+    sum of their areas, so e.g. the four thin edges of a rectangle stay
+    separate instead of turning into the whole rectangle.
+    """
+    merged: List[pygame.Rect] = []
+    for r in rects:
+        r = r.copy()
+        i = 0
+        while i < len(merged):
+            other = merged[i]
+            union = r.union(other)
+            if (r.colliderect(other) and
+                    union.width * union.height <= r.width * r.height + other.width * other.height):
+                r = union
+                merged.pop(i)
+                i = 0
+            else:
+                i += 1
+        merged.append(r)
+    return merged
@@ -1,51 +1,57 @@
 import pygame
 import sys
-from .player import Player
-from .level import Level, Obstacle
+from .level import Level
+from .surface_cache import scale
+from .fonts import get_font, text_cache
+from .dirty import DirtyTracker
+from .assets import AssetLoader, PIL_AVAILABLE
+from .replay import ReplayRecorder, EXTENSION as REPLAY_EXTENSION
+from .profiler import FrameProfiler, PHASES
+from .audio_clock import MusicClock, init_mixer
+from .asset_bake import BakedAssets, numbered
+from .simulation import (
+    Simulation, FrameInput, FIXED_DT,
+    EVENT_COMBO_START, EVENT_COMBO_SUCCESS, EVENT_COMBO_TIMEOUT, EVENT_COMBO_FAILED,
+    EVENT_COLLISION, EVENT_WIN, EVENT_MUSIC_CUE,
+)
 import os
-import json
-import random
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+import time
+
+if not PIL_AVAILABLE:
     print("PIL/Pillow not available - GIF animation disabled")
 
+# Au-delà, le temps écoulé est ignoré (fenêtre déplacée, débogueur): la
+# simulation ne rattrape pas une pause et ne part pas en spirale
+MAX_FRAME_TIME = 0.25
+
+# Zone du combo en haut à gauche et taille d'affichage de son animation
+# (les frames du GIF sont décodées au plus à cette taille)
+COMBO_BOX = (400, 250)
+# Pendant un QTE la musique est baissée, pas mise en pause: le jeu continue
+# de défiler et son horloge (MusicClock) reste calée sur la position de lecture
+QTE_MUSIC_VOLUME = 0.2
+COMBO_GIF_SIZE = (min(150, COMBO_BOX[0] - 20), min(80, COMBO_BOX[1] // 3))
+
+# Conversion des touches pygame vers lettres du combo
+KEY_TO_LETTER = {
+    pygame.K_q: 'Q', pygame.K_w: 'W', pygame.K_e: 'E', pygame.K_r: 'R',
+    pygame.K_a: 'A', pygame.K_s: 'S', pygame.K_d: 'D', pygame.K_f: 'F'
+}
+
 
 class Game:
-    def __init__(self, width=800, height=450, title="Geometry Dash"):
+    def __init__(self, width=800, height=450, title="Geometry Dash", dirty_rects=False, record_dir=None,
+                 profile_csv=None, max_fps=60):
         pygame.init()
         
-        # Initialize mixer with multiple fallback options for better audio compatibility
-        audio_initialized = False
-        
-        # Try different audio configurations
-        audio_configs = [
-            # Configuration optimale
-            {'frequency': 44100, 'size': -16, 'channels': 2, 'buffer': 512},
-            # Configuration de fallback 1
-            {'frequency': 22050, 'size': -16, 'channels': 2, 'buffer': 1024},
-            # Configuration de fallback 2 (plus compatible)
-            {'frequency': 44100, 'size': -16, 'channels': 1, 'buffer': 2048},
-            # Configuration minimale
-            {'frequency': 22050, 'size': -16, 'channels': 1, 'buffer': 4096}
-        ]
-        
-        for config in audio_configs:
-            try:
-                pygame.mixer.pre_init(**config)
-                pygame.mixer.init()
-                print(f"✅ Audio initialisé: {config}")
-                audio_initialized = True
-                break
-            except Exception as e:
-                print(f"⚠️ Échec config audio {config}: {e}")
-                continue
-        
-        if not audio_initialized:
+        # Mixer: configuration choisie par calibrate_audio.py, sinon la première
+        # de MIXER_CONFIGS qui s'initialise
+        self.mixer_config, latency = init_mixer()
+        if self.mixer_config is None:
             print("❌ Impossible d'initialiser l'audio - le jeu continuera sans son")
-        
+        # le temps de jeu suit la position de lecture de la musique (dérive, latence)
+        self.music_clock = MusicClock(latency)
+
         self.width = width
         self.height = height
         self.screen = pygame.display.set_mode((width, height))
@@ -53,34 +59,60 @@ class Game:
         self.clock = pygame.time.Clock()
         self.bg_color = (30, 30, 40)
 
+        # La simulation avance par pas fixes (FIXED_DT) via un accumulateur;
+        # le rendu tourne à max_fps (0 = sans limite) et interpole entre les
+        # deux derniers pas
+        self.max_fps = max_fps
+        self.accumulator = 0.0
+        self._prev_view = (0.0, 0.0)  # (scroll_x, player y) avant le dernier pas
+        self._last_dt = FIXED_DT
+        self.view_scroll_x = 0.0
+        self.view_player_y = 0
+        self.jump_held = False
+
+        # Mode dirty rects: seules les zones modifiées sont envoyées à l'écran
+        # (pygame.display.update(rects) au lieu de flip). F3 = overlay de debug.
+        self.dirty_rects = dirty_rects
+        self.dirty_debug = False
+        self.dirty = DirtyTracker((width, height))
+        self._scene_key = None
+        self._frozen_frame = None
+
+        # Profilage par phase: F2 affiche l'overlay (moyenne/p95/p99),
+        # profile_csv enregistre chaque frame
+        self.profiler = FrameProfiler(csv_path=profile_csv)
+        self.profile_overlay = False
+        self._profile_lines = []
+        self._profile_refresh = 0.0
+
         # physics
         self.gravity = 2400.0  # px/s^2 (increased for snappier feel)
         self.jump_strength = 700.0  # compensated jump velocity for new gravity
 
-        # player
-        self.player = Player(100, height - 80)
-
-        # level
+        # level + headless game state (player, scrolling, combo) driven each frame
         self.level = None
-        self.scroll_x = 0.0
-
-        # Combo vidéo system
-        self.combo_triggered = False
-        self.combo_active = False
-        self.combo_start_time = 0
-        self.combo_duration = 4.0  # 4 secondes (plus de temps pour réagir)
-        self.combo_letters = []
-        self.combo_input = []
-        self.combo_success = False
-
-        self.font = pygame.font.Font(None, 28)
-        self.combo_font = pygame.font.Font(None, 72)  # Plus gros pour le combo
-        self.game_over_font = pygame.font.Font(None, 96)  # Pour "GAME OVER"
+        self.level_path = None
+        self.sim = None
+
+        # enregistrement des parties (replays .gdr) si record_dir est défini
+        self.record_dir = record_dir
+        self.recorder = None
+
+        self.font = get_font(28)
+        self.game_over_font = get_font(96)  # Pour "GAME OVER"
         self.assets_path = os.path.join(os.path.dirname(__file__), '..', 'assets')
         self.loaded_bg_images = []
         self.loaded_obstacle_images = []
-        self.loaded_fixed_bg_images = []
+        self.scaled_bg_images = []
+        self.bg_strips = []
         self.player_image = None
+        self.asset_loader = None
+        self.asset_jobs = {}
+
+        # combo animation
+        self.combo_frames = []  # Animation: frames et durées (ms) du GIF
+        self.combo_current_frame = 0
+        self.combo_last_frame_time = 0
         
         # Game Over assets
         self.game_over_image = None
@@ -90,144 +122,142 @@ class Game:
         # QTE sound assets
         self.qte_sound = None
         self.qte_sound_played = False
-        self.music_paused_for_qte = False
+        self.music_volume_before_qte = None  # volume à rétablir après le QTE
+        self.music_replaced = False  # un cue 'play' a chargé une autre piste
 
     def load_level(self, path: str):
+        """Charge le niveau et tous ses assets (bloquant)"""
         self.level = Level.load_from_file(path)
-        # clamp obstacle heights so they are potentially reachable by player
-        max_jump_px = (self.jump_strength ** 2) / (2 * self.gravity)  # h = v^2 / (2g)
-        ground_y = self.height - 40
-        for o in self.level.obstacles:
-            # ensure obstacle top is not higher than max_jump_px above ground
-            obstacle_top = o.y
-            # if the obstacle is a high ceiling (y < ground_y - max_jump_px - player height)
-            min_allowed_y = ground_y - max_jump_px - self.player.rect.height
-            if o.y < min_allowed_y:
-                o.y = int(min_allowed_y)
-        # try to load bg images if present
-        self.loaded_bg_images = []
-        for idx, layer in enumerate(self.level.bg_layers):
+        # (obstacle heights are clamped to the reachable range by Simulation)
+        self.request_level_assets().wait_all()
+        self.apply_level_assets()
+        self.start_music()
+
+    def load_level_async(self, path: str) -> bool:
+        """Charge le niveau en affichant une barre de progression.
+
+        Le décodage tourne sur le pool de threads d'AssetLoader; on rend la main
+        dès que les assets critiques (obstacles, joueur, game over) sont prêts,
+        les assets décoratifs arrivent ensuite via pump_assets(). Retourne False
+        si la fenêtre est fermée pendant le chargement.
+        """
+        self.level = Level.load_from_file(path)
+        loader = self.request_level_assets()
+        while not loader.critical_ready:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return False
+            loader.pump(budget=0.010)
+            self.draw_loading(*loader.progress)
+            pygame.display.flip()
+            self.clock.tick(60)
+        self.apply_level_assets()
+        self.start_music()
+        return True
+
+    def request_level_assets(self) -> AssetLoader:
+        """Demande au loader tous les assets du niveau (critiques et décoratifs)"""
+        loader = self.asset_loader = AssetLoader()
+        jobs = self.asset_jobs = {}
+
+        def asset(*parts):
+            return os.path.join(self.assets_path, *parts)
+
+        # images pré-calculées par bake_assets.py (atlas, fonds à la bonne hauteur,
+        # drapeaux d'opacité); None si absentes ou si une source a changé depuis
+        baked = BakedAssets.load(self.assets_path)
+
+        def alpha(*parts):
+            return baked.alpha(os.path.join(*parts)) if baked else True
+
+        # critical: needed to draw gameplay
+        atlas = baked.atlas if baked else None
+        if atlas:
+            path, needs_alpha, rects = atlas
+            jobs['obstacles'] = [loader.request('atlas', path, (needs_alpha, rects), critical=True)]
+        else:
+            jobs['obstacles'] = [loader.request('image', asset(name), True, critical=True)
+                                 for name in numbered(self.assets_path, 'obstacle')]
+        jobs['player'] = loader.request('image', asset("player.png"), alpha("player.png"), critical=True)
+        jobs['game_over_image'] = loader.request('image', asset('ui', 'game_over.png'), alpha('ui', 'game_over.png'),
+                                                 critical=True)
+        if pygame.mixer.get_init() is None:
+            print("⚠️ Audio non disponible - sons désactivés")
+        jobs['game_over_sound'] = loader.request('sound', asset('sounds', 'game_over.wav'), critical=True)
+        jobs['qte_sound'] = loader.request('sound', asset('sounds', 'qte_alert.wav'), critical=True)
+
+        # decorative (submitted after the critical ones, the pool is FIFO)
+        # parallax layers: layer image, else the first of bg1.png, bg2.png, etc.
+        jobs['bg_layers'] = []
+        for layer in self.level.bg_layers:
             img_name = layer.get('image')
-            loaded = None
-            if img_name:
-                candidate = os.path.join(self.assets_path, img_name)
-                if os.path.exists(candidate):
-                    try:
-                        loaded = pygame.image.load(candidate).convert_alpha()
-                    except Exception:
-                        loaded = None
-            # If no specific image, try to load sequential background images
-            elif not img_name:
-                # Try bg1.png, bg2.png, etc.
-                for i in range(1, 10):  # Try up to 9 background images
-                    bg_file = f"bg{i}.png"
-                    candidate = os.path.join(self.assets_path, bg_file)
-                    if os.path.exists(candidate):
-                        try:
-                            loaded = pygame.image.load(candidate).convert_alpha()
-                            break  # Use first found image for this layer
-                        except Exception:
-                            continue
-            self.loaded_bg_images.append(loaded)
-
-        # try to load obstacle images
-        self.loaded_obstacle_images = []
-        for i in range(1, 10):  # Try obstacle1.png, obstacle2.png, etc.
-            obs_file = f"obstacle{i}.png"
-            candidate = os.path.join(self.assets_path, obs_file)
-            if os.path.exists(candidate):
-                try:
-                    img = pygame.image.load(candidate).convert_alpha()
-                    self.loaded_obstacle_images.append(img)
-                except Exception:
-                    continue
-
-        # try to load sequential background images for fixed backgrounds
-        self.loaded_fixed_bg_images = []
-        self.scaled_bg_images = []  # Images redimensionnées pour même hauteur
-        
-        for i in range(1, 20):  # Try background1.png, background2.png, etc.
-            bg_file = f"background{i}.png"
-            candidate = os.path.join(self.assets_path, bg_file)
-            if os.path.exists(candidate):
-                try:
-                    img = pygame.image.load(candidate).convert_alpha()
-                    self.loaded_fixed_bg_images.append(img)
-                    print(f"Background chargé: {bg_file} - Taille: {img.get_size()}")
-                except Exception as e:
-                    print(f"Erreur chargement {bg_file}: {e}")
-                    continue
-        
-        # Redimensionner tous les backgrounds à la même hauteur (hauteur de l'écran)
-        if self.loaded_fixed_bg_images:
-            for img in self.loaded_fixed_bg_images:
-                # Calculer la largeur proportionnelle pour garder le ratio
-                original_w, original_h = img.get_size()
-                target_h = self.height
-                target_w = int((original_w / original_h) * target_h)
-                scaled_img = pygame.transform.scale(img, (target_w, target_h))
-                self.scaled_bg_images.append(scaled_img)
-            print(f"Backgrounds chargés et redimensionnés: {len(self.scaled_bg_images)} images")
-
-        # try to load player image
-        self.player_image = None
-        player_file = "player.png"
-        candidate = os.path.join(self.assets_path, player_file)
-        if os.path.exists(candidate):
-            try:
-                self.player_image = pygame.image.load(candidate).convert_alpha()
-            except Exception:
-                self.player_image = None
-
-        # try to load combo GIF/image with animation support
-        self.combo_frames = []
-        self.combo_frame_duration = 100  # ms entre frames
-        self.combo_current_frame = 0
-        self.combo_last_frame_time = 0
-        
-        combo_files = ["combo.gif", "combo.png", "combo.jpg"]
-        for combo_file in combo_files:
-            candidate = os.path.join(self.assets_path, combo_file)
-            if os.path.exists(candidate):
-                try:
-                    if combo_file.endswith('.gif') and PIL_AVAILABLE:
-                        # Charger GIF animé avec PIL
-                        pil_image = Image.open(candidate)
-                        frames = []
-                        try:
-                            while True:
-                                # Convertir chaque frame PIL en surface Pygame
-                                frame = pil_image.convert('RGBA')
-                                mode = frame.mode
-                                size = frame.size
-                                data = frame.tobytes()
-                                
-                                pygame_surface = pygame.image.fromstring(data, size, mode)
-                                frames.append(pygame_surface.convert_alpha())
-                                
-                                pil_image.seek(pil_image.tell() + 1)
-                        except EOFError:
-                            pass  # Fin du GIF
-                        
-                        if frames:
-                            self.combo_frames = frames
-                            print(f"GIF animé chargé: {combo_file} ({len(frames)} frames)")
-                        else:
-                            # Fallback: charger comme image statique
-                            static_img = pygame.image.load(candidate).convert_alpha()
-                            self.combo_frames = [static_img]
-                            print(f"GIF chargé comme image statique: {combo_file}")
-                    else:
-                        # Image statique
-                        static_img = pygame.image.load(candidate).convert_alpha()
-                        self.combo_frames = [static_img]
-                        print(f"Image combo chargée: {combo_file}")
-                    break
-                except Exception as e:
-                    print(f"Erreur chargement {combo_file}: {e}")
-                    continue
-
-        # music - démarrage immédiat
+            candidates = [img_name] if img_name else [f"bg{i}.png" for i in range(1, 10)]
+            path = next((asset(c) for c in candidates if os.path.exists(asset(c))), None)
+            jobs['bg_layers'].append(loader.request('image', path, True) if path else None)
+        # fixed backgrounds scaled to screen height, combo animation
+        backgrounds = baked.backgrounds(self.height) if baked else None
+        if backgrounds is not None:
+            jobs['backgrounds'] = [loader.request('image', path, needs_alpha) for path, needs_alpha in backgrounds]
+        else:
+            jobs['backgrounds'] = [loader.request('scaled_h', asset(name), self.height)
+                                   for name in numbered(self.assets_path, 'background')]
+        combo = next((asset(c) for c in ("combo.gif", "combo.png", "combo.jpg") if os.path.exists(asset(c))), None)
+        jobs['combo'] = loader.request('animation', combo, COMBO_GIF_SIZE) if combo else None
+        return loader
+
+    def apply_level_assets(self):
+        """Recopie dans le jeu les assets déjà prêts (appelé à chaque arrivée)"""
+        jobs = self.asset_jobs
+        self.loaded_obstacle_images = [img for j in jobs['obstacles'] if j.done and j.value is not None
+                                       for img in (j.value if j.kind == 'atlas' else [j.value])]
+        self.player_image = jobs['player'].value
+        self.game_over_image = jobs['game_over_image'].value
+        self.game_over_sound = jobs['game_over_sound'].value
+        self.qte_sound = jobs['qte_sound'].value
+
+        bg_images = [j.value if j is not None and j.done else None for j in jobs['bg_layers']]
+        if bg_images != self.loaded_bg_images or not self.bg_strips:
+            self.loaded_bg_images = bg_images
+            self.bg_strips = self.bake_parallax_layers()
+
+        # fixed backgrounds: only the ready prefix, so the sequence order never changes
+        self.scaled_bg_images = []
+        for j in jobs['backgrounds']:
+            if not j.done:
+                break
+            if j.value is not None:
+                self.scaled_bg_images.append(j.value)
+
+        combo = jobs['combo']
+        frames = combo.value if combo is not None and combo.done and combo.value else []
+        if frames is not self.combo_frames:
+            self.combo_frames = frames
+            self.combo_current_frame = 0
+
+    def pump_assets(self):
+        """Finalise les assets décoratifs arrivés pendant la partie"""
+        loader = self.asset_loader
+        if loader is not None and not loader.all_ready and loader.pump():
+            self.apply_level_assets()
+            self.dirty.mark_full()
+            if loader.all_ready:
+                done, total = loader.progress
+                print(f"Assets du niveau chargés ({total})")
+
+    def draw_loading(self, done: int, total: int):
+        """Écran de chargement avec barre de progression"""
+        self.screen.fill(self.bg_color)
+        bar = pygame.Rect(0, 0, self.width // 2, 24)
+        bar.center = (self.width // 2, self.height // 2)
+        pygame.draw.rect(self.screen, (80, 80, 100), bar, 2)
+        fill = bar.inflate(-6, -6)
+        fill.width = int(fill.width * (done / total if total else 1.0))
+        pygame.draw.rect(self.screen, (120, 200, 255), fill)
+        label = text_cache.render(self.font, f"Chargement... {done}/{total}", (220, 220, 220))
+        self.screen.blit(label, label.get_rect(midbottom=(bar.centerx, bar.top - 10)))
+
+    def start_music(self):
+        """Lance la musique du niveau (en boucle)"""
         if getattr(self.level, 'music_file', None):
             music_path = os.path.join(self.assets_path, self.level.music_file)
             if os.path.exists(music_path):
@@ -251,69 +281,50 @@ class Game:
         else:
             print("ℹ️ Pas de fichier musique défini pour ce niveau")
 
-    def generate_combo(self):
-        """Génère un combo aléatoire de 2 lettres"""
-        import random
-        letters = ['Q', 'W', 'E', 'R', 'A', 'S', 'D', 'F']
-        self.combo_letters = random.sample(letters, 2)
-        self.combo_input = []
-        
-    def handle_combo_input(self, key):
-        """Gère l'input du combo - les 2 touches doivent être pressées simultanément"""
-        if not self.combo_active:
-            return
-            
-        # Conversion des touches pygame vers lettres
-        key_to_letter = {
-            pygame.K_q: 'Q', pygame.K_w: 'W', pygame.K_e: 'E', pygame.K_r: 'R',
-            pygame.K_a: 'A', pygame.K_s: 'S', pygame.K_d: 'D', pygame.K_f: 'F'
-        }
-        
-        if key in key_to_letter:
-            letter = key_to_letter[key]
-            if letter not in self.combo_input:
-                self.combo_input.append(letter)
-                print(f"Touche pressée: {letter}, Total: {self.combo_input}")
-    
-    def check_combo_simultaneous(self):
-        """Vérifie si les touches sont pressées simultanément"""
-        if not self.combo_active:
-            return
-            
-        # Vérifier si toutes les touches du combo sont actuellement pressées
-        keys = pygame.key.get_pressed()
-        key_map = {
-            'Q': pygame.K_q, 'W': pygame.K_w, 'E': pygame.K_e, 'R': pygame.K_r,
-            'A': pygame.K_a, 'S': pygame.K_s, 'D': pygame.K_d, 'F': pygame.K_f
-        }
-        
-        combo_keys_pressed = True
-        for letter in self.combo_letters:
-            if not keys[key_map[letter]]:
-                combo_keys_pressed = False
-                break
-        
-        if combo_keys_pressed:
-            # Toutes les bonnes touches sont pressées simultanément
-            self.combo_success = True
-            self.combo_active = False
-            
-            # Relancer la musique si elle était en pause pour le QTE
-            if self.music_paused_for_qte:
-                try:
-                    pygame.mixer.music.unpause()  # Relancer la musique
-                    self.music_paused_for_qte = False
-                    print("🎵 Musique relancée après QTE réussi")
-                except Exception as e:
-                    print(f"Erreur lors de la reprise musique: {e}")
-            
-            print("COMBO RÉUSSI - Touches simultanées détectées!")
+    def bake_parallax_layers(self):
+        """Pré-rend chaque couche parallax en une bande horizontale sans raccord.
+
+        Retourne une liste de (surface, période, y, speed_factor). La bande fait
+        au moins largeur écran + une période, donc un seul blit suffit par frame.
+        """
+        strips = []
+        for idx, layer in enumerate(self.level.bg_layers):
+            speed_factor = layer.get('speed_factor', 0.3 + idx * 0.2)
+            color = tuple(layer.get('color', [80, 80, 120]))
+            # vertical variation and scaling
+            y_base = int(self.height * layer.get('y_factor', 0.2 + idx * 0.1))
+            layer_scale = layer.get('scale', 1.0 + idx * 0.1)
+            img = self.loaded_bg_images[idx] if idx < len(self.loaded_bg_images) else None
+            if img:
+                # scale image to layer scale and tile it seamlessly
+                iw = int(img.get_width() * layer_scale)
+                ih = int(img.get_height() * layer_scale)
+                if iw <= 0 or ih <= 0:
+                    continue
+                tile = pygame.transform.smoothscale(img, (iw, ih))
+                period, y, tile_h = iw, y_base, ih
+            else:
+                # fallback: colored rectangles with vertical variation
+                pattern_width = max(120 // (1 + idx), 40)
+                w = int(pattern_width * layer_scale)
+                tile_h = int(self.height * 0.15 * layer_scale)
+                if w <= 0 or tile_h <= 0:
+                    continue
+                tile = pygame.Surface((w, tile_h), pygame.SRCALPHA)
+                tile.fill((*color, 220 - idx * 40))
+                period, y = pattern_width * 2, int(y_base + (idx % 2) * 10)
+            count = self.width // period + 2
+            strip = pygame.Surface((period * count, tile_h), pygame.SRCALPHA).convert_alpha()
+            strip.fill((0, 0, 0, 0))
+            for i in range(count):
+                strip.blit(tile, (i * period, 0))
+            strips.append((strip, period, y, speed_factor))
+        return strips
 
     def draw_combo_screen(self, elapsed_time):
         """Dessine l'écran de combo en haut à gauche sans couvrir tout l'écran"""
-        # Zone du combo en haut à gauche (400x250 pixels)
-        combo_width = 400
-        combo_height = 250
+        # Zone du combo en haut à gauche
+        combo_width, combo_height = COMBO_BOX
         
         # Fond semi-transparent pour la zone combo
         combo_surface = pygame.Surface((combo_width, combo_height))
@@ -328,51 +339,48 @@ class Game:
         if self.combo_frames:
             # Gestion de l'animation
             current_time = pygame.time.get_ticks()
-            if current_time - self.combo_last_frame_time > self.combo_frame_duration:
+            if current_time - self.combo_last_frame_time > self.combo_frames.durations[self.combo_current_frame]:
                 self.combo_current_frame = (self.combo_current_frame + 1) % len(self.combo_frames)
                 self.combo_last_frame_time = current_time
             
-            # Afficher la frame actuelle
+            # Afficher la frame actuelle (déjà à COMBO_GIF_SIZE, voir request_level_assets)
             current_frame = self.combo_frames[self.combo_current_frame]
-            gif_width = min(150, combo_width - 20)
-            gif_height = min(80, combo_height // 3)
-            scaled_gif = pygame.transform.scale(current_frame, (gif_width, gif_height))
+            gif_width, gif_height = COMBO_GIF_SIZE
             gif_x = (combo_width - gif_width) // 2
-            combo_surface.blit(scaled_gif, (gif_x, y_offset))
+            combo_surface.blit(current_frame, (gif_x, y_offset))
             y_offset += gif_height + 10
         
         # Titre compact
-        title_font = pygame.font.Font(None, 36)
-        title_text = title_font.render("COMBO!", True, (255, 255, 255))
+        title_text = text_cache.render(get_font(36), "COMBO!", (255, 255, 255))
         title_x = (combo_width - title_text.get_width()) // 2
         combo_surface.blit(title_text, (title_x, y_offset))
         y_offset += 40
         
         # Lettres à presser (simultanément)
-        combo_str = " + ".join(self.combo_letters)
-        combo_font = pygame.font.Font(None, 32)
-        combo_text = combo_font.render(combo_str, True, (255, 255, 0))
+        combo_str = " + ".join(self.sim.combo_letters)
+        combo_text = text_cache.render(get_font(32), combo_str, (255, 255, 0))
         combo_x = (combo_width - combo_text.get_width()) // 2
         combo_surface.blit(combo_text, (combo_x, y_offset))
         y_offset += 35
         
         # Instructions
-        instruction_font = pygame.font.Font(None, 24)
-        instruction_text = instruction_font.render("Pressez EN MÊME TEMPS!", True, (255, 100, 100))
+        instruction_font = get_font(24)
+        instruction_text = text_cache.render(instruction_font, "Pressez EN MÊME TEMPS!", (255, 100, 100))
         instruction_x = (combo_width - instruction_text.get_width()) // 2
         combo_surface.blit(instruction_text, (instruction_x, y_offset))
         y_offset += 25
         
         # Input actuel
-        if self.combo_input:
-            input_str = " + ".join(self.combo_input)
-            input_text = instruction_font.render(f"Pressé: {input_str}", True, (150, 150, 150))
+        if self.sim.combo_input:
+            input_str = " + ".join(self.sim.combo_input)
+            input_text = text_cache.render(instruction_font, f"Pressé: {input_str}", (150, 150, 150))
             input_x = (combo_width - input_text.get_width()) // 2
             combo_surface.blit(input_text, (input_x, y_offset))
             y_offset += 25
         
         # Timer
-        remaining = self.combo_duration - elapsed_time
+        remaining = self.sim.combo_duration - elapsed_time
+        # texte qui change à chaque frame: rendu direct, hors text_cache
         timer_text = instruction_font.render(f"Temps: {remaining:.1f}s", True, (255, 100, 100))
         timer_x = (combo_width - timer_text.get_width()) // 2
         combo_surface.blit(timer_text, (timer_x, y_offset))
@@ -403,264 +411,394 @@ class Game:
         pygame.draw.line(self.screen, (120, 120, 120), (0, ground_y), (self.width, ground_y), 2)
         
         # Afficher quelques coordonnées importantes
-        coord_font = pygame.font.Font(None, 20)
+        coord_font = get_font(20)
         
         # Niveau 0 (sol)
-        level0_text = coord_font.render("Niveau 0 (Sol)", True, (150, 150, 150))
+        level0_text = text_cache.render(coord_font, "Niveau 0 (Sol)", (150, 150, 150))
         self.screen.blit(level0_text, (5, ground_y - 15))
         
         # Niveau 1 (étage supérieur)
         level1_y = ground_y - 160  # Environ 4 cellules plus haut
         pygame.draw.line(self.screen, (100, 150, 100), (0, level1_y), (self.width, level1_y), 1)
-        level1_text = coord_font.render("Niveau 1", True, (100, 150, 100))
+        level1_text = text_cache.render(coord_font, "Niveau 1", (100, 150, 100))
         self.screen.blit(level1_text, (5, level1_y - 15))
 
-    def load_game_over_assets(self):
-        """Charge l'image et le son de game over"""
-        try:
-            # Charger l'image de game over
-            game_over_path = os.path.join(self.assets_path, 'ui', 'game_over.png')
-            if os.path.exists(game_over_path):
-                self.game_over_image = pygame.image.load(game_over_path).convert_alpha()
-                print("Image de game over chargée!")
-        except Exception as e:
-            print(f"Erreur lors du chargement de l'image game over: {e}")
-            
+    def new_simulation(self, seed=None) -> Simulation:
+        """Crée l'état de jeu headless pour le niveau chargé"""
+        if self.sim is not None and self.sim.streaming:
+            self.sim.index.close()  # chunks en attente de l'ancienne partie
+        self.save_recording()
+        sim = Simulation(self.level, self.width, self.height,
+                         gravity=self.gravity, jump_strength=self.jump_strength, seed=seed)
+        sim.profiler = self.profiler
+        if self.record_dir:
+            self.recorder = ReplayRecorder(self.level_path, sim)
+        self.accumulator = 0.0
+        self._prev_view = (sim.scroll_x, sim.player.y)
+        self._last_dt = FIXED_DT
+        self.view_scroll_x = sim.scroll_x
+        self.view_player_y = sim.player.rect.y
+        return sim
+
+    def tick(self, inputs: FrameInput, dt: float = FIXED_DT):
+        """Un pas de simulation (enregistré dans le replay le cas échéant)"""
+        sim = self.sim
+        self._prev_view = (sim.scroll_x, sim.player.y)
+        self._last_dt = dt
+        self.handle_sim_events(sim.step(inputs, dt))
+        if self.recorder is not None and not self.recorder.saved_path:
+            self.recorder.record(inputs, dt)
+            if sim.game_over:
+                self.save_recording()
+
+    def update_view(self):
+        """Positions de rendu interpolées entre l'état avant et après le dernier pas"""
+        sim = self.sim
+        alpha = min(self.accumulator / self._last_dt, 1.0) if self._last_dt > 0 else 1.0
+        prev_scroll, prev_y = self._prev_view
+        self.view_scroll_x = prev_scroll + (sim.scroll_x - prev_scroll) * alpha
+        self.view_player_y = round(prev_y + (sim.player.y - prev_y) * alpha)
+
+    @property
+    def view_camera_x(self) -> int:
+        return int(self.view_scroll_x)
+
+    def save_recording(self):
+        """Écrit le replay de la partie en cours (une seule fois par partie)"""
+        rec = self.recorder
+        if rec is None or rec.saved_path or not rec.frame_count:
+            return
+        os.makedirs(self.record_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(self.level_path))[0]
+        path = os.path.join(self.record_dir, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{rec.sim.seed % 100000:05d}{REPLAY_EXTENSION}")
         try:
-            # Charger le son de game over
-            if pygame.mixer.get_init() is not None:
-                game_over_sound_path = os.path.join(self.assets_path, 'sounds', 'game_over.wav')
-                if os.path.exists(game_over_sound_path):
-                    self.game_over_sound = pygame.mixer.Sound(game_over_sound_path)
-                    print("Son de game over chargé!")
-            else:
-                print("⚠️ Audio non disponible - sons désactivés")
-        except Exception as e:
-            print(f"Erreur lors du chargement du son game over: {e}")
-            
+            print(f"💾 Replay enregistré: {rec.save(path)}")
+        except OSError as e:
+            print(f"Erreur enregistrement replay: {e}")
+
+    def read_inputs(self, events) -> FrameInput:
+        """Convertit les événements/touches pygame en FrameInput pour la simulation"""
+        jump = False
+        pressed = []
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if self.sim.combo_active:
+                letter = KEY_TO_LETTER.get(event.key)
+                if letter:
+                    pressed.append(letter)
+            elif event.key in (pygame.K_SPACE, pygame.K_UP):
+                jump = True
+        # Check for continuous space/up key press for more responsive jumping
+        keys = pygame.key.get_pressed()
+        self.jump_held = bool(keys[pygame.K_SPACE] or keys[pygame.K_UP])
+        jump = jump or self.jump_held
+        held = [letter for key, letter in KEY_TO_LETTER.items() if keys[key]] if self.sim.combo_active else ()
+        return FrameInput(jump=jump, pressed=pressed, held=held)
+
+    def handle_sim_events(self, events):
+        """Réagit aux événements de la simulation (sons, musique)"""
+        for ev in events:
+            if ev == EVENT_COMBO_START:
+                # Jouer le son de QTE par-dessus la musique baissée
+                if self.qte_sound and not self.qte_sound_played:
+                    try:
+                        self.duck_music()
+                        self.qte_sound.play()
+                        self.qte_sound_played = True
+                    except Exception as e:
+                        print(f"Erreur lors du son de QTE: {e}")
+                print(f"COMBO DÉCLENCHÉ ! Pressez: {' + '.join(self.sim.combo_letters)}")
+            elif ev in (EVENT_COMBO_SUCCESS, EVENT_COMBO_TIMEOUT):
+                self.restore_music_volume()
+                self.qte_sound_played = False  # prochain QTE du niveau
+                if ev == EVENT_COMBO_SUCCESS:
+                    print("COMBO RÉUSSI - Touches simultanées détectées!")
+            elif ev in (EVENT_COMBO_FAILED, EVENT_COLLISION, EVENT_WIN):
+                pygame.mixer.music.stop()  # Arrêter la musique
+                self.restore_music_volume()
+                self.game_over_sound_played = False  # Reset pour jouer le son
+                if ev == EVENT_COMBO_FAILED:
+                    print("COMBO RATÉ - GAME OVER!")
+                elif ev == EVENT_COLLISION:
+                    print("COLLISION - GAME OVER!")
+            elif ev == EVENT_MUSIC_CUE:
+                for cue in self.sim.music_cues:
+                    self.play_music_cue(cue)
+
+    def duck_music(self):
+        """Baisse la musique pendant un QTE (sans pause: le jeu reste calé dessus)"""
+        if pygame.mixer.get_init() is None or self.music_volume_before_qte is not None:
+            return
+        self.music_volume_before_qte = pygame.mixer.music.get_volume()
+        pygame.mixer.music.set_volume(min(QTE_MUSIC_VOLUME, self.music_volume_before_qte))
+
+    def restore_music_volume(self):
+        """Rétablit le volume d'avant le QTE"""
+        if self.music_volume_before_qte is None:
+            return
+        if pygame.mixer.get_init() is not None:
+            pygame.mixer.music.set_volume(self.music_volume_before_qte)
+        self.music_volume_before_qte = None
+
+    def play_music_cue(self, cue: dict):
+        """Applique un événement 'music' de la timeline du niveau"""
+        if pygame.mixer.get_init() is None:
+            return
+        action = cue.get('action', 'play')
         try:
-            # Charger le son de QTE
-            if pygame.mixer.get_init() is not None:
-                qte_sound_path = os.path.join(self.assets_path, 'sounds', 'qte_alert.wav')
-                if os.path.exists(qte_sound_path):
-                    self.qte_sound = pygame.mixer.Sound(qte_sound_path)
-                    print("Son de QTE chargé!")
-        except Exception as e:
-            print(f"Erreur lors du chargement du son QTE: {e}")
+            if action == 'play':
+                if cue.get('file'):
+                    pygame.mixer.music.load(os.path.join(self.assets_path, cue['file']))
+                    self.music_replaced = True
+                pygame.mixer.music.play(cue.get('loops', -1), cue.get('start', 0.0))
+                self.music_clock.rebase()  # get_pos() repart de 0, quel que soit `start`
+            elif action == 'pause':
+                pygame.mixer.music.pause()
+            elif action == 'resume':
+                pygame.mixer.music.unpause()
+                self.music_clock.rebase()
+            elif action == 'stop':
+                pygame.mixer.music.stop()
+            elif action == 'volume':
+                if self.music_volume_before_qte is not None:
+                    # pendant un QTE: appliqué à la fin du QTE
+                    self.music_volume_before_qte = cue.get('volume', 0.7)
+                else:
+                    pygame.mixer.music.set_volume(cue.get('volume', 0.7))
+        except pygame.error as e:
+            print(f"Erreur cue musique ({action}): {e}")
+
+    def restart(self):
+        """Relance le niveau après un game over"""
+        # Arrêter le son de game over s'il est en cours
+        if self.game_over_sound:
+            self.game_over_sound.stop()
+        if self.music_replaced:
+            self.music_replaced = False
+            self.start_music()
+        else:
+            try:
+                pygame.mixer.music.play(-1)  # -1 = loop infinitely
+            except Exception as e:
+                print(f"Erreur lors du redémarrage de la musique: {e}")
+        self.music_clock.start()
+        # le niveau n'est jamais modifié pendant la partie: pas besoin de le recharger
+        self.sim = self.new_simulation()
+        self.game_over_sound_played = False
+        self.qte_sound_played = False
+        self.restore_music_volume()
+
+    def run(self, level_path: str, replay=None):
+        """Joue le niveau; avec `replay` (game.replay.Replay), rejoue la partie enregistrée"""
+        # assets critiques (dont ceux du game over) avant de jouer, le reste en tâche de fond
+        self.level_path = level_path
+        self.profiler.label = os.path.basename(level_path)
+        if not self.load_level_async(level_path):
+            self.profiler.close()
+            return
+        if replay is not None:
+            self.record_dir = None  # on ne ré-enregistre pas un replay
+            frames = replay.frames()
+            next_frame = None
+        self.sim = self.new_simulation(seed=replay.seed if replay is not None else None)
 
-    def run(self, level_path: str):
-        self.load_level(level_path)
-        self.load_game_over_assets()  # Charger les assets de game over
-        
         # S'assurer que la musique joue (au cas où elle aurait été arrêtée précédemment)
         try:
             pygame.mixer.music.play(-1)  # -1 = loop infinitely
         except Exception as e:
             print(f"Info: Relancement musique échoué: {e}")
-        
+
+        prof = self.profiler
+        pending = None  # entrées d'un frame où aucun pas n'a tourné
+        self.clock.tick()  # le temps de chargement ne compte pas
+        self.music_clock.start()
         running = True
-        game_over = False
-        win = False
-        elapsed = 0.0
-        victory_timer = 0.0
-        all_obstacles_passed = False
-        total_obstacles = len(self.level.obstacles)  # Keep track of original obstacle count
-        obstacles_passed = 0  # Count how many obstacles have been passed
         while running:
-            dt = self.clock.tick(60) / 1000.0
-            elapsed += dt
-            
-            for event in pygame.event.get():
+            dt = min(self.clock.tick(self.max_fps) / 1000.0, MAX_FRAME_TIME)
+            # horloge murale recalée sur la musique; le profileur garde le temps réel
+            self.accumulator += self.music_clock.advance(dt, MAX_FRAME_TIME)
+            prof.begin_frame()
+
+            with prof.scope('events'):
+                events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
-                elif event.type == pygame.KEYDOWN:
-                    # Gestion du combo en priorité
-                    if self.combo_active:
-                        self.handle_combo_input(event.key)
-                    elif event.key in (pygame.K_SPACE, pygame.K_UP):
-                        if not game_over:
-                            self.player.jump(self.jump_strength)
-                    elif event.key == pygame.K_r and game_over:
-                        # restart - properly reinitialize everything
-                        # Arrêter le son de game over s'il est en cours
-                        if self.game_over_sound:
-                            self.game_over_sound.stop()
-                        
-                        # Redémarrer la musique
-                        try:
-                            pygame.mixer.music.play(-1)  # -1 = loop infinitely
-                        except Exception as e:
-                            print(f"Erreur lors du redémarrage de la musique: {e}")
-                        
-                        self.load_level(level_path)
-                        self.player = Player(100, self.height - 80)
-                        self.scroll_x = 0.0
-                        game_over = False
-                        win = False
-                        self.game_over_sound_played = False  # Reset pour pouvoir rejouer le son
-                        self.qte_sound_played = False  # Reset pour le QTE
-                        self.music_paused_for_qte = False  # Reset pour la musique
-                        all_obstacles_passed = False
-                        victory_timer = 0.0
-                        obstacles_passed = 0
-                        elapsed = 0.0
-                        total_obstacles = len(self.level.obstacles)
-                        # Reset combo state
-                        self.combo_triggered = False
-                        self.combo_active = False
-
-            # Check for continuous space/up key press for more responsive jumping
-            if not game_over:
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_SPACE] or keys[pygame.K_UP]:
-                    self.player.jump(self.jump_strength)
-
-            # Vérifier les touches simultanées pour le combo
-            if self.combo_active:
-                self.check_combo_simultaneous()
-
-            # update player
-            if not game_over:
-                self.player.update(dt, self.gravity)
-
-            # ===== SYSTÈME DE COMBO VIDÉO À 10s =====
-            if not self.combo_triggered and elapsed >= 8.0:
-                self.combo_triggered = True
-                self.combo_active = True
-                self.combo_start_time = elapsed
-                self.combo_success = False  # Reset du succès pour ce nouveau combo
-                self.generate_combo()
-                
-                # Jouer le son de QTE et mettre la musique en pause
-                if self.qte_sound and not self.qte_sound_played:
-                    try:
-                        pygame.mixer.music.pause()  # Mettre la musique en pause
-                        self.music_paused_for_qte = True
-                        self.qte_sound.play()  # Jouer le son de QTE
-                        self.qte_sound_played = True
-                        print("🎵 Musique mise en pause pour QTE")
-                    except Exception as e:
-                        print(f"Erreur lors de la pause musique: {e}")
-                
-                print(f"COMBO DÉCLENCHÉ ! Pressez: {' + '.join(self.combo_letters)}")
-
-            # Gestion du combo actif
-            if self.combo_active:
-                combo_elapsed = elapsed - self.combo_start_time
-                if combo_elapsed >= self.combo_duration:
-                    # Temps écoulé
-                    self.combo_active = False
-                    
-                    # Relancer la musique si elle était en pause pour le QTE
-                    if self.music_paused_for_qte:
-                        try:
-                            pygame.mixer.music.unpause()  # Relancer la musique
-                            self.music_paused_for_qte = False
-                            print("🎵 Musique relancée après QTE")
-                        except Exception as e:
-                            print(f"Erreur lors de la reprise musique: {e}")
-                    
-                    if not self.combo_success:
-                        # Combo raté = Game Over
-                        game_over = True
-                        pygame.mixer.music.stop()  # Arrêter la musique
-                        self.game_over_sound_played = False  # Reset pour jouer le son
-                        print("COMBO RATÉ - GAME OVER!")
-                        # On continue la boucle pour afficher l'écran de game over
-                    else:
-                        print("COMBO RÉUSSI !")
-
-            # Le jeu continue même pendant le combo
-
-            # simple ground collision
-            ground_y = self.height - 40
-            if self.player.rect.bottom >= ground_y:
-                self.player.rect.bottom = ground_y
-                self.player.vel_y = 0
-                was_on_ground = self.player.on_ground
-                self.player.on_ground = True
-                # Check jump buffer when landing
-                if not was_on_ground and self.player.jump_buffer > 0:
-                    self.player.jump(self.jump_strength)
-
-            # scroll level
-            self.scroll_x += self.level.scroll_speed * dt
-
-            # spawn-timeline handling: spawn obstacles based on time
-            if getattr(self.level, 'spawn_timeline', None):
-                # move items from timeline to active obstacles when their time has come
-                to_spawn = [s for s in self.level.spawn_timeline if s.get('time', 0) <= elapsed]
-                for s in to_spawn:
-                    sx = self.width + 100
-                    sy = s.get('y', self.height - 80)
-                    sw = s.get('w', 40)
-                    sh = s.get('h', 80)
-                    self.level.obstacles.append(Obstacle(sx, sy, sw, sh))
-                    self.level.spawn_timeline.remove(s)
-
-            # move obstacles left as the world scrolls
-            for o in list(self.level.obstacles):
-                o.x -= int(self.level.scroll_speed * dt)
-                # Count obstacles that have been passed by the player
-                if o.x + o.w < self.player.rect.x and not hasattr(o, 'counted'):
-                    obstacles_passed += 1
-                    o.counted = True  # Mark as counted to avoid double counting
-                # remove obstacles that have scrolled past the left
-                if o.x + o.w < -200:
-                    try:
-                        self.level.obstacles.remove(o)
-                    except ValueError:
-                        pass
-
-            # Check if all obstacles have been passed based on count, not remaining obstacles
-            if not all_obstacles_passed and not game_over:
-                if obstacles_passed >= total_obstacles:
-                    all_obstacles_passed = True
-                    victory_timer = 1.0  # Start 1-second countdown
-
-            # collision
-            player_rect = self.player.rect
-            collision = False
-            for i, o in enumerate(self.level.obstacles):
-                o_rect = o.rect()
-                if player_rect.colliderect(o_rect):
-                    # Les pics tuent instantanément
-                    if o.is_deadly():
-                        collision = True
-                        break
-                    
-                    # Pour les plateformes et obstacles normaux, logique d'atterrissage
-                    if o.is_platform():
-                        # Simple and reliable collision logic - check if landing from above
-                        if (player_rect.bottom <= o_rect.top + 20 and  # Player bottom is close to obstacle top (plus de marge)
-                            self.player.vel_y >= 0 and  # Player is falling or stationary
-                            player_rect.centerx >= o_rect.left - 25 and  # Player is roughly above obstacle (plus de marge)
-                            player_rect.centerx <= o_rect.right + 25):  # Plus de marge pour éviter les glissements
-                            # Valid landing on top of obstacle
-                            self.player.rect.bottom = o_rect.top
-                            self.player.vel_y = 0
-                            was_on_ground = self.player.on_ground
-                            self.player.on_ground = True
-                            # Check jump buffer when landing on obstacle
-                            if not was_on_ground and self.player.jump_buffer > 0:
-                                self.player.jump(self.jump_strength)
-                            collision = False
-                            continue
-                        else:
-                            # All other collisions are fatal
-                            collision = True
-                            break
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                    self.toggle_profile_overlay()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self.dirty_rects:
+                    self.dirty_debug = not self.dirty_debug
+                    self.dirty.mark_full()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_r and self.sim.game_over and replay is None:
+                    self.restart()
+                    events = []
+                    pending = None
+                    break
 
-            if collision and not game_over:
-                # Déclencher le game over au lieu de retourner au menu
-                game_over = True
-                pygame.mixer.music.stop()  # Arrêter la musique
-                self.game_over_sound_played = False  # Reset pour jouer le son
-                print("COLLISION - GAME OVER!")
+            if replay is not None:
+                # pas enregistrés, consommés au rythme de l'horloge; la partie
+                # s'arrête à la fin du replay
+                while True:
+                    if next_frame is None:
+                        next_frame = next(frames, None)
+                    if next_frame is None or self.accumulator < next_frame[1]:
+                        break
+                    self.accumulator -= next_frame[1]
+                    self.tick(*next_frame)
+                    next_frame = None
+            else:
+                inputs = self.read_inputs(events)
+                if pending is not None:
+                    inputs = FrameInput(inputs.jump or pending.jump, pending.pressed + inputs.pressed, inputs.held)
+                ticked = False
+                while self.accumulator >= FIXED_DT:
+                    self.accumulator -= FIXED_DT
+                    self.tick(inputs)
+                    ticked = True
+                    # appuis livrés au premier pas du frame, ensuite seulement les touches maintenues
+                    inputs = FrameInput(jump=self.jump_held, held=inputs.held)
+                pending = None if ticked else inputs
+            self.update_view()
+            with prof.scope('assets'):
+                self.pump_assets()
+            if self.dirty_rects:
+                self.present_dirty()
+            else:
+                self.draw_frame()
+                if self.profile_overlay:
+                    self.draw_profile_overlay()
+                with prof.scope('flip'):
+                    pygame.display.flip()
+            prof.end_frame(dt)
+
+        self.save_recording()  # partie quittée en cours de route
+        prof.close()
+        # stop music playback for this level (if any) and return to caller (menu)
+        try:
+            pygame.mixer.music.stop()
+        except Exception:
+            pass
+        return
 
-            # draw
-            # draw background layers (parallax)
-            # default sky
+    def present_dirty(self):
+        """Redessine et envoie à l'écran uniquement les zones modifiées"""
+        sim = self.sim
+        # Le défilement change tout l'écran; sur l'écran de fin de partie la
+        # scène est figée (on réutilise l'image du premier frame)
+        scene_key = (id(sim), 'over', sim.win) if sim.game_over else (id(sim), self.view_camera_x)
+        if scene_key != self._scene_key:
+            self._scene_key = scene_key
+            self._frozen_frame = None
+            self.dirty.mark_full()
+        if not sim.game_over:
+            for rect in self.dynamic_rects():
+                self.dirty.mark(rect)
+        if self.dirty_debug:
+            self.dirty.mark(self.dirty_debug_rect())
+            # effacer les contours dessinés au frame précédent
+            for r in self.dirty.last_rects:
+                for edge in ((r.x, r.y, r.w, 1), (r.x, r.bottom - 1, r.w, 1),
+                             (r.x, r.y, 1, r.h), (r.right - 1, r.y, 1, r.h)):
+                    self.dirty.mark(edge)
+        if self.profile_overlay:
+            self.dirty.mark(self.profile_overlay_rect())
+
+        rects = self.dirty.collect()
+        for rect in rects:
+            if self._frozen_frame is not None:
+                self.screen.blit(self._frozen_frame, rect, rect)
+            else:
+                self.screen.set_clip(rect)
+                self.draw_frame()
+        self.screen.set_clip(None)
+        if sim.game_over and self._frozen_frame is None:
+            self._frozen_frame = self.screen.copy()
+        if self.dirty_debug:
+            self.draw_dirty_debug(rects)
+        if self.profile_overlay:
+            self.draw_profile_overlay()
+        with self.profiler.scope('flip'):
+            pygame.display.update(rects)
+
+    def dynamic_rects(self):
+        """Zones qui peuvent changer quand la caméra ne bouge pas"""
+        sim = self.sim
+        pr = sim.player.rect
+        rects = [pygame.Rect(pr.x, self.view_player_y, pr.w, pr.h).inflate(4, 4)]
+        if sim.all_obstacles_passed:
+            rects.append((20, 20, self.width - 40, 30))  # texte victoire/countdown
+        if sim.combo_active:
+            rects.append((10, 10, 400, 250))  # zone combo
+        return rects
+
+    def dirty_debug_rect(self):
+        return pygame.Rect(5, self.height - 25, 320, 22)
+
+    def draw_dirty_debug(self, rects):
+        """Overlay de debug: contour des zones mises à jour + pixels envoyés"""
+        for rect in rects:
+            pygame.draw.rect(self.screen, (255, 0, 255), rect, 1)
+        label = f"dirty: {len(rects)} rects, {self.dirty.last_pixels} px"
+        text = get_font(20).render(label, True, (255, 0, 255))  # compteurs: rendu direct
+        box = self.dirty_debug_rect()
+        self.screen.fill((0, 0, 0), box)
+        self.screen.blit(text, (box.x + 4, box.y + 4))
+
+    def toggle_profile_overlay(self):
+        self.profile_overlay = not self.profile_overlay
+        # le CSV garde le profilage actif même sans overlay
+        self.profiler.enabled = self.profile_overlay or self.profiler.csv_path is not None
+        self._profile_lines = []
+        self._profile_refresh = 0.0
+        if not self.profile_overlay:
+            self.dirty.mark_full()
+
+    def profile_overlay_rect(self):
+        return pygame.Rect(self.width - 300, 5, 295, 20 + 16 * (len(PHASES) + 1))
+
+    def draw_profile_overlay(self):
+        """Overlay de profilage: moyenne / p95 / p99 (ms) par phase, rafraîchi 2x par seconde"""
+        prof = self.profiler
+        with prof.scope('overlay'):
+            now = time.perf_counter()
+            if now >= self._profile_refresh:
+                self._profile_refresh = now + 0.5
+                font = get_font(16)
+                stats = prof.stats()
+                rows = [("phase", "mean", "p95", "p99")]
+                for name in PHASES + ("total",):
+                    mean, p95, p99 = stats.get(name, (0.0, 0.0, 0.0))
+                    rows.append((name, f"{mean:6.2f}", f"{p95:6.2f}", f"{p99:6.2f}"))
+                # textes rendus directement: les valeurs changent, inutile de polluer text_cache
+                self._profile_lines = [[font.render(cell, True, (120, 255, 120)) for cell in row]
+                                       for row in rows]
+            box = self.profile_overlay_rect()
+            self.screen.fill((0, 0, 0), box)
+            for i, row in enumerate(self._profile_lines):
+                y = box.y + 4 + i * 16
+                self.screen.blit(row[0], (box.x + 6, y))
+                for j, cell in enumerate(row[1:]):
+                    self.screen.blit(cell, (box.right - 200 + j * 65 + 60 - cell.get_width(), y))
+
+    def draw_frame(self):
+        """Dessine l'état courant de la simulation"""
+        prof = self.profiler
+        self.draw_background()
+        with prof.scope('obstacles'):
+            self.draw_obstacles()
+        # draw player
+        with prof.scope('player'):
+            self.sim.player.draw(self.screen, self.player_image, self.view_player_y)
+        with prof.scope('hud'):
+            self.draw_hud()
+
+    def draw_background(self):
+        prof = self.profiler
+        scroll_x = self.view_scroll_x
+        # draw background layers (parallax)
+        # default sky
+        with prof.scope('bg_sky'):
             sky_color = (30, 30, 40)
             if self.level and getattr(self.level, 'bg_layers', None):
                 # if first layer has a color, use it as sky base
@@ -669,205 +807,158 @@ class Game:
                     sky_color = tuple(first['color'])
             self.screen.fill(sky_color)
 
-            if self.level and getattr(self.level, 'bg_layers', None):
-                for idx, layer in enumerate(self.level.bg_layers):
-                    speed_factor = layer.get('speed_factor', 0.3 + idx * 0.2)
-                    color = tuple(layer.get('color', [80, 80, 120]))
-                    # vertical variation and scaling
-                    y_base = int(self.height * layer.get('y_factor', 0.2 + idx * 0.1))
-                    scale = layer.get('scale', 1.0 + idx * 0.1)
-                    img = self.loaded_bg_images[idx] if idx < len(self.loaded_bg_images) else None
-                    if img:
-                        # scale image to layer scale and tile it seamlessly
-                        iw = int(img.get_width() * scale)
-                        ih = int(img.get_height() * scale)
-                        if iw <= 0 or ih <= 0:
-                            continue
-                        scaled = pygame.transform.smoothscale(img, (iw, ih))
-                        pattern_width = iw
-                        offset = int((self.scroll_x * speed_factor) % pattern_width)
-                        # Draw multiple copies to ensure seamless scrolling
-                        for i in range(-2, 6):  # More copies for smoother scrolling
-                            x = i * pattern_width - offset
-                            y = y_base
-                            self.screen.blit(scaled, (x, y))
-                    else:
-                        # fallback: colored rectangles with vertical variation
-                        pattern_width = max(120 // (1 + idx), 40)
-                        offset = int((self.scroll_x * speed_factor) % (pattern_width * 2))
-                        for i in range(-1, 4):
-                            x = i * pattern_width * 2 - offset
-                            y = int(y_base + (idx % 2) * 10)
-                            w = int(pattern_width * scale)
-                            h = int(self.height * 0.15 * scale)
-                            s = pygame.Surface((w, h), pygame.SRCALPHA)
-                            s.fill((*color, 220 - idx * 40))
-                            self.screen.blit(s, (x, y))
-
-            # Draw fixed background images that cycle infinitely
-            if self.scaled_bg_images:
-                # Vitesse de défilement des backgrounds (plus lent que les obstacles)
-                bg_scroll = self.scroll_x * 0.8
-                
-                # Largeur totale d'un cycle complet de backgrounds
-                total_width = sum(img.get_width() for img in self.scaled_bg_images)
-                
-                if total_width > 0:
-                    # Position dans le cycle (0 à total_width)
-                    cycle_pos = bg_scroll % total_width
-                    
-                    # Dessiner en partant de la position cyclique
-                    x_offset = -cycle_pos
-                    
-                    # Dessiner suffisamment de cycles pour couvrir l'écran
-                    while x_offset < self.width + 100:
-                        for img in self.scaled_bg_images:
-                            # Dessiner cette image
-                            if x_offset + img.get_width() > -100:  # Si visible
-                                self.screen.blit(img, (x_offset, 0))
-                            
-                            # Passer à l'image suivante
-                            x_offset += img.get_width()
-                            
-                            # Arrêter si on a couvert l'écran
-                            if x_offset >= self.width + 100:
-                                break
-                        
-                        # Si la boucle for s'est terminée sans break, on continue
-                        if x_offset < self.width + 100:
-                            continue
-                        else:
-                            break
+        # parallax layers: one pre-rendered strip per layer, blitted at a wrapped offset
+        with prof.scope('bg_parallax'):
+            for strip, period, y, speed_factor in self.bg_strips:
+                offset = int((scroll_x * speed_factor) % period)
+                self.screen.blit(strip, (-offset, y))
+
+        # Draw fixed background images that cycle infinitely
+        with prof.scope('bg_fixed'):
+            self.draw_fixed_backgrounds(scroll_x)
 
-            # draw ground
+        # draw ground
+        with prof.scope('bg_ground'):
+            ground_y = self.sim.ground_y
             pygame.draw.rect(self.screen, (80, 80, 100), (0, ground_y, self.width, 40))
 
-            # decorative foreground elements removed
-
-            # draw obstacles
-            for idx, o in enumerate(self.level.obstacles):
-                # Rendu différent selon le type d'obstacle
-                if o.type == "spike":
-                    # Pics arc-en-ciel - forme triangulaire
-                    points = [
-                        (o.x + o.w // 2, o.y),  # Sommet du pic
-                        (o.x, o.y + o.h),       # Base gauche
-                        (o.x + o.w, o.y + o.h)  # Base droite
-                    ]
-                    # Couleur arc-en-ciel basée sur la position X
-                    import math
-                    hue = (o.x / 100) % 6  # Cycle through rainbow every 600 pixels
-                    if hue < 1:  # Rouge -> Orange
-                        color = (255, int(255 * hue), 0)
-                    elif hue < 2:  # Orange -> Jaune
-                        color = (int(255 * (2 - hue)), 255, 0)
-                    elif hue < 3:  # Jaune -> Vert
-                        color = (0, 255, int(255 * (hue - 2)))
-                    elif hue < 4:  # Vert -> Cyan
-                        color = (0, int(255 * (4 - hue)), 255)
-                    elif hue < 5:  # Cyan -> Bleu
-                        color = (int(255 * (hue - 4)), 0, 255)
-                    else:  # Bleu -> Magenta
-                        color = (255, 0, int(255 * (6 - hue)))
-                    
-                    pygame.draw.polygon(self.screen, color, points)
-                    # Contour blanc brillant pour les rendre plus visibles
-                    pygame.draw.polygon(self.screen, (255, 255, 255), points, 2)
-                    
-                elif o.type == "platform":
-                    # Plateformes - plus claires, différentes des obstacles normaux
-                    pygame.draw.rect(self.screen, (120, 120, 140), (o.x, o.y, o.w, o.h))
-                    # Bordure pour les distinguer
-                    pygame.draw.rect(self.screen, (200, 200, 220), (o.x, o.y, o.w, o.h), 3)
-                    
-                else:  # obstacle normal
-                    # Use image if available, otherwise fallback to colored rectangle
-                    if self.loaded_obstacle_images:
-                        # Use obstacle position to determine which image to use (fixed per obstacle)
-                        # This ensures each obstacle always has the same image
-                        img_idx = (o.x // 100) % len(self.loaded_obstacle_images)  # Based on X position
-                        img = self.loaded_obstacle_images[img_idx]
-                        # Scale image to obstacle size
-                        scaled_img = pygame.transform.scale(img, (o.w, o.h))
-                        self.screen.blit(scaled_img, (o.x, o.y))
-                    # Fallback rectangle removed - obstacles need proper images
-
-            # draw player
-            self.player.draw(self.screen, self.player_image)
-
-            # HUD
-            # Victory condition: 1 second after passing all obstacles
-            if all_obstacles_passed and not game_over:
-                victory_timer -= dt
-                if victory_timer <= 0:
-                    win = True
-                    game_over = True
-                    pygame.mixer.music.stop()  # Arrêter la musique
-
-            # Affichage normal (victoire, countdown)
-            if win:
-                text = self.font.render("Vous avez gagné ! Appuyez sur R pour rejouer", True, (200, 255, 200))
-                self.screen.blit(text, (20, 20))
-            elif all_obstacles_passed and not game_over:
-                # Show countdown during victory timer
-                countdown_text = f"Victory in {victory_timer:.1f}s!"
-                text = self.font.render(countdown_text, True, (255, 255, 100))
-                self.screen.blit(text, (20, 20))
-
-            # Dessiner le quadrillage pour l'aide à la construction (désactivé pendant le jeu)
-            # self.draw_grid()
-
-            # Dessiner le combo en haut à gauche s'il est actif
-            if self.combo_active:
-                combo_elapsed = elapsed - self.combo_start_time
-                self.draw_combo_screen(combo_elapsed)
-
-            # AFFICHAGE DU GAME OVER EN DERNIER (par-dessus tout)
-            if game_over and not win:
-                # Jouer le son de game over une seule fois
-                if not self.game_over_sound_played and self.game_over_sound:
-                    self.game_over_sound.play()
-                    self.game_over_sound_played = True
-                
-                # Assombrir l'écran
-                dark_overlay = pygame.Surface((self.width, self.height))
-                dark_overlay.set_alpha(150)
-                dark_overlay.fill((0, 0, 0))
-                self.screen.blit(dark_overlay, (0, 0))
-                
-                # Afficher l'image de game over si disponible
-                if self.game_over_image:
-                    # Centrer l'image
-                    img_rect = self.game_over_image.get_rect()
-                    img_rect.center = (self.width // 2, self.height // 2)
-                    self.screen.blit(self.game_over_image, img_rect)
-                
-                # Afficher "WASTED" centré dans le cadre rouge
-                game_over_text = self.game_over_font.render("WASTED", True, (255, 50, 50))
-                game_over_rect = game_over_text.get_rect()
-                # Centrage au milieu de l'image (même position que l'image)
-                game_over_rect.centerx = self.width // 2
-                game_over_rect.centery = self.height // 2  # Même Y que l'image
-                self.screen.blit(game_over_text, game_over_rect)
-                
-                # Afficher les instructions
-                restart_text = self.font.render("Press R to start another run", True, (255, 200, 200))
-                restart_rect = restart_text.get_rect()
-                restart_rect.center = (self.width // 2, self.height - 100)
-                self.screen.blit(restart_text, restart_rect)
+    def draw_fixed_backgrounds(self, scroll_x):
+        if self.scaled_bg_images:
+            # Vitesse de défilement des backgrounds (plus lent que les obstacles)
+            bg_scroll = scroll_x * 0.8
 
-            pygame.display.flip()
+            # Largeur totale d'un cycle complet de backgrounds
+            total_width = sum(img.get_width() for img in self.scaled_bg_images)
 
-            keys = pygame.key.get_pressed()
-            if collision and keys[pygame.K_r]:
-                # reload level
-                self.load_level(level_path)
-                self.player = Player(100, self.height - 80)
-                self.scroll_x = 0.0
+            if total_width > 0:
+                # Position dans le cycle (0 à total_width)
+                cycle_pos = bg_scroll % total_width
 
-        # stop music playback for this level (if any) and return to caller (menu)
-        try:
-            pygame.mixer.music.stop()
-        except Exception:
-            pass
-        return
+                # Dessiner en partant de la position cyclique
+                x_offset = -cycle_pos
+
+                # Dessiner suffisamment de cycles pour couvrir l'écran
+                while x_offset < self.width + 100:
+                    for img in self.scaled_bg_images:
+                        # Dessiner cette image
+                        if x_offset + img.get_width() > -100:  # Si visible
+                            self.screen.blit(img, (x_offset, 0))
+
+                        # Passer à l'image suivante
+                        x_offset += img.get_width()
+
+                        # Arrêter si on a couvert l'écran
+                        if x_offset >= self.width + 100:
+                            break
+
+                    # Si la boucle for s'est terminée sans break, on continue
+                    if x_offset < self.width + 100:
+                        continue
+                    else:
+                        break
+
+    def draw_obstacles(self):
+        cam = self.view_camera_x
+        # la caméra de rendu (interpolée) est au plus un pas derrière celle de la simulation
+        for o in self.sim.visible_obstacles(margin=abs(self.sim.camera_x - cam) + 1):
+            sx = o.x - cam  # world -> screen
+            # Rendu différent selon le type d'obstacle
+            if o.type == "spike":
+                # Pics arc-en-ciel - forme triangulaire
+                points = [
+                    (sx + o.w // 2, o.y),  # Sommet du pic
+                    (sx, o.y + o.h),       # Base gauche
+                    (sx + o.w, o.y + o.h)  # Base droite
+                ]
+                # Couleur arc-en-ciel basée sur la position X à l'écran
+                hue = (sx / 100) % 6  # Cycle through rainbow every 600 pixels
+                if hue < 1:  # Rouge -> Orange
+                    color = (255, int(255 * hue), 0)
+                elif hue < 2:  # Orange -> Jaune
+                    color = (int(255 * (2 - hue)), 255, 0)
+                elif hue < 3:  # Jaune -> Vert
+                    color = (0, 255, int(255 * (hue - 2)))
+                elif hue < 4:  # Vert -> Cyan
+                    color = (0, int(255 * (4 - hue)), 255)
+                elif hue < 5:  # Cyan -> Bleu
+                    color = (int(255 * (hue - 4)), 0, 255)
+                else:  # Bleu -> Magenta
+                    color = (255, 0, int(255 * (6 - hue)))
+
+                pygame.draw.polygon(self.screen, color, points)
+                # Contour blanc brillant pour les rendre plus visibles
+                pygame.draw.polygon(self.screen, (255, 255, 255), points, 2)
+
+            elif o.type == "platform":
+                # Plateformes - plus claires, différentes des obstacles normaux
+                pygame.draw.rect(self.screen, (120, 120, 140), (sx, o.y, o.w, o.h))
+                # Bordure pour les distinguer
+                pygame.draw.rect(self.screen, (200, 200, 220), (sx, o.y, o.w, o.h), 3)
+
+            else:  # obstacle normal
+                # Use image if available, otherwise fallback to colored rectangle
+                if self.loaded_obstacle_images:
+                    # Use obstacle position to determine which image to use (fixed per obstacle)
+                    # This ensures each obstacle always has the same image
+                    img_idx = (o.x // 100) % len(self.loaded_obstacle_images)  # Based on world X position
+                    img = self.loaded_obstacle_images[img_idx]
+                    # Scale image to obstacle size (cached)
+                    scaled_img = scale(img, (o.w, o.h))
+                    self.screen.blit(scaled_img, (sx, o.y))
+                # Fallback rectangle removed - obstacles need proper images
+
+    def draw_hud(self):
+        sim = self.sim
+        # Affichage normal (victoire, countdown)
+        if sim.win:
+            text = text_cache.render(self.font, "Vous avez gagné ! Appuyez sur R pour rejouer", (200, 255, 200))
+            self.screen.blit(text, (20, 20))
+        elif sim.all_obstacles_passed and not sim.game_over:
+            # Show countdown during victory timer
+            countdown_text = f"Victory in {sim.victory_timer:.1f}s!"
+            text = self.font.render(countdown_text, True, (255, 255, 100))  # change à chaque frame
+            self.screen.blit(text, (20, 20))
+
+        # Dessiner le quadrillage pour l'aide à la construction (désactivé pendant le jeu)
+        # self.draw_grid()
+
+        # Dessiner le combo en haut à gauche s'il est actif
+        if sim.combo_active:
+            self.draw_combo_screen(sim.combo_elapsed)
+
+        # AFFICHAGE DU GAME OVER EN DERNIER (par-dessus tout)
+        if sim.game_over and not sim.win:
+            self.draw_game_over()
+
+    def draw_game_over(self):
+        # Jouer le son de game over une seule fois
+        if not self.game_over_sound_played and self.game_over_sound:
+            self.game_over_sound.play()
+            self.game_over_sound_played = True
+
+        # Assombrir l'écran
+        dark_overlay = pygame.Surface((self.width, self.height))
+        dark_overlay.set_alpha(150)
+        dark_overlay.fill((0, 0, 0))
+        self.screen.blit(dark_overlay, (0, 0))
+
+        # Afficher l'image de game over si disponible
+        if self.game_over_image:
+            # Centrer l'image
+            img_rect = self.game_over_image.get_rect()
+            img_rect.center = (self.width // 2, self.height // 2)
+            self.screen.blit(self.game_over_image, img_rect)
+
+        # Afficher "WASTED" centré dans le cadre rouge
+        game_over_text = text_cache.render(self.game_over_font, "WASTED", (255, 50, 50))
+        game_over_rect = game_over_text.get_rect()
+        # Centrage au milieu de l'image (même position que l'image)
+        game_over_rect.centerx = self.width // 2
+        game_over_rect.centery = self.height // 2  # Même Y que l'image
+        self.screen.blit(game_over_text, game_over_rect)
+
+        # Afficher les instructions
+        restart_text = text_cache.render(self.font, "Press R to start another run", (255, 200, 200))
+        restart_rect = restart_text.get_rect()
+        restart_rect.center = (self.width // 2, self.height - 100)
+        self.screen.blit(restart_text, restart_rect)
@@ -0,0 +1,70 @@
+"""Shared font registry and rendered-text cache.
+
+Building a `pygame.font.Font` and calling `render` are both costly in
+SDL_ttf, so fonts are created once per (face, size) and rendered strings are
+kept in a bounded LRU keyed by (font, text, color). Static labels render
+once through `text_cache`; strings that change every frame (timers,
+countdowns, debug counters) are rendered directly with `font.render`.
+"""
+from collections import OrderedDict
+
+import pygame
+
+_fonts = {}
+
+
+def get_font(size: int, face=None) -> pygame.font.Font:
+    """Font for (face, size); `face=None` is pygame's default font."""
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(face, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU of rendered text surfaces keyed by (font, text, color, antialias)."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        key = (font, text, tuple(color), antialias)
+        surface = self._entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._entries[key] = surface
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+text_cache = TextCache()
@@ -0,0 +1,11 @@
+"""Content hashes used as cache keys (converted audio, beat analysis, GIF spritesheets, baked images)."""
+import hashlib
+
+
+def file_digest(path: str, block: int = 1 << 20) -> str:
+    """SHA-256 of the file content, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(block), b""):
+            h.update(data)
+    return h.hexdigest()
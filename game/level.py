@@ -1,8 +1,28 @@
 import json
 from typing import List, Dict, Any
 
+# Le jeu d'origine déplaçait les obstacles de int(scroll_speed * dt) pixels par
+# frame à 60 FPS: les niveaux ont été réglés sur cette vitesse effective.
+SCROLL_FPS = 60
+
+
+def effective_speed(scroll_speed: float) -> float:
+    """Scroll speed (px/s) a level actually runs at: whole pixels per 1/60 s frame.
+
+    350 gives 300 px/s, as in the original frame loop; a moving level
+    scrolls at least 1 px per frame.
+    """
+    step = int(scroll_speed / SCROLL_FPS)
+    if step == 0 and scroll_speed > 0:
+        step = 1
+    return step * SCROLL_FPS
+
 
 class Obstacle:
+    """Axis-aligned obstacle in world coordinates (x grows along the level)."""
+
+    __slots__ = ("x", "y", "w", "h", "type")
+
     def __init__(self, x: int, y: int, w: int, h: int, obstacle_type: str = "normal"):
         self.x = x
         self.y = y
@@ -35,9 +55,33 @@ class Level:
         self.duration = None  # seconds, if None level runs until obstacles exhausted
         self.spawn_timeline: List[Dict[str, Any]] = []  # list of timed spawn events
         self.music_file: str | None = None
+        self.title: str | None = None
+        self.obstacle_records = None  # packed records (memoryview) when loaded from a compiled file
+        self.stream = None  # level_binary.LevelStream when obstacles are streamed by chunk
 
     @staticmethod
-    def load_from_file(path: str) -> 'Level':
+    def load_from_file(path: str, stream: bool | None = None) -> 'Level':
+        """Load a level from JSON or from its compiled .gdl form.
+
+        A JSON path whose compiled sibling is up to date (see
+        `compile_levels.py`) is read from the binary file instead. Compiled
+        levels are streamed chunk by chunk (`Level.stream`) when `stream` is
+        True, or when None and the level is large.
+        """
+        from . import level_binary
+        compiled = None
+        if level_binary.is_compiled(path):
+            compiled = path
+        elif level_binary.is_fresh(path):
+            compiled = level_binary.compiled_path(path)
+        if compiled:
+            if stream is None:
+                header = level_binary.read_header(compiled)
+                stream = header is not None and header[6] >= level_binary.STREAM_MIN_OBSTACLES
+            if stream:
+                return level_binary.open_stream(compiled)
+            return level_binary.load_compiled(compiled)
+
         with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
@@ -57,4 +101,5 @@ class Level:
         # spawn_timeline: list of {time: seconds, w: , h:, y: }
         lvl.spawn_timeline = data.get('spawn_timeline', [])
         lvl.music_file = data.get('music')
+        lvl.title = data.get('title')
         return lvl
@@ -0,0 +1,255 @@
+"""Compiled binary level format (.gdl).
+
+Layout (little endian)::
+
+    header      HEADER (magic, version, size, scroll speed, counts, source
+                stamp, section offsets, chunking)
+    obstacles   obstacle_count x OBSTACLE  (x, y, w, h: int32, type code: u8,
+                seq: u32 = index in the JSON), sorted by x
+    timeline    timeline_count x SPAWN     (time: f64, y, w, h: int32, mask: u8)
+    meta        UTF-8 JSON: every other level key, the type-name table and
+                timeline entries that are not plain spawns
+    chunks      chunk_count x CHUNK (x of the first record, max right edge):
+                chunk k holds records [k * CHUNK_RECORDS, (k + 1) * CHUNK_RECORDS)
+
+Files are read through `mmap`: obstacle and spawn records are unpacked
+straight from a `memoryview` of the mapping, and `Level.obstacle_records`
+keeps that view so array consumers (`ObstacleArrays.from_records`) can use
+the columns without copying. `open_stream` maps the file without building
+any Obstacle and lets `game.streaming` decode chunks on demand. The header stores the source JSON's mtime and
+size, so a compiled file is only rebuilt when the JSON changes.
+"""
+import json
+import mmap
+import os
+import struct
+
+from .level import Level, Obstacle
+
+MAGIC = b"GDLV"
+VERSION = 2
+EXTENSION = ".gdl"
+
+HEADER = struct.Struct("<4sHHIIdIIqQQQQQQIII4x")
+OBSTACLE = struct.Struct("<iiiiB3xI")
+CHUNK = struct.Struct("<ii")
+CHUNK_RECORDS = 2048
+STREAM_MIN_OBSTACLES = 50000  # au-delà, Level.load_from_file streame les obstacles
+SPAWN = struct.Struct("<diiiB3x")
+
+BASE_TYPES = ["normal", "platform", "spike"]  # codes 0..2, same as obstacle_store
+SPAWN_FIELDS = ("y", "w", "h")
+
+
+def compiled_path(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + EXTENSION
+
+
+def is_compiled(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(4) == MAGIC
+    except OSError:
+        return False
+
+
+def _source_stamp(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def read_header(path: str):
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        return None
+    fields = HEADER.unpack(data)
+    if fields[0] != MAGIC or fields[1] != VERSION:
+        return None
+    return fields
+
+
+def is_fresh(json_path: str, bin_path: str = None) -> bool:
+    """True if the compiled file exists and was built from the current JSON."""
+    bin_path = bin_path or compiled_path(json_path)
+    try:
+        header = read_header(bin_path)
+        stamp = _source_stamp(json_path)
+    except OSError:
+        return False
+    return header is not None and (header[8], header[9]) == stamp
+
+
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def _int32(value, where: str, key: str) -> int:
+    """Field of an int32 record: floats are rounded, anything else raises ValueError."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}: '{key}' must be a number, got {value!r}")
+    if value != value or value in (float('inf'), float('-inf')):
+        raise ValueError(f"{where}: '{key}' is not finite ({value!r})")
+    n = round(value)
+    if not INT32_MIN <= n <= INT32_MAX:
+        raise ValueError(f"{where}: '{key}' out of int32 range ({value!r})")
+    return n
+
+
+def compile_level(json_path: str, out_path: str = None) -> str:
+    """Compile a JSON level to the binary format; return the output path.
+
+    Positions and sizes are stored as int32 (floats are rounded); a missing
+    or invalid field raises ValueError naming the level and the entry.
+    """
+    out_path = out_path or compiled_path(json_path)
+    mtime_ns, size = _source_stamp(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    types = list(BASE_TYPES)
+    codes = {t: i for i, t in enumerate(types)}
+    records = []
+    for seq, o in enumerate(data.get('obstacles', [])):
+        t = o.get('type', 'normal')
+        if t not in codes:
+            codes[t] = len(types)
+            types.append(t)
+        where = f"{json_path}: obstacle #{seq}"
+        try:
+            x, y, w, h = (_int32(o[k], where, k) for k in ('x', 'y', 'w', 'h'))
+        except KeyError as e:
+            raise ValueError(f"{where}: missing {e}") from None
+        records.append((x, y, w, h, codes[t], seq))
+    records.sort(key=lambda r: (r[0], r[5]))
+    obstacles = bytearray()
+    chunks = bytearray()
+    for start in range(0, len(records), CHUNK_RECORDS):
+        chunk = records[start:start + CHUNK_RECORDS]
+        chunks += CHUNK.pack(chunk[0][0], max(r[0] + r[2] for r in chunk))
+        for r in chunk:
+            obstacles += OBSTACLE.pack(*r)
+    max_w = max((r[2] for r in records), default=0)
+
+    spawns = bytearray()
+    other_events = []
+    for i, s in enumerate(data.get('spawn_timeline', [])):
+        if set(s) <= {'time', *SPAWN_FIELDS}:
+            where = f"{json_path}: spawn_timeline #{i}"
+            mask = 0
+            values = []
+            for bit, key in enumerate(SPAWN_FIELDS):
+                if key in s:
+                    mask |= 1 << bit
+                values.append(_int32(s.get(key, 0), where, key))
+            at = s.get('time', 0)
+            if isinstance(at, bool) or not isinstance(at, (int, float)):
+                raise ValueError(f"{where}: 'time' must be a number, got {at!r}")
+            spawns += SPAWN.pack(at, *values, mask)
+        else:
+            other_events.append(s)
+
+    meta = {k: v for k, v in data.items() if k not in ('obstacles', 'spawn_timeline', 'width', 'height', 'scroll_speed')}
+    meta['_types'] = types
+    meta['_timeline_other'] = other_events
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    n_obs = len(obstacles) // OBSTACLE.size
+    n_spawn = len(spawns) // SPAWN.size
+    obstacles_offset = HEADER.size
+    timeline_offset = obstacles_offset + len(obstacles)
+    meta_offset = timeline_offset + len(spawns)
+    chunk_offset = meta_offset + len(meta_bytes)
+    header = HEADER.pack(MAGIC, VERSION, 0, _int32(data.get('width', 800), json_path, 'width'),
+                         _int32(data.get('height', 450), json_path, 'height'),
+                         float(data.get('scroll_speed', 200)), n_obs, n_spawn, mtime_ns, size,
+                         obstacles_offset, timeline_offset, meta_offset, len(meta_bytes),
+                         chunk_offset, CHUNK_RECORDS, len(chunks) // CHUNK.size, max_w)
+
+    tmp = out_path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(obstacles)
+        f.write(spawns)
+        f.write(meta_bytes)
+        f.write(chunks)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class LevelStream:
+    """Memory-mapped compiled level whose obstacles are decoded chunk by chunk."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self.buffer = memoryview(self._mmap)
+        (magic, version, _, self.width, self.height, self.scroll_speed, self.obstacle_count,
+         self.timeline_count, _, _, self.obstacles_offset, self.timeline_offset, meta_off, meta_len,
+         chunk_off, self.chunk_records, self.chunk_count, self.max_w) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a compiled level (version {VERSION})")
+        self.path = path
+        self.meta = json.loads(bytes(buf[meta_off:meta_off + meta_len]).decode('utf-8'))
+        self.types = self.meta.pop('_types')
+        # (x of the first record, max right edge) per chunk
+        self.chunks = list(CHUNK.iter_unpack(buf[chunk_off:chunk_off + self.chunk_count * CHUNK.size]))
+
+    def records(self, first: int = 0, count: int = None) -> memoryview:
+        """Packed OBSTACLE records `[first, first + count)` (zero-copy)."""
+        if count is None:
+            count = self.obstacle_count - first
+        start = self.obstacles_offset + first * OBSTACLE.size
+        return self.buffer[start:start + count * OBSTACLE.size]
+
+    def read_chunk(self, k: int):
+        """(seq, Obstacle) pairs of chunk `k`, sorted by x. Thread-safe."""
+        first = k * self.chunk_records
+        count = min(self.chunk_records, self.obstacle_count - first)
+        types = self.types
+        return [(seq, Obstacle(x, y, w, h, types[t]))
+                for x, y, w, h, t, seq in OBSTACLE.iter_unpack(self.records(first, count))]
+
+    def timeline(self):
+        buf = self.buffer
+        timeline = []
+        for t, y, w, h, mask in SPAWN.iter_unpack(buf[self.timeline_offset:self.timeline_offset + self.timeline_count * SPAWN.size]):
+            entry = {'time': t}
+            for bit, (key, value) in enumerate(zip(SPAWN_FIELDS, (y, w, h))):
+                if mask & (1 << bit):
+                    entry[key] = value
+            timeline.append(entry)
+        timeline.extend(self.meta['_timeline_other'])
+        timeline.sort(key=lambda s: s.get('time', 0))
+        return timeline
+
+    def make_level(self, obstacles) -> Level:
+        meta = self.meta
+        lvl = Level(self.width, self.height, obstacles, self.scroll_speed)
+        lvl.bg_layers = meta.get('bg_layers', [])
+        lvl.duration = meta.get('duration')
+        lvl.spawn_timeline = self.timeline()
+        lvl.music_file = meta.get('music')
+        lvl.title = meta.get('title')
+        return lvl
+
+
+def load_compiled(path: str) -> Level:
+    """Load a compiled level through mmap, with every obstacle in memory."""
+    stream = LevelStream(path)
+    types = stream.types
+    records = stream.records()
+    # records are stored by x: put the obstacles back in level (JSON) order
+    obstacles = [None] * stream.obstacle_count
+    for x, y, w, h, t, seq in OBSTACLE.iter_unpack(records):
+        obstacles[seq] = Obstacle(x, y, w, h, types[t])
+    lvl = stream.make_level(obstacles)
+    lvl.obstacle_records = records  # zero-copy view, keeps the mapping alive
+    return lvl
+
+
+def open_stream(path: str) -> Level:
+    """Level whose obstacles stay on disk; `Simulation` streams them by chunk."""
+    stream = LevelStream(path)
+    lvl = stream.make_level([])
+    lvl.stream = stream
+    return lvl
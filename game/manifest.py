@@ -0,0 +1,99 @@
+"""Persistent level manifest for the level-select menu.
+
+One JSON file (`.manifest.json` in the levels folder) stores, for every
+level, the few fields the menu shows: title, obstacle count, duration, music
+plus the file's size and mtime. `refresh()` only re-parses levels whose size
+or mtime changed, so opening the menu does not read the level files.
+"""
+import json
+import os
+from typing import Dict, List
+
+from .level import effective_speed
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 2  # v2: durée estimée à la vitesse effective
+
+
+def summarize_level(path: str) -> dict:
+    """Menu fields of one JSON level (full parse)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    obstacles = data.get('obstacles', [])
+    duration = data.get('duration')
+    if duration is None and obstacles:
+        # estimation : temps pour que le dernier obstacle sorte de l'écran
+        end_x = max(o['x'] + o['w'] for o in obstacles)
+        duration = end_x / max(effective_speed(data.get('scroll_speed', 200)), 1)
+    return {
+        "title": data.get('title', os.path.basename(path)),
+        "obstacles": len(obstacles),
+        "duration": duration,
+        "music": data.get('music'),
+    }
+
+
+class LevelManifest:
+    """Level summaries keyed by file name, refreshed incrementally."""
+
+    def __init__(self, folder: str = "data/levels", path: str = None):
+        self.folder = folder
+        self.path = path or os.path.join(folder, MANIFEST_NAME)
+        self.entries: Dict[str, dict] = {}
+        self.parsed = 0  # fichiers re-lus lors du dernier refresh
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('levels', {})
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "levels": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> bool:
+        """Re-parse new/changed levels, drop deleted ones; return True if anything changed."""
+        changed = False
+        self.parsed = 0
+        seen = set()
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if not entry.name.endswith('.json') or entry.name == MANIFEST_NAME:
+                    continue
+                seen.add(entry.name)
+                st = entry.stat()
+                old = self.entries.get(entry.name)
+                if old is not None and old['mtime_ns'] == st.st_mtime_ns and old['size'] == st.st_size:
+                    continue
+                try:
+                    info = summarize_level(entry.path)
+                except Exception as e:
+                    print(f"Niveau ignoré {entry.name}: {e}")
+                    info = {"title": entry.name, "obstacles": 0, "duration": None, "music": None, "error": str(e)}
+                info["size"] = st.st_size
+                info["mtime_ns"] = st.st_mtime_ns
+                self.entries[entry.name] = info
+                self.parsed += 1
+                changed = True
+        for name in set(self.entries) - seen:
+            del self.entries[name]
+            changed = True
+        if changed:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Impossible d'écrire le manifeste: {e}")
+        return changed
+
+    def levels(self) -> List[dict]:
+        """Entries sorted by title, each with its `path`."""
+        result = [dict(info, path=os.path.join(self.folder, name)) for name, info in self.entries.items()]
+        result.sort(key=lambda e: (e['title'], e['path']))
+        return result
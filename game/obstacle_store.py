@@ -0,0 +1,122 @@
+"""Array-backed (structure-of-arrays) obstacle store with vectorized kernels.
+
+Optional: requires NumPy. Opt-in with `Simulation(use_arrays=True)`: the
+per-step collision work becomes a handful of array operations instead of a
+Python loop over obstacles. It is not the default because the per-call NumPy
+overhead makes it slower than the x-sorted `ObstacleIndex`, which already
+only visits the obstacles near the player (`benchmark.py` measures both:
+~120 µs vs ~10 µs per step on 100k obstacles).
+"""
+from typing import List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# type codes
+TYPE_NORMAL = 0
+TYPE_PLATFORM = 1
+TYPE_SPIKE = 2
+TYPE_OTHER = 3  # unknown types: neither platform nor deadly
+TYPE_CODES = {"normal": TYPE_NORMAL, "platform": TYPE_PLATFORM, "spike": TYPE_SPIKE}
+
+# layout of one packed obstacle record (level_binary.OBSTACLE)
+RECORD_DTYPE = (np.dtype([("x", "<i4"), ("y", "<i4"), ("w", "<i4"), ("h", "<i4"), ("type", "u1"), ("pad", "V3"),
+                          ("seq", "<u4")])
+                if NUMPY_AVAILABLE else None)
+
+
+class ObstacleArrays:
+    """x, y, w, h and type-code columns, sorted by left edge.
+
+    `seq` keeps the original level order so contacts are resolved in the
+    same order as a scan over `Level.obstacles`.
+    """
+
+    def __init__(self, obstacles):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for ObstacleArrays (pip install -r requirements-tools.txt)")
+        n = len(obstacles)
+        self._set_columns(
+            obstacles,
+            np.fromiter((o.x for o in obstacles), dtype=np.int64, count=n),
+            np.fromiter((o.y for o in obstacles), dtype=np.int64, count=n),
+            np.fromiter((o.w for o in obstacles), dtype=np.int64, count=n),
+            np.fromiter((o.h for o in obstacles), dtype=np.int64, count=n),
+            np.fromiter((TYPE_CODES.get(o.type, TYPE_OTHER) for o in obstacles), dtype=np.int8, count=n))
+
+    @classmethod
+    def from_records(cls, records, obstacles, min_y=None) -> 'ObstacleArrays':
+        """Build from packed `level_binary.OBSTACLE` records (a memoryview).
+
+        The columns are read in place with `np.frombuffer` instead of walking
+        the Obstacle objects; `min_y` applies the same clamp as
+        `Simulation.clamp_obstacles`.
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for ObstacleArrays (pip install -r requirements-tools.txt)")
+        rec = np.frombuffer(records, dtype=RECORD_DTYPE)
+        y = rec["y"] if min_y is None else np.maximum(rec["y"], min_y)
+        self = cls.__new__(cls)
+        self._set_columns(obstacles, rec["x"], y, rec["w"], rec["h"],
+                          np.minimum(rec["type"], TYPE_OTHER).astype(np.int8), rec["seq"].astype(np.int64))
+        return self
+
+    def _set_columns(self, obstacles, x, y, w, h, types, seq=None):
+        order = np.argsort(x, kind="stable")
+        self.x = x[order].astype(np.int64)
+        self.y = y[order].astype(np.int64)
+        self.w = w[order].astype(np.int64)
+        self.h = h[order].astype(np.int64)
+        self.type = types[order]
+        self.seq = order if seq is None else seq[order]
+        self.items = [obstacles[i] for i in self.seq]
+        self.max_w = int(self.w.max()) if len(order) else 0
+        self.rights = np.sort(self.x + self.w)
+
+    def __len__(self):
+        return len(self.items)
+
+    def window(self, x0, x1):
+        """Indices (in level order) of obstacles whose x-span may overlap `[x0, x1]`."""
+        lo, hi = np.searchsorted(self.x, (x0 - self.max_w, x1 + 1))
+        idx = np.arange(lo, hi)
+        if hi - lo > 1:
+            idx = idx[np.argsort(self.seq[lo:hi], kind="stable")]
+        return idx
+
+    def query(self, x0, x1) -> List:
+        return [self.items[i] for i in self.window(x0, x1)]
+
+    def sweep(self, idx, left, top, w, h, dx, dy):
+        """Vectorized `collision.sweep_aabb` of the moving player box against obstacles `idx`.
+
+        Returns `(t, top_face)` arrays; `t` is inf where there is no contact
+        during the step (and for unknown obstacle types, which never collide).
+        """
+        ox = self.x[idx].astype(np.float64)
+        oy = self.y[idx].astype(np.float64)
+        tx0, tx1 = _axis(left, left + w, ox, ox + self.w[idx], dx)
+        ty0, ty1 = _axis(top, top + h, oy, oy + self.h[idx], dy)
+        t0 = np.maximum(tx0, ty0)
+        t1 = np.minimum(tx1, ty1)
+        hit = (t0 < t1) & (t0 < 1.0) & (t1 > 0.0) & (self.type[idx] != TYPE_OTHER)
+        top_face = hit & (t0 >= 0.0) & (dy > 0) & (ty0 >= tx0)
+        return np.where(hit, np.maximum(t0, 0.0), np.inf), top_face
+
+    def count_passed(self, x) -> int:
+        """Number of obstacles whose right edge is left of world x."""
+        return int(np.searchsorted(self.rights, x, side="left"))
+
+
+def _axis(p0, p1, o0, o1, d):
+    """Entry/exit times along one axis (scalar motion, obstacle arrays)."""
+    if d > 0:
+        return (o0 - p1) / d, (o1 - p0) / d
+    if d < 0:
+        return (o1 - p0) / d, (o0 - p1) / d
+    inside = (p0 < o1) & (o0 < p1)
+    return np.where(inside, -np.inf, np.inf), np.where(inside, np.inf, -np.inf)
@@ -1,11 +1,14 @@
 import pygame
 
+from .surface_cache import scale
+
 
 class Player:
     """Simple player rectangle with gravity and jump."""
 
     def __init__(self, x: int, y: int, w: int = 40, h: int = 40):
         self.rect = pygame.Rect(x, y, w, h)
+        self.y = float(y)  # position exacte (sous-pixel); rect.y en est l'arrondi
         self.vel_y = 0.0
         self.on_ground = False
         self.alive = True
@@ -14,9 +17,12 @@ class Player:
         self.last_jump_time = 0.0  # prevent multiple jumps per keypress
 
     def update(self, dt: float, gravity: float):
-        # apply gravity
+        # apply gravity; position integrated with the mean velocity of the step,
+        # exact for constant gravity: the arc does not depend on the step size
+        vel_start = self.vel_y
         self.vel_y += gravity * dt
-        self.rect.y += int(self.vel_y * dt)
+        self.y += (vel_start + self.vel_y) * 0.5 * dt
+        self.rect.y = round(self.y)
         
         # Update coyote time (grace period after leaving ground)
         if self.on_ground:
@@ -28,6 +34,16 @@ class Player:
         self.jump_buffer = max(0, self.jump_buffer - dt)
         self.last_jump_time = max(0, self.last_jump_time - dt)
 
+    def set_bottom(self, bottom: int):
+        self.rect.bottom = bottom
+        self.y = float(self.rect.y)
+
+    def copy(self) -> 'Player':
+        clone = Player.__new__(Player)
+        clone.__dict__.update(self.__dict__)
+        clone.rect = self.rect.copy()
+        return clone
+
     def jump(self, strength: float):
         # More responsive jump with coyote time and jump buffer
         if self.alive and self.last_jump_time <= 0:
@@ -41,11 +57,13 @@ class Player:
                 # Store jump input for a short time (jump buffer)
                 self.jump_buffer = 0.1
 
-    def draw(self, surface: pygame.Surface, player_image=None):
+    def draw(self, surface: pygame.Surface, player_image=None, y=None):
+        """Draw at `y` (interpolated render position) or at the simulated rect."""
+        rect = self.rect if y is None else pygame.Rect(self.rect.x, y, self.rect.w, self.rect.h)
         if player_image:
-            # Scale image to player size
-            scaled_img = pygame.transform.scale(player_image, (self.rect.width, self.rect.height))
-            surface.blit(scaled_img, (self.rect.x, self.rect.y))
+            # Scale image to player size (cached)
+            scaled_img = scale(player_image, rect.size)
+            surface.blit(scaled_img, rect.topleft)
         else:
             # Fallback: colored rectangle
-            pygame.draw.rect(surface, (255, 100, 100), self.rect)
+            pygame.draw.rect(surface, (255, 100, 100), rect)
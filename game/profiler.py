@@ -0,0 +1,148 @@
+"""Per-phase frame profiler.
+
+Each frame, `Game` and `Simulation` time their phases (events, physics,
+timeline, collisions, background passes, drawing, flip) with
+`time.perf_counter`. The last `window` frames are kept to compute mean, p95
+and p99 per phase for the in-game overlay (F2); with a CSV path every frame
+is also written as one row of milliseconds. Rows are appended (the header
+only goes into a new file) and start with the `label` of the run, so the
+levels played from the menu share one file.
+
+Disabled profilers cost one attribute check per phase: `scope()` hands back
+a shared no-op context manager and `Simulation.step` skips its timers.
+"""
+import csv
+import math
+from collections import deque
+from time import perf_counter
+from typing import Dict, Optional, Tuple
+
+# ordre d'affichage (overlay) et colonnes du CSV
+PHASES = (
+    "events", "physics", "timeline", "collision", "assets",
+    "bg_sky", "bg_parallax", "bg_fixed", "bg_ground",
+    "obstacles", "player", "hud", "overlay", "flip",
+)
+
+DEFAULT_WINDOW = 300  # frames (5 s à 60 FPS)
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, perf_counter() - self.start)
+        return False
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class FrameProfiler:
+    """Accumulates phase durations per frame, over a rolling window."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, csv_path: Optional[str] = None, label: str = ""):
+        self.window = window
+        self.samples = {name: deque(maxlen=window) for name in PHASES}
+        self.frame_times = deque(maxlen=window)  # durée totale du frame (hors attente du clock)
+        self.frames = 0
+        self._current: Dict[str, float] = {}
+        self._frame_start = None
+        self.csv_path = csv_path
+        self.label = label  # première colonne du CSV (niveau joué)
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, 'a', newline='', encoding='utf-8')
+            self._csv = csv.writer(self._csv_file)
+            if self._csv_file.tell() == 0:
+                self._csv.writerow(("label", "frame", "dt_ms", "total_ms") + tuple(f"{name}_ms" for name in PHASES))
+        # le CSV impose le profilage de chaque frame
+        self.enabled = self._csv is not None
+
+    def scope(self, name: str):
+        """Context manager timing `name` (no-op when disabled)."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def add(self, name: str, seconds: float):
+        cur = self._current
+        cur[name] = cur.get(name, 0.0) + seconds
+
+    def lap(self, name: str, start: float) -> float:
+        """Charge `now - start` to `name` and return now (chained timers)."""
+        now = perf_counter()
+        cur = self._current
+        cur[name] = cur.get(name, 0.0) + (now - start)
+        return now
+
+    def begin_frame(self):
+        if self.enabled:
+            self._current = {}
+            self._frame_start = perf_counter()
+
+    def end_frame(self, dt: float = 0.0):
+        """Close the frame; `dt` is the frame-to-frame time reported by the clock."""
+        if not self.enabled or self._frame_start is None:
+            return
+        total = perf_counter() - self._frame_start
+        self._frame_start = None
+        cur = self._current
+        for name, values in self.samples.items():
+            values.append(cur.get(name, 0.0))
+        self.frame_times.append(total)
+        self.frames += 1
+        if self._csv is not None:
+            self._csv.writerow([self.label, self.frames, f"{dt * 1000:.3f}", f"{total * 1000:.3f}"] +
+                               [f"{cur.get(name, 0.0) * 1000:.3f}" for name in PHASES])
+
+    def stats(self) -> Dict[str, Tuple[float, float, float]]:
+        """{phase: (mean, p95, p99)} in milliseconds over the window, plus 'total'."""
+        result = {}
+        for name, values in list(self.samples.items()) + [("total", self.frame_times)]:
+            if not values:
+                continue
+            ordered = sorted(values)
+            result[name] = (sum(ordered) / len(ordered) * 1000,
+                            percentile(ordered, 95) * 1000,
+                            percentile(ordered, 99) * 1000)
+        return result
+
+    def reset(self):
+        for values in self.samples.values():
+            values.clear()
+        self.frame_times.clear()
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
+            print(f"📊 Profil ajouté à {self.csv_path} ({self.frames} frames)")
@@ -0,0 +1,186 @@
+"""Deterministic input recording and replay.
+
+A run is fully determined by the level, the simulation seed/parameters and
+the (input, dt) pair fed to `Simulation.step` each frame, so that is all a
+replay stores. File layout (.gdr, little endian)::
+
+    HEADER    magic, version, seed, screen size, gravity, jump strength,
+              frame count
+    level     u16 length + UTF-8 path, SHA-1 of the level file
+    SUMMARY   final state (elapsed, game over / win, player y, passed)
+    frames    zlib stream, per frame: flags byte (jump, pressed, held,
+              dt kind), dt (none if same as the previous frame, else u16
+              milliseconds, or f64 if not a whole ms), pressed letters
+              (count + indices), held letters (bit mask)
+
+The game steps at the fixed tick rate, so a typical frame is the flags byte
+alone before compression. `Replay.run()` replays a
+file headless as fast as the CPU allows; `verify()` checks the final state
+against the recorded summary.
+"""
+import hashlib
+import struct
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+from .level import Level
+from .simulation import Simulation, FrameInput, COMBO_LETTERS
+
+MAGIC = b"GDRP"
+VERSION = 3  # v2: pas fixes (TICK_RATE), position sous-pixel du joueur; v3: vitesse effective, pics triangulaires
+EXTENSION = ".gdr"
+
+HEADER = struct.Struct("<4sHHqIIddI")
+SUMMARY = struct.Struct("<dBiI")
+DT_MS = struct.Struct("<H")
+DT_F64 = struct.Struct("<d")
+
+F_JUMP = 1
+F_PRESSED = 2
+F_HELD = 4
+F_DT_F64 = 8
+F_DT_SAME = 16  # même dt que le frame précédent (pas fixe)
+
+FINAL_GAME_OVER = 1
+FINAL_WIN = 2
+
+LETTER_INDEX = {letter: i for i, letter in enumerate(COMBO_LETTERS)}
+
+
+def level_digest(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def encode_frame(inputs: FrameInput, dt: float, prev_dt: Optional[float] = None) -> bytes:
+    flags = F_JUMP if inputs.jump else 0
+    ms = round(dt * 1000)
+    if dt == prev_dt:
+        flags |= F_DT_SAME
+        body = b""
+    elif 0 <= ms < 65536 and ms / 1000.0 == dt:
+        body = DT_MS.pack(ms)
+    else:
+        flags |= F_DT_F64
+        body = DT_F64.pack(dt)
+    if inputs.pressed:
+        flags |= F_PRESSED
+        body += bytes([len(inputs.pressed)]) + bytes(LETTER_INDEX[letter] for letter in inputs.pressed)
+    if inputs.held:
+        flags |= F_HELD
+        body += bytes([sum(1 << LETTER_INDEX[letter] for letter in inputs.held)])
+    return bytes([flags]) + body
+
+
+def decode_frames(data: bytes) -> Iterator[Tuple[FrameInput, float]]:
+    i = 0
+    n = len(data)
+    dt = None
+    while i < n:
+        flags = data[i]
+        i += 1
+        if flags & F_DT_SAME:
+            pass
+        elif flags & F_DT_F64:
+            dt = DT_F64.unpack_from(data, i)[0]
+            i += DT_F64.size
+        else:
+            dt = DT_MS.unpack_from(data, i)[0] / 1000.0
+            i += DT_MS.size
+        pressed = ()
+        if flags & F_PRESSED:
+            count = data[i]
+            pressed = [COMBO_LETTERS[j] for j in data[i + 1:i + 1 + count]]
+            i += 1 + count
+        held = ()
+        if flags & F_HELD:
+            mask = data[i]
+            held = [letter for j, letter in enumerate(COMBO_LETTERS) if mask & (1 << j)]
+            i += 1
+        yield FrameInput(bool(flags & F_JUMP), pressed, held), dt
+
+
+def summarize(sim: Simulation) -> tuple:
+    final = (FINAL_GAME_OVER if sim.game_over else 0) | (FINAL_WIN if sim.win else 0)
+    return (sim.elapsed, final, sim.player.rect.y, sim.obstacles_passed)
+
+
+class ReplayRecorder:
+    """Records the inputs fed to one Simulation."""
+
+    def __init__(self, level_path: str, sim: Simulation):
+        self.level_path = level_path
+        self.sim = sim
+        self.frames = bytearray()
+        self.frame_count = 0
+        self.saved_path = None
+        self._prev_dt = None
+
+    def record(self, inputs: FrameInput, dt: float):
+        self.frames += encode_frame(inputs, dt, self._prev_dt)
+        self._prev_dt = dt
+        self.frame_count += 1
+
+    def save(self, path: str) -> str:
+        sim = self.sim
+        path_bytes = self.level_path.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, sim.seed, sim.width, sim.height,
+                                sim.gravity, sim.jump_strength, self.frame_count))
+            f.write(struct.pack("<H", len(path_bytes)) + path_bytes)
+            f.write(level_digest(self.level_path))
+            f.write(SUMMARY.pack(*summarize(sim)))
+            f.write(zlib.compress(bytes(self.frames), 9))
+        self.saved_path = path
+        return path
+
+
+class Replay:
+    """A recorded run loaded from a .gdr file."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        (magic, version, _, self.seed, self.width, self.height, self.gravity,
+         self.jump_strength, self.frame_count) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a replay file")
+        if version != VERSION:
+            raise ValueError(f"{path}: replay version {version} recorded with older physics (expected {VERSION})")
+        i = HEADER.size
+        (n,) = struct.unpack_from("<H", data, i)
+        self.level_path = data[i + 2:i + 2 + n].decode('utf-8')
+        i += 2 + n
+        self.level_sha1 = data[i:i + 20]
+        i += 20
+        self.summary = SUMMARY.unpack_from(data, i)
+        self._frames = zlib.decompress(data[i + SUMMARY.size:])
+        self.path = path
+
+    def frames(self) -> Iterator[Tuple[FrameInput, float]]:
+        return decode_frames(self._frames)
+
+    def level_matches(self) -> bool:
+        try:
+            return level_digest(self.level_path) == self.level_sha1
+        except OSError:
+            return False
+
+    def simulation(self, level: Optional[Level] = None) -> Simulation:
+        level = level or Level.load_from_file(self.level_path)
+        return Simulation(level, self.width, self.height, gravity=self.gravity,
+                          jump_strength=self.jump_strength, seed=self.seed)
+
+    def run(self, level: Optional[Level] = None) -> Tuple[Simulation, List[Tuple[int, str]]]:
+        """Replay every frame headless; return the simulation and (frame, event) pairs."""
+        sim = self.simulation(level)
+        events = []
+        for n, (inputs, dt) in enumerate(self.frames()):
+            for ev in sim.step(inputs, dt):
+                events.append((n, ev))
+        return sim, events
+
+    def verify(self, level: Optional[Level] = None) -> bool:
+        """True if replaying reproduces the recorded final state exactly."""
+        sim, _ = self.run(level)
+        return summarize(sim) == self.summary
@@ -0,0 +1,88 @@
+"""Time-ordered scheduler for level timeline events.
+
+Timeline entries (`Level.spawn_timeline`) are dicts with a `time` in
+seconds and an optional `event` kind:
+
+- `spawn` (default): obstacle `{y, w, h, type}` spawned off the right edge
+- `qte`: start a combo, optional `duration` (seconds) and `letters`
+- `music`: music cue for the renderer, `action` in play/pause/resume/stop/volume
+  (`file` for play, `volume` for volume)
+- `speed`: change the scroll speed, `scroll_speed` (px/s) or `factor`
+
+Entries are sorted once; `pop_due(now)` only looks at the entry under the
+cursor, so a step costs O(events fired) whatever the timeline size.
+"""
+from bisect import insort
+from typing import Any, Dict, Iterable, List
+
+EVENT_SPAWN = "spawn"
+EVENT_QTE = "qte"
+EVENT_MUSIC = "music"
+EVENT_SPEED = "speed"
+
+
+def event_kind(entry: Dict[str, Any]) -> str:
+    return entry.get('event', EVENT_SPAWN)
+
+
+class _Entry:
+    __slots__ = ("time", "seq", "data")
+
+    def __init__(self, time, seq, data):
+        self.time = time
+        self.seq = seq
+        self.data = data
+
+    def __lt__(self, other):
+        return (self.time, self.seq) < (other.time, other.seq)
+
+
+class EventScheduler:
+    """Sorted array of timed events with a cursor."""
+
+    def __init__(self, events: Iterable[Dict[str, Any]] = ()):
+        self._entries: List[_Entry] = sorted(
+            _Entry(e.get('time', 0), i, e) for i, e in enumerate(events))
+        self._cursor = 0
+        self._seq = len(self._entries)
+        self._shared = False  # _entries shared with a copy (copy-on-write)
+
+    def __len__(self):
+        """Number of events not fired yet."""
+        return len(self._entries) - self._cursor
+
+    def copy(self) -> 'EventScheduler':
+        clone = EventScheduler.__new__(EventScheduler)
+        clone._entries = self._entries
+        clone._cursor = self._cursor
+        clone._seq = self._seq
+        clone._shared = self._shared = True
+        return clone
+
+    def push(self, event: Dict[str, Any]):
+        """Schedule an extra event (kept after already-queued ones at the same time)."""
+        if self._shared:
+            self._entries = list(self._entries)
+            self._shared = False
+        insort(self._entries, _Entry(event.get('time', 0), self._seq, event), lo=self._cursor)
+        self._seq += 1
+
+    def next_time(self):
+        """Time of the next pending event, or None."""
+        if self._cursor < len(self._entries):
+            return self._entries[self._cursor].time
+        return None
+
+    def pop_due(self, now: float) -> List[Dict[str, Any]]:
+        """Events with `time <= now`, in time order, removed from the queue."""
+        entries = self._entries
+        start = cursor = self._cursor
+        while cursor < len(entries) and entries[cursor].time <= now:
+            cursor += 1
+        if cursor == start:
+            return []
+        self._cursor = cursor
+        return [e.data for e in entries[start:cursor]]
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return [e.data for e in self._entries[self._cursor:]]
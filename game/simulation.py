@@ -0,0 +1,395 @@
+"""Headless gameplay core: physics, scrolling, collisions, combo/QTE and win state.
+
+Nothing in here touches the display, the mixer or fonts, so a level can be
+stepped thousands of times per second (level validation, load tests). `Game`
+drives a `Simulation` once per frame and only renders its state.
+"""
+import random
+from time import perf_counter
+from typing import Callable, Iterable, List, Optional
+
+from .broadphase import ObstacleIndex
+from .level import Level, Obstacle, effective_speed
+from .collision import INF, sweep_aabb, sweep_spike
+from .obstacle_store import NUMPY_AVAILABLE, ObstacleArrays
+from .player import Player
+from .streaming import StreamingIndex
+from .scheduler import (EventScheduler, event_kind, EVENT_SPAWN, EVENT_QTE,
+                        EVENT_MUSIC, EVENT_SPEED)
+
+# Pas de simulation fixe, identique en jeu (accumulateur de Game.run) et en
+# headless (solver, replays, benchmarks)
+TICK_RATE = 120
+FIXED_DT = 1.0 / TICK_RATE
+
+COMBO_LETTERS = ['Q', 'W', 'E', 'R', 'A', 'S', 'D', 'F']
+
+# events returned by Simulation.step
+EVENT_COMBO_START = "combo_start"
+EVENT_COMBO_SUCCESS = "combo_success"
+EVENT_COMBO_TIMEOUT = "combo_timeout"
+EVENT_COMBO_FAILED = "combo_failed"
+EVENT_COLLISION = "collision"
+EVENT_WIN = "win"
+EVENT_MUSIC_CUE = "music_cue"  # details in Simulation.music_cues
+EVENT_SPEED_CHANGE = "speed_change"
+
+DEFAULT_COMBO_TIME = 8.0  # QTE des niveaux qui n'en déclarent aucun
+DEFAULT_COMBO_DURATION = 4.0  # 4 secondes (plus de temps pour réagir)
+
+PLAYER_X = 100  # x écran (fixe) du joueur
+SPAWN_OFFSET = 100  # les spawns de la timeline apparaissent à width + SPAWN_OFFSET
+
+
+class FrameInput:
+    """Input state for one simulation step.
+
+    `jump` is True when space/up is down (or was pressed this frame),
+    `pressed` holds combo letters newly pressed this frame and `held` the
+    combo letters currently held down.
+    """
+
+    __slots__ = ("jump", "pressed", "held")
+
+    def __init__(self, jump: bool = False, pressed: Iterable[str] = (), held: Iterable[str] = ()):
+        self.jump = jump
+        self.pressed = tuple(pressed)
+        self.held = frozenset(held)
+
+
+NO_INPUT = FrameInput()
+
+
+class Simulation:
+    """Fixed-rule game state advanced with `step(inputs, dt)`."""
+
+    def __init__(self, level: Level, width: int = 800, height: int = 450,
+                 gravity: float = 2400.0, jump_strength: float = 700.0,
+                 seed: Optional[int] = None, use_arrays: bool = False):
+        self.level = level
+        self.width = width
+        self.height = height
+        self.ground_y = height - 40
+        self.gravity = gravity
+        self.jump_strength = jump_strength
+        # graine toujours connue, pour pouvoir enregistrer/rejouer la partie
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = random.Random(self.seed)
+        self._rng_shared = False  # rng object shared with a clone
+
+        self.player = Player(PLAYER_X, height - 80)
+        self.clamp_obstacles()
+
+        self.scroll_x = 0.0
+        self.elapsed = 0.0
+        self.game_over = False
+        self.win = False
+        self.all_obstacles_passed = False
+        self.victory_timer = 0.0
+        self.total_obstacles = len(level.obstacles)
+        self.obstacles_passed = 0
+        self.scroll_speed = level.scroll_speed
+        # Obstacles stay in world coordinates and are never mutated, so the
+        # level survives a restart; timeline spawns live only in this run.
+        # use_arrays: NumPy structure-of-arrays store (optional dependency,
+        # opt-in: slower than ObstacleIndex, see game/obstacle_store.py)
+        # level.stream: obstacles decoded by chunk around the camera
+        self.streaming = level.stream is not None
+        if self.streaming:
+            self.index = StreamingIndex(level.stream, width, self.min_obstacle_y)
+            self.total_obstacles = len(self.index)
+        elif use_arrays and NUMPY_AVAILABLE:
+            records = getattr(level, 'obstacle_records', None)
+            if records is not None:
+                self.index = ObstacleArrays.from_records(records, level.obstacles, self.min_obstacle_y)
+            else:
+                self.index = ObstacleArrays(level.obstacles)
+        else:
+            self.index = ObstacleIndex(level.obstacles)
+        self.spawn_index = ObstacleIndex()
+
+        # Combo / QTE
+        self.combo_duration = DEFAULT_COMBO_DURATION
+        self.combo_triggered = False
+        self.combo_active = False
+        self.combo_start_time = 0.0
+        self.combo_letters: List[str] = []
+        self.combo_input: List[str] = []
+        self.combo_success = False
+
+        # timeline: spawns, QTEs, music cues, speed changes
+        timeline = list(level.spawn_timeline)
+        if not any(event_kind(e) == EVENT_QTE for e in timeline):
+            timeline.append({'time': DEFAULT_COMBO_TIME, 'event': EVENT_QTE})
+        self.scheduler = EventScheduler(timeline)
+        self.music_cues: List[dict] = []  # music events fired during the last step
+        self.profiler = None  # game.profiler.FrameProfiler, phases timées si activé
+
+    def clone(self) -> 'Simulation':
+        """Independent copy of the run state; the level and its obstacle index are shared.
+
+        Used by search tools (solver) to branch on inputs. Streamed levels
+        cannot be cloned (their index is tied to the camera).
+        """
+        if self.streaming:
+            raise ValueError("cannot clone a streamed level simulation")
+        clone = Simulation.__new__(Simulation)
+        clone.__dict__.update(self.__dict__)
+        clone.player = self.player.copy()
+        clone.spawn_index = self.spawn_index.copy()
+        clone.scheduler = self.scheduler.copy()
+        # the generator is copied only when one of the runs draws from it
+        clone._rng_shared = self._rng_shared = True
+        clone.combo_letters = list(self.combo_letters)
+        clone.combo_input = list(self.combo_input)
+        clone.music_cues = list(self.music_cues)
+        return clone
+
+    def clamp_obstacles(self):
+        """Clamp obstacle heights so they are potentially reachable by the player."""
+        min_allowed_y = self.min_obstacle_y
+        for o in self.level.obstacles:
+            if o.y < min_allowed_y:
+                o.y = min_allowed_y
+
+    @property
+    def min_obstacle_y(self) -> int:
+        """Highest obstacle top still reachable with a full jump."""
+        max_jump_px = (self.jump_strength ** 2) / (2 * self.gravity)  # h = v^2 / (2g)
+        return int(self.ground_y - max_jump_px - self.player.rect.height)
+
+    def generate_combo(self):
+        """Génère un combo aléatoire de 2 lettres"""
+        if self._rng_shared:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+            self.rng, self._rng_shared = rng, False
+        self.combo_letters = self.rng.sample(COMBO_LETTERS, 2)
+        self.combo_input = []
+
+    def start_combo(self, event: dict):
+        self.combo_triggered = True
+        self.combo_active = True
+        self.combo_start_time = self.elapsed
+        self.combo_success = False
+        self.combo_duration = event.get('duration', DEFAULT_COMBO_DURATION)
+        if event.get('letters'):
+            self.combo_letters = list(event['letters'])
+            self.combo_input = []
+        else:
+            self.generate_combo()
+
+    def handle_combo_input(self, letter: str):
+        """Enregistre une lettre pressée pendant le combo"""
+        if self.combo_active and letter not in self.combo_input:
+            self.combo_input.append(letter)
+
+    def check_combo_simultaneous(self, held) -> bool:
+        """Vérifie si toutes les touches du combo sont pressées simultanément"""
+        if not self.combo_active:
+            return False
+        if all(letter in held for letter in self.combo_letters):
+            self.combo_success = True
+            self.combo_active = False
+            return True
+        return False
+
+    @property
+    def camera_x(self) -> int:
+        """World x of the left screen edge."""
+        return int(self.scroll_x)
+
+    def visible_obstacles(self, margin: int = 0) -> List[Obstacle]:
+        """Obstacles overlapping the screen, in world coordinates."""
+        x0 = self.camera_x - margin
+        x1 = self.camera_x + self.width + margin
+        return self.index.query(x0, x1) + self.spawn_index.query(x0, x1)
+
+    @property
+    def combo_elapsed(self) -> float:
+        return self.elapsed - self.combo_start_time
+
+    def step(self, inputs: FrameInput = NO_INPUT, dt: float = FIXED_DT) -> List[str]:
+        """Advance the game by `dt` seconds and return the events that fired."""
+        events: List[str] = []
+        player = self.player
+        self.elapsed += dt
+        # début du pas, pour le balayage des collisions
+        start_scroll = self.scroll_x
+        start_y = player.y
+        prof = self.profiler
+        if prof is not None:
+            if prof.enabled:
+                t = perf_counter()
+            else:
+                prof = None
+
+        if self.combo_active:
+            for letter in inputs.pressed:
+                self.handle_combo_input(letter)
+
+        if not self.game_over and inputs.jump:
+            player.jump(self.jump_strength)
+
+        if self.combo_active and self.check_combo_simultaneous(inputs.held):
+            events.append(EVENT_COMBO_SUCCESS)
+
+        if not self.game_over:
+            player.update(dt, self.gravity)
+        if prof is not None:
+            t = prof.lap('physics', t)
+
+        # ===== ÉVÉNEMENTS DU NIVEAU (timeline) =====
+        spawns = []
+        self.music_cues = []
+        for ev in self.scheduler.pop_due(self.elapsed):
+            kind = event_kind(ev)
+            if kind == EVENT_SPAWN:
+                spawns.append(ev)  # placés après le scroll de cette frame
+            elif kind == EVENT_QTE:
+                if not self.combo_active:
+                    self.start_combo(ev)
+                    events.append(EVENT_COMBO_START)
+            elif kind == EVENT_MUSIC:
+                self.music_cues.append(ev)
+                events.append(EVENT_MUSIC_CUE)
+            elif kind == EVENT_SPEED:
+                if 'scroll_speed' in ev:
+                    self.scroll_speed = ev['scroll_speed']
+                else:
+                    self.scroll_speed *= ev.get('factor', 1.0)
+                events.append(EVENT_SPEED_CHANGE)
+        if prof is not None:
+            t = prof.lap('timeline', t)
+
+        if self.combo_active and self.combo_elapsed >= self.combo_duration:
+            # Temps écoulé
+            self.combo_active = False
+            events.append(EVENT_COMBO_TIMEOUT)
+            if not self.combo_success:
+                # Combo raté = Game Over
+                self.game_over = True
+                events.append(EVENT_COMBO_FAILED)
+
+        # simple ground collision
+        if player.rect.bottom >= self.ground_y:
+            self._land(self.ground_y)
+
+        self.scroll_x += effective_speed(self.scroll_speed) * dt
+        if self.streaming:
+            self.index.update(self.camera_x)
+        if prof is not None:
+            t = prof.lap('physics', t)
+
+        for s in spawns:
+            # spawn just off the right edge of the screen
+            o = Obstacle(self.camera_x + self.width + SPAWN_OFFSET, s.get('y', self.height - 80),
+                         s.get('w', 40), s.get('h', 80), s.get('type', 'normal'))
+            self.spawn_index.insert(o)
+        if prof is not None:
+            t = prof.lap('timeline', t)
+
+        # Count obstacles that have been passed by the player
+        passed_x = player.rect.x + self.camera_x
+        self.obstacles_passed = self.index.count_passed(passed_x) + self.spawn_index.count_passed(passed_x)
+
+        if not self.all_obstacles_passed and not self.game_over:
+            if self.obstacles_passed >= self.total_obstacles:
+                self.all_obstacles_passed = True
+                self.victory_timer = 1.0  # Start 1-second countdown
+
+        if self.collide(start_scroll, start_y) and not self.game_over:
+            self.game_over = True
+            events.append(EVENT_COLLISION)
+
+        # Victory condition: 1 second after passing all obstacles
+        if self.all_obstacles_passed and not self.game_over:
+            self.victory_timer -= dt
+            if self.victory_timer <= 0:
+                self.win = True
+                self.game_over = True
+                events.append(EVENT_WIN)
+        if prof is not None:
+            prof.lap('collision', t)
+
+        return events
+
+    def _land(self, top: int):
+        player = self.player
+        player.set_bottom(top)
+        player.vel_y = 0
+        was_on_ground = player.on_ground
+        player.on_ground = True
+        # Check jump buffer when landing
+        if not was_on_ground and player.jump_buffer > 0:
+            player.jump(self.jump_strength)
+
+    def collide(self, start_scroll: Optional[float] = None, start_y: Optional[float] = None) -> bool:
+        """Sweep the player box over this step's motion; return True on a fatal contact.
+
+        The motion goes from (`start_scroll`, `start_y`) to the current
+        scroll and player y (no motion when omitted). Contacts are resolved
+        in time-of-impact order: spikes and side/bottom hits are fatal, and
+        falling onto a platform or block lands on its top at the time of
+        impact. The rest of the step then slides along that top.
+        """
+        player = self.player
+        w, h = player.rect.w, player.rect.h
+        left = (self.scroll_x if start_scroll is None else start_scroll) + player.rect.x
+        top = player.y if start_y is None else start_y
+        dx = self.scroll_x + player.rect.x - left
+        dy = player.y - top
+        hits = self._sweep_hits(left, top, w, h, dx, dy)
+        while hits:
+            t, _, landing, o = hits[0]
+            if o.is_deadly() or not landing:
+                return True
+            self._land(o.y)
+            # reste du pas: glissement horizontal sur le dessus de l'obstacle
+            left += dx * t
+            dx *= 1.0 - t
+            top = o.y - h
+            dy = 0.0
+            hits = self._sweep_hits(left, top, w, h, dx, dy)
+        return False
+
+    def _sweep_hits(self, left, top, w, h, dx, dy):
+        """(t, order, top_face, obstacle) for every contact during the motion, earliest first."""
+        x0 = min(left, left + dx)
+        x1 = max(left, left + dx) + w
+        hits = []
+        if isinstance(self.index, ObstacleArrays):
+            store = self.index
+            idx = store.window(x0, x1)
+            if idx.size:
+                t, top_face = store.sweep(idx, left, top, w, h, dx, dy)
+                for k in (t < INF).nonzero()[0]:
+                    o = store.items[idx[k]]
+                    if o.is_deadly():
+                        # la boîte englobante est touchée: test du triangle
+                        hit = sweep_spike(left, top, w, h, dx, dy, o.x, o.y, o.w, o.h)
+                        if hit is not None:
+                            hits.append((hit[0], len(hits), hit[1], o))
+                        continue
+                    hits.append((float(t[k]), len(hits), bool(top_face[k]), o))
+            candidates = self.spawn_index.query(x0, x1)
+        else:
+            candidates = self.index.query(x0, x1) + self.spawn_index.query(x0, x1)
+        for o in candidates:
+            # les types inconnus ne bloquent ni ne tuent
+            if not (o.is_deadly() or o.is_platform()):
+                continue
+            sweep = sweep_spike if o.is_deadly() else sweep_aabb
+            hit = sweep(left, top, w, h, dx, dy, o.x, o.y, o.w, o.h)
+            if hit is not None:
+                hits.append((hit[0], len(hits), hit[1], o))
+        if len(hits) > 1:
+            hits.sort(key=lambda e: (e[0], e[1]))
+        return hits
+
+    def run(self, policy: Optional[Callable[['Simulation'], FrameInput]] = None,
+            dt: float = FIXED_DT, max_time: float = 600.0) -> bool:
+        """Step headless until the run ends (or `max_time`); return True on a win."""
+        while not self.game_over and self.elapsed < max_time:
+            self.step(policy(self) if policy else NO_INPUT, dt)
+        return self.win
@@ -0,0 +1,254 @@
+"""Level solvability checker.
+
+`solve(level)` searches jump timings with the real `Simulation` rules
+(coyote time, jump buffer, re-jump lockout, swept collisions): every input
+frame (`INPUT_TICKS` simulation steps, the 60 FPS at which the game reads
+the keyboard), each distinct player state branches into "jump" / "no jump"
+and identical states are merged, so the frontier stays small. The search stops at the
+first win or when every branch has died.
+
+For a solvable level the winning input sequence is then probed jump by jump:
+each press is moved up to `WINDOW_SECONDS` earlier/later, with the
+rest of the plan kept as is, to measure its timing window. Combos (QTE) are
+assumed to be hit on their first frame.
+"""
+from typing import List, Optional
+
+from .level import Level, effective_speed
+from .simulation import Simulation, FrameInput, FIXED_DT, TICK_RATE
+
+DEFAULT_BEAM = 4096  # max états distincts gardés par frame
+INPUT_TICKS = max(1, TICK_RATE // 60)  # pas de simulation par frame d'entrée
+WINDOW_SECONDS = 0.2  # ±200 ms autour de chaque saut
+WINDOW_HORIZON = 1.0  # secondes à survivre après le saut suivant
+STATE_Y_DECIMALS = 3  # y sous-pixel du joueur arrondi au millième de pixel pour fusionner les états
+
+
+def _inputs(sim: Simulation, jump: bool) -> FrameInput:
+    # le bot réussit toujours les combos
+    return FrameInput(jump=jump, held=sim.combo_letters if sim.combo_active else ())
+
+
+def _advance(sim: Simulation, jump: bool, dt: float, ticks: int):
+    """One input frame: a tap on the first step, then `ticks - 1` plain steps."""
+    for i in range(ticks):
+        sim.step(_inputs(sim, jump and i == 0), dt)
+        if sim.game_over:
+            break
+
+
+def _state_key(sim: Simulation):
+    p = sim.player
+    # la physique intègre le y flottant: rect.y (arrondi) fusionnerait des états différents
+    return (round(p.y, STATE_Y_DECIMALS), p.vel_y, p.on_ground, p.coyote_time, p.jump_buffer, p.last_jump_time)
+
+
+def _time_limit(sim: Simulation) -> float:
+    end_x = max((o.x + o.w for o in sim.level.obstacles), default=0)
+    # marge pour les changements de vitesse et le délai de victoire
+    return 2 * end_x / max(effective_speed(sim.scroll_speed), 1) + 10.0
+
+
+class JumpWindow:
+    """Timing window of one press of the winning input sequence."""
+
+    __slots__ = ("frame", "time", "x", "early", "late", "dt")
+
+    def __init__(self, frame, time, x, early, late, dt=FIXED_DT):
+        self.frame = frame
+        self.time = time
+        self.x = x
+        self.early = early  # frames pouvant être avancés
+        self.late = late  # frames pouvant être retardés
+        self.dt = dt
+
+    @property
+    def frames(self) -> int:
+        return self.early + self.late + 1
+
+    @property
+    def ms(self) -> float:
+        return self.frames * self.dt * 1000
+
+    def __repr__(self):
+        return f"JumpWindow(t={self.time:.2f}s, x={self.x}, window={self.ms:.0f} ms)"
+
+
+class SolveResult:
+    """Outcome of `solve`."""
+
+    def __init__(self):
+        self.solvable = False
+        self.exhaustive = True  # False si le beam a dû couper des états
+        self.path: List[bool] = []  # jump pressed, per frame
+        self.frames = 0
+        self.states = 0
+        self.max_frontier = 0
+        self.fail_time: Optional[float] = None
+        self.fail_x: Optional[int] = None
+        self.fail_obstacles = []  # (x, y, w, h, type) near the last deaths
+        self.windows: List[JumpWindow] = []
+
+    def tightest(self, n: int = 5) -> List[JumpWindow]:
+        return sorted(self.windows, key=lambda w: (w.frames, w.time))[:n]
+
+    def to_dict(self) -> dict:
+        return {
+            "solvable": self.solvable,
+            "exhaustive": self.exhaustive,
+            "frames": self.frames,
+            "states": self.states,
+            "max_frontier": self.max_frontier,
+            "jumps": sum(self.path),
+            "fail_time": self.fail_time,
+            "fail_x": self.fail_x,
+            "fail_obstacles": self.fail_obstacles,
+            "tightest": [{"time": w.time, "x": w.x, "frames": w.frames, "ms": w.ms, "early": w.early, "late": w.late}
+                         for w in self.tightest()],
+        }
+
+
+def solve(level: Level, dt: float = FIXED_DT, beam: int = DEFAULT_BEAM,
+          max_time: Optional[float] = None, windows: bool = True, ticks: int = INPUT_TICKS) -> SolveResult:
+    """Search a winning input sequence; `result.path` has one entry per input frame (`ticks` steps of `dt`)."""
+    result = SolveResult()
+    root = Simulation(level, seed=0)
+    max_time = max_time or _time_limit(root)
+    parents = [-1]
+    pressed = [False]
+    frontier = [(root, 0)]
+    frame = 0
+    winner = None
+    while frontier and winner is None and frame * dt * ticks < max_time:
+        frame += 1
+        nxt = {}
+        deaths = []
+        for sim, node in frontier:
+            jumped = sim.clone()
+            for child, jump in ((sim, False), (jumped, True)):
+                _advance(child, jump, dt, ticks)
+                if child.win:
+                    winner = (node, jump)
+                    break
+                if child.game_over:
+                    deaths.append(child)
+                    continue
+                key = _state_key(child)
+                if key in nxt:
+                    continue
+                if len(nxt) >= beam:
+                    result.exhaustive = False
+                    continue
+                parents.append(node)
+                pressed.append(jump)
+                nxt[key] = (child, len(parents) - 1)
+            if winner is not None:
+                break
+        result.states += len(nxt)
+        result.max_frontier = max(result.max_frontier, len(nxt))
+        if not nxt and deaths and winner is None:
+            _record_failure(result, deaths)
+        frontier = list(nxt.values())
+    result.frames = frame
+
+    if winner is None:
+        if frontier and result.fail_time is None:
+            # temps limite atteint sans victoire
+            sim = frontier[0][0]
+            result.fail_time = sim.elapsed
+            result.fail_x = sim.camera_x + sim.player.rect.x
+        return result
+
+    node, jump = winner
+    path = [jump]
+    while node > 0:
+        path.append(pressed[node])
+        node = parents[node]
+    path.reverse()
+    result.solvable = True
+    result.path = _simplify(level, path, dt, ticks)
+    if windows:
+        result.windows = measure_windows(level, result.path, dt, ticks)
+    return result
+
+
+def _record_failure(result: SolveResult, deaths):
+    sim = deaths[0]
+    pr = sim.player.rect
+    cam = sim.camera_x
+    result.fail_time = sim.elapsed
+    result.fail_x = cam + pr.x
+    near = sim.index.query(cam + pr.left - 40, cam + pr.right + 40) + \
+        sim.spawn_index.query(cam + pr.left - 40, cam + pr.right + 40)
+    result.fail_obstacles = [(o.x, o.y, o.w, o.h, o.type) for o in near]
+
+
+def _simplify(level: Level, path: List[bool], dt: float, ticks: int) -> List[bool]:
+    """Drop presses that do not change the player state."""
+    path = list(path)
+    sim = Simulation(level, seed=0)
+    for i, jump in enumerate(path):
+        if jump:
+            without = sim.clone()
+            _advance(without, False, dt, ticks)
+            _advance(sim, True, dt, ticks)
+            if _state_key(without) == _state_key(sim) and without.game_over == sim.game_over:
+                path[i] = False
+                sim = without
+        else:
+            _advance(sim, False, dt, ticks)
+    return path
+
+
+def _survives(start: Simulation, path: List[bool], begin: int, end: int, dt: float, ticks: int) -> bool:
+    sim = start.clone()
+    for i in range(begin, end):
+        _advance(sim, path[i], dt, ticks)
+        if sim.win:
+            return True
+        if sim.game_over:
+            return False
+    return True
+
+
+def measure_windows(level: Level, path: List[bool], dt: float = FIXED_DT,
+                    ticks: int = INPUT_TICKS) -> List[JumpWindow]:
+    """Timing window of every press in a winning `path`."""
+    presses = [i for i, jump in enumerate(path) if jump]
+    period = dt * ticks  # durée d'un frame d'entrée
+    shift = max(1, round(WINDOW_SECONDS / period))
+    horizon = max(1, round(WINDOW_HORIZON / period))
+    # snapshots `shift` frames before each press
+    snapshots = {}
+    wanted = {max(0, p - shift): p for p in presses}
+    sim = Simulation(level, seed=0)
+    for i in range(len(path)):
+        if i in wanted:
+            snapshots[i] = sim.clone()
+        _advance(sim, path[i], dt, ticks)
+
+    windows = []
+    for n, p in enumerate(presses):
+        begin = max(0, p - shift)
+        following = presses[n + 1] if n + 1 < len(presses) else len(path)
+        end = min(len(path), following + horizon)
+
+        def shifted_ok(offset):
+            q = p + offset
+            if q < begin or q >= end or (offset and path[q]):
+                return False
+            trial = list(path)
+            trial[p] = False
+            trial[q] = True
+            return _survives(snapshots[begin], trial, begin, end, dt, ticks)
+
+        early = 0
+        while early < shift and shifted_ok(-(early + 1)):
+            early += 1
+        late = 0
+        while late < shift and shifted_ok(late + 1):
+            late += 1
+        snap = snapshots[begin]
+        x = int(snap.scroll_x + effective_speed(snap.scroll_speed) * (p - begin) * period) + snap.player.rect.x
+        windows.append(JumpWindow(p, p * period, x, early, late, period))
+    return windows
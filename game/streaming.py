@@ -0,0 +1,111 @@
+"""Chunk streaming for very long compiled levels.
+
+`StreamingIndex` keeps only the chunks of a `level_binary.LevelStream` that
+are near the camera: chunks are decoded on a background thread as soon as
+they enter the look-ahead window and dropped once they are far enough
+behind that no query can reach them. Resident obstacles are bounded by the
+window size, not by the level length. It answers the same `query` /
+`count_passed` calls as `ObstacleIndex`, with the same results.
+"""
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-stream")
+    return _executor
+
+
+class _Chunk:
+    __slots__ = ("x_min", "x_max", "max_right", "xs", "seqs", "items", "rights")
+
+    def __init__(self, pairs, max_right):
+        self.xs = [o.x for _, o in pairs]
+        self.seqs = [seq for seq, _ in pairs]
+        self.items = [o for _, o in pairs]
+        self.rights = sorted(o.x + o.w for o in self.items)
+        self.x_min = self.xs[0] if self.xs else 0
+        self.x_max = self.xs[-1] if self.xs else 0
+        self.max_right = max_right
+
+    def __len__(self):
+        return len(self.items)
+
+
+class StreamingIndex:
+    """Obstacle index over the chunks of a LevelStream around the camera."""
+
+    def __init__(self, stream, view_width: int, min_y: int = None, lookahead: int = None):
+        self.stream = stream
+        self.max_w = stream.max_w
+        self.view_width = view_width
+        self.min_y = min_y
+        # chunks starting before camera + 2 screens must be resident; we
+        # start decoding them `lookahead` px earlier (default 4 screens)
+        self.required = 2 * view_width
+        self.lookahead = max(lookahead or 4 * view_width, self.required)
+        # nothing left of camera - behind can appear in a query window
+        self.behind = self.max_w + 2 * view_width
+        self._next = 0
+        self._pending = {}
+        self._loaded = {}
+        self.dropped = 0  # obstacles of chunks already dropped (all passed)
+        self.update(0)
+
+    def __len__(self):
+        return self.stream.obstacle_count
+
+    @property
+    def resident(self) -> int:
+        return sum(len(c) for c in self._loaded.values())
+
+    def _load(self, k: int) -> _Chunk:
+        pairs = self.stream.read_chunk(k)
+        if self.min_y is not None:
+            for _, o in pairs:
+                if o.y < self.min_y:
+                    o.y = self.min_y  # même règle que Simulation.clamp_obstacles
+        return _Chunk(pairs, self.stream.chunks[k][1])
+
+    def update(self, camera_x: int):
+        """Request chunks entering the window, collect decoded ones, drop old ones."""
+        chunks = self.stream.chunks
+        while self._next < len(chunks) and chunks[self._next][0] <= camera_x + self.view_width + self.lookahead:
+            self._pending[self._next] = _get_executor().submit(self._load, self._next)
+            self._next += 1
+        for k, future in list(self._pending.items()):
+            # a chunk the camera is about to reach is waited for, never skipped
+            if future.done() or chunks[k][0] <= camera_x + self.required:
+                self._loaded[k] = future.result()
+                del self._pending[k]
+        limit = camera_x - self.behind
+        for k in [k for k, c in self._loaded.items() if c.max_right < limit]:
+            self.dropped += len(self._loaded.pop(k))
+
+    def query(self, x0, x1) -> List:
+        """Obstacles whose horizontal span may overlap `[x0, x1]`, in level order."""
+        lo_x = x0 - self.max_w
+        found = []
+        for c in self._loaded.values():
+            if c.x_min > x1 or c.x_max < lo_x:
+                continue
+            lo = bisect_left(c.xs, lo_x)
+            hi = bisect_right(c.xs, x1)
+            found.extend(zip(c.seqs[lo:hi], c.items[lo:hi]))
+        if len(found) > 1:
+            found.sort(key=lambda e: e[0])
+        return [o for _, o in found]
+
+    def count_passed(self, x) -> int:
+        """Number of obstacles whose right edge is left of `x`."""
+        return self.dropped + sum(bisect_left(c.rights, x) for c in self._loaded.values())
+
+    def close(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
@@ -0,0 +1,66 @@
+"""Bounded LRU cache of scaled surfaces.
+
+Sprites, the player image, combo GIF frames and parallax layers are drawn
+at the same few sizes every frame; `scale()` rescales each (surface, size)
+pair once and hands back the cached copy afterwards.
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class ScaledSurfaceCache:
+    """LRU cache keyed by (source surface, target size, smooth)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, surface: pygame.Surface, size, smooth: bool = False) -> pygame.Surface:
+        size = (int(size[0]), int(size[1]))
+        if surface.get_size() == size:
+            return surface
+        key = (surface, size, smooth)
+        scaled = self._entries.get(key)
+        if scaled is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return scaled
+        self.misses += 1
+        if smooth:
+            scaled = pygame.transform.smoothscale(surface, size)
+        else:
+            scaled = pygame.transform.scale(surface, size)
+        self._entries[key] = scaled
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return scaled
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# cache partagé par tout le rendu
+scaled_cache = ScaledSurfaceCache()
+
+
+def scale(surface: pygame.Surface, size, smooth: bool = False) -> pygame.Surface:
+    """pygame.transform.scale/smoothscale through the shared cache."""
+    return scaled_cache.get(surface, size, smooth)
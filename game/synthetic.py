@@ -0,0 +1,67 @@
+"""Synthetic level generator (benchmarks, load tests).
+
+Levels follow the JSON format of `data/levels`: obstacles in x order with a
+configurable mix of types, plus optional timeline spawns spread over the
+level duration. Geometry stays in the ranges used by the hand-made levels
+(spikes on the ground, platforms and blocks within jump reach).
+"""
+import json
+import random
+from typing import Dict, Optional
+
+DEFAULT_MIX = {"normal": 0.35, "platform": 0.4, "spike": 0.25}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'platform=0.5,spike=0.3,normal=0.2' -> {type: weight}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def generate_level(n: int, mix: Optional[Dict[str, float]] = None, spawns: int = 0, seed: int = 0,
+                   width: int = 800, height: int = 450, scroll_speed: float = 350) -> dict:
+    """Level dict with `n` obstacles and `spawns` timeline spawn events."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    types = list(mix)
+    weights = [mix[t] for t in types]
+    ground = height - 40
+    obstacles = []
+    x = width
+    for t in rng.choices(types, weights, k=n):
+        x += rng.randint(40, 200)
+        if t == "spike":
+            size = rng.choice((20, 30, 40))
+            obstacles.append({"x": x, "y": ground - size, "w": size, "h": size, "type": t})
+        elif t == "platform":
+            obstacles.append({"x": x, "y": rng.randint(ground - 210, ground - 30),
+                              "w": rng.randint(60, 140), "h": 20, "type": t})
+        else:
+            h = rng.randint(40, 60)
+            obstacles.append({"x": x, "y": rng.randint(ground - 160, ground - h),
+                              "w": rng.randint(40, 80), "h": h, "type": t})
+
+    duration = (x + width) / scroll_speed
+    timeline = sorted(({"time": round(rng.uniform(1.0, duration), 3), "y": ground - 40, "w": 40, "h": 40,
+                        "type": rng.choice(("normal", "spike"))} for _ in range(spawns)),
+                      key=lambda e: e["time"])
+    return {
+        "width": width,
+        "height": height,
+        "scroll_speed": scroll_speed,
+        "title": f"Synthetic {n}",
+        "bg_layers": [
+            {"color": [50, 120, 200], "speed_factor": 0.1},
+            {"color": [90, 140, 220], "speed_factor": 0.3},
+        ],
+        "obstacles": obstacles,
+        "spawn_timeline": timeline,
+    }
+
+
+def write_level(path: str, data: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
@@ -1,30 +1,32 @@
 """Entry point with simple level selection menu."""
-import os
-import json
+import argparse
 import pygame
 from game.engine import Game
+from game.fonts import get_font, text_cache
+from game.manifest import LevelManifest
+
+ROW_HEIGHT = 44
+LIST_TOP = 80
 
 
 def list_levels(folder="data/levels"):
-    files = []
-    for entry in os.listdir(folder):
-        if entry.endswith('.json'):
-            path = os.path.join(folder, entry)
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                title = data.get('title', entry)
-            except Exception:
-                title = entry
-            files.append((title, path))
-    files.sort()
-    return files
+    """Level entries (title, path, obstacles, duration...) from the cached manifest."""
+    manifest = LevelManifest(folder)
+    manifest.refresh()
+    return manifest.levels()
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
 
 
-def menu():
+def menu(dirty_rects=False, record_dir=None, profile_csv=None, max_fps=60):
     pygame.init()
     screen = pygame.display.set_mode((800, 450))
-    font = pygame.font.Font(None, 36)
+    font = get_font(36)
     levels = list_levels()
     if not levels:
         screen.fill((30, 30, 40))
@@ -34,7 +36,10 @@ def menu():
         pygame.time.wait(2000)
         return
 
+    small_font = get_font(24)
+    visible_rows = (screen.get_height() - LIST_TOP - 10) // ROW_HEIGHT
     idx = 0
+    top = 0  # première ligne affichée
     running = True
     clock = pygame.time.Clock()
     while running:
@@ -47,10 +52,19 @@ def menu():
                     idx = min(idx + 1, len(levels) - 1)
                 elif event.key == pygame.K_UP:
                     idx = max(idx - 1, 0)
+                elif event.key == pygame.K_PAGEDOWN:
+                    idx = min(idx + visible_rows, len(levels) - 1)
+                elif event.key == pygame.K_PAGEUP:
+                    idx = max(idx - visible_rows, 0)
+                elif event.key == pygame.K_HOME:
+                    idx = 0
+                elif event.key == pygame.K_END:
+                    idx = len(levels) - 1
                 elif event.key == pygame.K_RETURN:
                     # launch level
-                    title, path = levels[idx]
-                    g = Game(width=800, height=450, title=f"Geometry Dash - {title}")
+                    title, path = levels[idx]['title'], levels[idx]['path']
+                    g = Game(width=800, height=450, title=f"Geometry Dash - {title}", dirty_rects=dirty_rects,
+                             record_dir=record_dir, profile_csv=profile_csv, max_fps=max_fps)
                     g.run(level_path=path)
                     # re-create menu display surface in case the level altered/quit the display
                     try:
@@ -60,16 +74,40 @@ def menu():
                         pass
                     screen = pygame.display.set_mode((800, 450))
                     # return to menu after level ends
-        # draw menu
+            elif event.type == pygame.MOUSEWHEEL:
+                idx = max(0, min(idx - event.y, len(levels) - 1))
+        # keep the selection on screen
+        if idx < top:
+            top = idx
+        elif idx >= top + visible_rows:
+            top = idx - visible_rows + 1
+        # draw menu (only the visible rows)
         screen.fill((20, 20, 30))
-        header = font.render('Select level', True, (220, 220, 220))
+        header = text_cache.render(font, 'Select level', (220, 220, 220))
         screen.blit(header, (20, 20))
-        for i, (title, path) in enumerate(levels):
+        position = text_cache.render(small_font, f"{idx + 1}/{len(levels)}", (150, 150, 160))
+        screen.blit(position, (screen.get_width() - position.get_width() - 20, 30))
+        for row, level in enumerate(levels[top:top + visible_rows]):
+            i = top + row
+            y = LIST_TOP + row * ROW_HEIGHT
             color = (255, 255, 120) if i == idx else (200, 200, 200)
-            txt = font.render(title, True, color)
-            screen.blit(txt, (40, 80 + i * 44))
+            txt = text_cache.render(font, level['title'], color)
+            screen.blit(txt, (40, y))
+            info = text_cache.render(small_font, f"{level['obstacles']} obs  {format_duration(level['duration'])}",
+                                     (150, 150, 160))
+            screen.blit(info, (screen.get_width() - info.get_width() - 20, y + 6))
         pygame.display.flip()
 
 
 if __name__ == '__main__':
-    menu()
+    parser = argparse.ArgumentParser(description="Geometry Dash Custom")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="only push changed screen regions (display.update) instead of flip; F3 shows them")
+    parser.add_argument('--record', nargs='?', const='replays', default=None, metavar='DIR',
+                        help="save a replay (.gdr) of every run in DIR (default: replays)")
+    parser.add_argument('--profile', nargs='?', const='profile.csv', default=None, metavar='CSV',
+                        help="write per-frame phase timings (ms) to CSV (default: profile.csv); F2 shows the overlay")
+    parser.add_argument('--fps', type=int, default=60,
+                        help="render frame cap, 0 = unlimited (the simulation always steps at a fixed rate)")
+    args = parser.parse_args()
+    menu(dirty_rects=args.dirty_rects, record_dir=args.record, profile_csv=args.profile, max_fps=args.fps)
@@ -0,0 +1,68 @@
+"""Rejoue des parties enregistrées (.gdr).
+
+    python replay.py replays/                 # vérifie tous les replays (headless)
+    python replay.py run.gdr --events         # + liste des événements
+    python replay.py run.gdr --watch          # rejoue à l'écran, en temps réel
+
+La vérification rejoue chaque partie aussi vite que possible et compare
+l'état final à celui enregistré: utile pour reproduire une mort et pour
+détecter tout changement de physique.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.replay import Replay, summarize, EXTENSION
+
+
+def find_replays(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, '*' + EXTENSION)))
+        else:
+            yield path
+
+
+def check(path):
+    replay = Replay(path)
+    start = time.perf_counter()
+    sim, events = replay.run()
+    elapsed = time.perf_counter() - start
+    return path, replay.level_matches(), summarize(sim) == replay.summary, replay.frame_count, elapsed, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded runs")
+    parser.add_argument('paths', nargs='+', help="replay files or directories")
+    parser.add_argument('--watch', action='store_true', help="render the first replay in real time")
+    parser.add_argument('--events', action='store_true', help="print the events of each run")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="parallel processes")
+    args = parser.parse_args()
+    paths = list(find_replays(args.paths))
+
+    if args.watch:
+        from game.engine import Game
+        replay = Replay(paths[0])
+        Game(width=replay.width, height=replay.height, title=f"Replay - {os.path.basename(paths[0])}").run(
+            replay.level_path, replay=replay)
+        return
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for path, level_ok, same, frames, elapsed, events in pool.map(check, paths):
+            status = "OK" if same else "DIFFÉRENT"
+            note = "" if level_ok else " (niveau modifié depuis l'enregistrement)"
+            print(f"{status:9} {path}: {frames} frames en {elapsed * 1000:.0f} ms{note}")
+            if args.events:
+                for frame, ev in events:
+                    print(f"    frame {frame}: {ev}")
+            failed += not same
+    print(f"{len(paths) - failed}/{len(paths)} replays identiques")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()